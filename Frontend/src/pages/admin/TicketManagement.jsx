@@ -24,23 +24,22 @@ const AdminTicketManagement = () => {
     priority: '',
     assignedTo: ''
   });
+  const [pageLinks, setPageLinks] = useState({ next: null, previous: null });
 
   // Fetch tickets and agents
   useEffect(() => {
     fetchTickets();
   }, []);
 
-  const fetchTickets = async () => {
+  const fetchTickets = async (link = null) => {
     try {
       
       setLoading(true);
-      const response = await api.get('/api/tickets', {
-        params: {
-          ...filters,
-          ordering: '-created_at'
-        }
-      });
-      setTickets(response.data);
+      const params = { ...filters, ordering: '-created_at' };
+      if (link) params.cursor = new URL(link).searchParams.get('cursor');
+      const response = await api.get('/api/tickets/', { params });
+      setTickets(response.data.results);
+      setPageLinks({ next: response.data.next, previous: response.data.previous });
     } catch (error) {
       toast.error('Failed to fetch tickets');
     } finally {
@@ -234,7 +233,7 @@ const AdminTicketManagement = () => {
                   <p>Created on: {new Date(selectedTicket.created_at).toLocaleDateString()}</p>
                 </div>
                 <div>
-                  <p>Assigned to: {selectedTicket.assigned_to || 'Unassigned'}</p>
+                  <p>Assigned to: {selectedTicket.assigned_to_email || 'Unassigned'}</p>
                   <p>Last updated: {new Date(selectedTicket.updated_at).toLocaleDateString()}</p>
                 </div>
               </div>
@@ -253,7 +252,7 @@ const AdminTicketManagement = () => {
           <h1 className="text-2xl font-bold text-white">Ticket Management</h1>
           <div className="flex items-center gap-4">
             <button
-              onClick={fetchTickets}
+              onClick={() => fetchTickets()}
               className="p-2 text-gray-400 hover:text-white hover:bg-gray-800 rounded-lg"
               title="Refresh"
             >
@@ -325,7 +324,7 @@ const AdminTicketManagement = () => {
                         </span>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-300">
-                        {ticket.assigned_to || 'Unassigned'}
+                        {ticket.assigned_to_email || 'Unassigned'}
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-300">
                         {new Date(ticket.created_at).toLocaleDateString()}
@@ -368,6 +367,22 @@ const AdminTicketManagement = () => {
                   ))}
                 </tbody>
               </table>
+              <div className="flex justify-center my-4 space-x-2">
+                <button
+                  onClick={() => fetchTickets(pageLinks.previous)}
+                  disabled={!pageLinks.previous}
+                  className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+                >
+                  Previous
+                </button>
+                <button
+                  onClick={() => fetchTickets(pageLinks.next)}
+                  disabled={!pageLinks.next}
+                  className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+                >
+                  Next
+                </button>
+              </div>
             </div>
           )}
         </div>
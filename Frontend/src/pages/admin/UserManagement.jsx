@@ -21,12 +21,14 @@ const AdminUserManagement = () => {
   const [showModal, setShowModal] = useState(false);
   const [userIdToBlock, setUserIdToBlock] = useState(null);
   const [searchQuery, setSearchQuery] = useState('');
-  const [currentPage, setCurrentPage] = useState(1);
+  const [pageLinks, setPageLinks] = useState({ next: null, previous: null });
   const usersPerPage = 10;
 
+  // Search and paging run on the server; wait for a pause in typing.
   useEffect(() => {
-    fetchUsers();
-  }, []);
+    const timer = setTimeout(() => fetchUsers(), 250);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
   const validateForm = (data) => {
     const newErrors = {};
@@ -43,11 +45,15 @@ const AdminUserManagement = () => {
     return Object.keys(newErrors).length === 0;
   };
 
-  const fetchUsers = async () => {
+  const fetchUsers = async (link = null) => {
     try {
       setLoading(true);
-      const response = await api.get('/auth/users/list/');
-      setUsers(response.data);
+      const params = { page_size: usersPerPage };
+      if (searchQuery.trim()) params.email = searchQuery.trim();
+      if (link) params.cursor = new URL(link).searchParams.get('cursor');
+      const response = await api.get('/auth/users/list/', { params });
+      setUsers(response.data.results);
+      setPageLinks({ next: response.data.next, previous: response.data.previous });
     } catch (error) {
       toast.error('Failed to fetch users');
     } finally {
@@ -125,13 +131,6 @@ const AdminUserManagement = () => {
     }
   };
 
-  const filteredUsers = users.filter(user => user.email.toLowerCase().includes(searchQuery.toLowerCase()));
-  const indexOfLastUser = currentPage * usersPerPage;
-  const indexOfFirstUser = indexOfLastUser - usersPerPage;
-  const currentUsers = filteredUsers.slice(indexOfFirstUser, indexOfLastUser);
-
-  const paginate = (pageNumber) => setCurrentPage(pageNumber);
-
   return (
     <AdminLayout>
       <div className="p-6 space-y-6">
@@ -149,7 +148,7 @@ const AdminUserManagement = () => {
         <div className="flex justify-between items-center mb-4">
           <input
             type="text"
-            placeholder="Search users..."
+            placeholder="Search by email..."
             value={searchQuery}
             onChange={(e) => setSearchQuery(e.target.value)}
             className="w-full bg-gray-700 border border-gray-600 rounded-lg px-4 py-2 text-white focus:outline-none focus:border-blue-500"
@@ -161,7 +160,7 @@ const AdminUserManagement = () => {
             <div className="text-center py-8">
               <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-500 mx-auto"></div>
             </div>
-          ) : filteredUsers.length === 0 ? (
+          ) : users.length === 0 ? (
             <div className="text-center py-8 text-gray-400">No users found</div>
           ) : (
             <>
@@ -175,7 +174,7 @@ const AdminUserManagement = () => {
                   </tr>
                 </thead>
                 <tbody className="divide-y divide-gray-700">
-                  {currentUsers.map((user) => (
+                  {users.map((user) => (
                     <tr key={user.id} className="hover:bg-gray-800/50 transition-colors">
                       <td className="px-6 py-4 text-white">{user.email}</td>
                       <td className="px-6 py-4 text-white">{user.role}</td>
@@ -192,21 +191,21 @@ const AdminUserManagement = () => {
                   ))}
                 </tbody>
               </table>
-              <div className="flex justify-center mt-4">
-                <nav>
-                  <ul className="flex space-x-2">
-                    {Array.from({ length: Math.ceil(filteredUsers.length / usersPerPage) }, (_, index) => (
-                      <li key={index} className="cursor-pointer">
-                        <button
-                          onClick={() => paginate(index + 1)}
-                          className={`px-4 py-2 rounded-lg ${currentPage === index + 1 ? 'bg-blue-500 text-white' : 'bg-gray-700 text-gray-400 hover:bg-gray-600'}`}
-                        >
-                          {index + 1}
-                        </button>
-                      </li>
-                    ))}
-                  </ul>
-                </nav>
+              <div className="flex justify-center mt-4 space-x-2">
+                <button
+                  onClick={() => fetchUsers(pageLinks.previous)}
+                  disabled={!pageLinks.previous}
+                  className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+                >
+                  Previous
+                </button>
+                <button
+                  onClick={() => fetchUsers(pageLinks.next)}
+                  disabled={!pageLinks.next}
+                  className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+                >
+                  Next
+                </button>
               </div>
             </>
           )}
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
 import api from '../../service/api';
+import { subscribeToTicketEvents, applyStatsDelta, applyTicketEvent } from '../../service/ticketEvents';
 import {
   ChartBarIcon,
   TicketIcon,
@@ -104,26 +105,29 @@ const AdminDashboard = () => {
   const { token } = useAuth();
 
   useEffect(() => {
+    const fetchStats = async () => {
+      const statsResponse = await api.get('/api/tickets/admin_stats/', {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setStats(statsResponse.data);
+    };
+
+    // Fetch recent tickets
+    const fetchTickets = async () => {
+      const ticketsResponse = await api.get('/api/tickets/', {
+        headers: { Authorization: `Bearer ${token}` },
+        params: {
+          ordering: '-created_at',
+          page_size: 10
+        }
+      });
+      setTickets(ticketsResponse.data.results);
+    };
+
     const fetchDashboardData = async () => {
       try {
         setLoading(true);
-        
-        // Fetch stats
-        const statsResponse = await api.get('/api/tickets/admin_stats/', {
-          headers: { Authorization: `Bearer ${token}` }
-        });
-        
-        // Fetch recent tickets
-        const ticketsResponse = await api.get('/api/tickets/', {
-          headers: { Authorization: `Bearer ${token}` },
-          params: {
-            ordering: '-created_at',
-            limit: 10
-          }
-        });
-        
-        setStats(statsResponse.data);
-        setTickets(ticketsResponse.data);
+        await Promise.all([fetchStats(), fetchTickets()]);
       } catch (err) {
         setError(err.message);
       } finally {
@@ -132,6 +136,21 @@ const AdminDashboard = () => {
     };
 
     fetchDashboardData();
+
+    // Apply pushed changes instead of polling.
+    return subscribeToTicketEvents((event) => {
+      if (event.type === 'resync') {
+        fetchStats();
+        fetchTickets();
+        return;
+      }
+      setStats(current => applyStatsDelta(current, event.stats));
+      if (event.type === 'created') {
+        fetchTickets();
+      } else {
+        setTickets(current => applyTicketEvent(current, event));
+      }
+    });
   }, [token]);
 
   if (loading) {
@@ -28,19 +28,23 @@ const UserDashboard = () => {
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/api/tickets/', {
-        params: {
-          ordering: '-created_at',
-          page_size: 5
-        }
-      });
+      // Counts come from the stats endpoint; the list is only the newest page.
+      const [statsResponse, ticketsResponse] = await Promise.all([
+        api.get('/api/tickets/stats/'),
+        api.get('/api/tickets/', {
+          params: {
+            ordering: '-created_at',
+            page_size: 5
+          }
+        }),
+      ]);
 
-      const tickets = response.data;
+      const tickets = ticketsResponse.data.results;
       const statsData = {
-        total: tickets.length,
-        open: tickets.filter(t => t.status === 'open').length,
-        in_progress: tickets.filter(t => t.status === 'in_progress').length,
-        resolved: tickets.filter(t => t.status === 'resolved').length,
+        total: statsResponse.data.total_tickets,
+        open: statsResponse.data.open_tickets,
+        in_progress: statsResponse.data.in_progress_tickets,
+        resolved: statsResponse.data.resolved_tickets,
       };
 
       setStats(statsData);
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../../context/AuthContext';
 import UserLayout from '../../components/layout/UserLayout';
 import {
@@ -10,6 +10,7 @@ import {
   XMarkIcon
 } from '@heroicons/react/24/outline';
 import api from '../../service/api';
+import { subscribeToTicketEvents, applyTicketEvent } from '../../service/ticketEvents';
 import { toast } from 'sonner';
 
 // Edit Ticket Modal Component
@@ -136,6 +137,9 @@ const UserTicketManagement = () => {
     priority: '',
     search: ''
   });
+  const [pageLinks, setPageLinks] = useState({ next: null, previous: null });
+  // The page on screen, so feed-driven refetches stay on it.
+  const cursor = useRef(null);
 
   const priorityColors = {
     low: 'bg-blue-500/10 text-blue-500 border-blue-500/20',
@@ -151,19 +155,36 @@ const UserTicketManagement = () => {
 
   useEffect(() => {
     if (user) {
-      fetchTickets();
+      fetchTickets(); // New filters start again from the first page.
     }
   }, [filters, user]);
 
-  const fetchTickets = async () => {
+  // Refetch only when the change feed reports something new.
+  useEffect(() => {
+    if (!user) return;
+    return subscribeToTicketEvents((event) => {
+      // A filtered list cannot tell whether an updated ticket still matches.
+      const filtered = Object.values(filters).some(value => value !== '');
+      if (event.type === 'created' || event.type === 'resync' || (filtered && event.type === 'updated')) {
+        fetchTickets(cursor.current);
+      } else {
+        setTickets(current => applyTicketEvent(current, event));
+      }
+    });
+  }, [user, filters]);
+
+  const fetchTickets = async (pageCursor = null) => {
     try {
       setLoading(true);
       const params = new URLSearchParams(
         Object.entries(filters).filter(([_, value]) => value !== '')
       );
-      
+      if (pageCursor) params.set('cursor', pageCursor);
+
       const response = await api.get(`/api/tickets/?${params}`);
-      setTickets(response.data);
+      cursor.current = pageCursor;
+      setTickets(response.data.results);
+      setPageLinks({ next: response.data.next, previous: response.data.previous });
     } catch (error) {
       toast.error('Failed to fetch tickets');
     } finally {
@@ -335,6 +356,22 @@ const UserTicketManagement = () => {
             ))
           )}
         </div>
+        <div className="flex justify-center space-x-2">
+          <button
+            onClick={() => fetchTickets(new URL(pageLinks.previous).searchParams.get('cursor'))}
+            disabled={!pageLinks.previous}
+            className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+          >
+            Previous
+          </button>
+          <button
+            onClick={() => fetchTickets(new URL(pageLinks.next).searchParams.get('cursor'))}
+            disabled={!pageLinks.next}
+            className="px-4 py-2 rounded-lg bg-gray-700 text-gray-400 hover:bg-gray-600 disabled:opacity-50"
+          >
+            Next
+          </button>
+        </div>
       </div>
 
       {/* Modals */}
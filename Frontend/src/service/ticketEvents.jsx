@@ -0,0 +1,56 @@
+import { decryptToken } from '../utils/tokenUtils';
+
+const BASE_URL = import.meta.env.VITE_APP_API_URL || 'http://localhost:8000/';
+const RECONNECT_DELAY = 5000;
+
+// Subscribe to the server-sent ticket change feed. Returns an unsubscribe function.
+export const subscribeToTicketEvents = (onEvent) => {
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const connect = () => {
+        const encryptedToken = localStorage.getItem('access_token');
+        if (closed || !encryptedToken) return;
+
+        // EventSource cannot send an Authorization header.
+        const token = encodeURIComponent(decryptToken(encryptedToken));
+        source = new EventSource(`${BASE_URL}api/tickets/events/?token=${token}`);
+        source.onmessage = (message) => onEvent(JSON.parse(message.data));
+        source.onerror = () => {
+            // The server ends the stream when the access token expires, so
+            // reconnect with whatever token is current by then.
+            source.close();
+            if (!closed) retryTimer = setTimeout(connect, RECONNECT_DELAY);
+        };
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        if (source) source.close();
+    };
+};
+
+// Add an event's counter deltas to a stats response.
+export const applyStatsDelta = (stats, delta) => {
+    if (!stats) return stats;
+    const next = { ...stats };
+    Object.entries(delta || {}).forEach(([key, value]) => {
+        if (typeof next[key] === 'number') next[key] += value;
+    });
+    return next;
+};
+
+// Merge updated tickets into a list and drop deleted ones. Created tickets
+// need fields the feed does not carry, so callers refetch for those.
+export const applyTicketEvent = (tickets, event) => {
+    const changed = new Map(event.tickets.map(ticket => [ticket.id, ticket]));
+    if (event.type === 'deleted') {
+        return tickets.filter(ticket => !changed.has(ticket.id));
+    }
+    return tickets.map(ticket =>
+        changed.has(ticket.id) ? { ...ticket, ...changed.get(ticket.id) } : ticket
+    );
+};
@@ -0,0 +1,86 @@
+from functools import partial
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Cache aliases (see CACHES in settings): the per-process cache of users
+# resolved from access tokens, and the shared cache of their stamps.
+USER_CACHE_ALIAS = 'auth_users'
+USER_STAMP_ALIAS = 'shared'
+# Stamps may expire or be culled: a missing stamp always forces a reload.
+USER_STAMP_TIMEOUT = 24 * 60 * 60
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def user_stamp_key(user_id):
+    return f'auth:user-stamp:{user_id}'
+
+
+def _restamp(user_ids):
+    stamp = uuid4().hex
+    caches[USER_STAMP_ALIAS].set_many(
+        {user_stamp_key(user_id): stamp for user_id in user_ids}, timeout=USER_STAMP_TIMEOUT
+    )
+    caches[USER_CACHE_ALIAS].delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def forget_user(user_id):
+    """
+    Invalidate a cached user in every worker once the current transaction
+    commits, so the next request re-reads it. Call this after any change
+    that affects authentication or authorization (blocking, role, is_staff,
+    is_active) that does not go through ``User.save()``.
+    """
+    forget_users([user_id])
+
+
+def forget_users(user_ids):
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(partial(_restamp, user_ids))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves ``request.user`` from a bounded TTL cache
+    instead of a SELECT on every request. Each entry carries the user's
+    stamp from the shared cache when it was loaded, and is only used while
+    that stamp is current. Saving or deleting a user replaces the stamp
+    (accounts.signals), and blocked users are rejected here, so blocking
+    takes effect on the user's next request in any worker rather than at
+    token expiry.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = caches[USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        stamps, stamp_key = caches[USER_STAMP_ALIAS], user_stamp_key(user_id)
+        # Read before the user, so a change committed in between is seen next time.
+        stamp = stamps.get(stamp_key)
+        if stamp is None:
+            # Expired or culled: start a stamp no cached entry carries.
+            stamps.add(stamp_key, uuid4().hex, USER_STAMP_TIMEOUT)
+            stamp = stamps.get(stamp_key)
+        cached_stamp, user = cache.get(key, (None, None))
+        if stamp is None or user is None or cached_stamp != stamp:
+            user = super().get_user(validated_token)
+            cache.set(key, (stamp, user))
+        elif not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if user.is_blocked:
+            raise AuthenticationFailed(_('User is blocked'), code='user_blocked')
+        return user
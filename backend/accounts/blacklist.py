@@ -0,0 +1,247 @@
+"""
+Refresh-token blacklist checks without a query per token.
+
+simplejwt looks every refresh token up in ``BlacklistedToken`` before
+accepting it, although almost none of them are revoked. ``BlacklistIndex``
+keeps a Bloom filter of the blacklisted jtis in each process: a jti the
+filter has never seen is certainly not blacklisted and costs no query. The
+few jtis it cannot rule out (revoked tokens and the filter's false
+positives) are answered from a small LRU, then from the database.
+
+The filter only ever grows between rebuilds, so it can be stale in one
+direction only: it must learn about new blacklist rows before it answers.
+Blacklisting through ``RefreshToken.blacklist`` bumps a generation number in
+a Django cache once the row commits, and each check compares that number
+with the one it last loaded; a changed number, or ``resync_seconds`` without
+a load, reloads recent rows first. The number must live in a cache every
+worker shares (``settings.TOKEN_BLACKLIST['OPTIONS']['alias']``, the
+'shared' alias by default): a bump in a per-process cache would leave the
+other workers accepting revoked tokens until their next resync. On such a
+cache the index does not use the filter at all and looks every jti up in
+the database.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+GENERATION_KEY = 'auth:blacklist:generation'
+
+# Cache backends whose values other processes cannot see.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter sized for ``capacity`` keys at ``error_rate``
+    false positives. ``add`` must be serialized by the caller; lookups need
+    no lock because bits are only ever set.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        if key in self:
+            return
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class BlacklistIndex:
+    """
+    Answers "is this jti blacklisted?" for refresh tokens (see the module
+    docstring). Rows are reloaded by ``blacklisted_at`` with a ``lookback``
+    margin, so a row saved a little before an earlier load but committed
+    after it is still picked up.
+    """
+
+    def __init__(self, alias='shared', capacity=100000, error_rate=0.01,
+                 lru_size=10000, resync_seconds=60, lookback_seconds=300):
+        self.cache = caches[alias]
+        self.shared = not isinstance(self.cache, PROCESS_LOCAL_CACHES)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lru_size = lru_size
+        self.resync_seconds = resync_seconds
+        self.lookback = timedelta(seconds=lookback_seconds)
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._recent = OrderedDict()
+            self._generation = None
+            self._synced_at = 0
+            self._loaded_until = None
+            self._epoch = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'filtered': self._stats['filtered'],
+                'cached': self._stats['cached'],
+                'queried': self._stats['queried'],
+                'loads': self._stats['loads'],
+                'keys': self._bloom.count if self._bloom else 0,
+                'capacity': self._bloom.capacity if self._bloom else self.capacity,
+            }
+
+    def is_blacklisted(self, jti):
+        if not self.shared:
+            self._count('queried')
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        self._sync()
+        if jti not in self._bloom:
+            self._count('filtered')
+            return False
+        with self._lock:
+            known = self._recent.get(jti)
+            if known is not None:
+                self._recent.move_to_end(jti)
+            epoch = self._epoch
+        if known is not None:
+            self._count('cached')
+            return known
+
+        self._count('queried')
+        blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        with self._lock:
+            # A load since the query may have added this jti; an answer of
+            # "not blacklisted" from before it must not be remembered.
+            if blacklisted or epoch == self._epoch:
+                self._recent[jti] = blacklisted
+                self._recent.move_to_end(jti)
+                while len(self._recent) > self.lru_size:
+                    self._recent.popitem(last=False)
+        return blacklisted
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _is_current(self, generation):
+        return (
+            self._bloom is not None
+            and generation == self._generation
+            and time.monotonic() - self._synced_at < self.resync_seconds
+        )
+
+    def _sync(self):
+        # Read before loading: a bump after this point triggers another load.
+        generation = self.cache.get(GENERATION_KEY, 0)
+        if self._is_current(generation):
+            return
+        with self._lock:
+            if self._is_current(generation):
+                return
+            if self._bloom is None or self._bloom.count >= self._bloom.capacity:
+                self._rebuild()
+            else:
+                self._load(self._bloom, self._loaded_until - self.lookback)
+            self._generation = generation
+            self._synced_at = time.monotonic()
+            self._stats['loads'] += 1
+
+    def _rebuild(self):
+        now = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        capacity = max(self.capacity, 2 * rows.count())
+        bloom = BloomFilter(capacity, self.error_rate)
+        self._load(bloom, None)
+        self._bloom = bloom
+        self._recent.clear()
+
+    def _load(self, bloom, since):
+        started = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=started)
+        if since is not None:
+            rows = rows.filter(blacklisted_at__gte=since)
+        for jti in rows.values_list('token__jti', flat=True).iterator():
+            bloom.add(jti)
+            if self._recent.get(jti) is False:
+                del self._recent[jti]
+        self._loaded_until = started
+        self._epoch += 1
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_blacklist_index():
+    """The index configured by ``settings.TOKEN_BLACKLIST``."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                config = getattr(settings, 'TOKEN_BLACKLIST', {})
+                backend = import_string(config.get('BACKEND', 'accounts.blacklist.BlacklistIndex'))
+                _index = backend(**config.get('OPTIONS', {}))
+    return _index
+
+
+def _bump_generation():
+    cache = get_blacklist_index().cache
+    # Seed an evicted number with the clock, not 0: counting up from 0 again
+    # could land on the number a worker already loaded, and it would skip
+    # the reload.
+    cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Evicted between add and incr; any new value forces a reload.
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def token_blacklisted():
+    """
+    Tell every index that a blacklist row was written, once it commits.
+    Call this after blacklisting tokens without ``RefreshToken.blacklist``.
+    """
+    transaction.on_commit(_bump_generation)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """simplejwt's RefreshToken, checked against ``get_blacklist_index()``."""
+
+    def check_blacklist(self):
+        if get_blacklist_index().is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        token_blacklisted()
+        return result
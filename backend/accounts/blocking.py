@@ -0,0 +1,102 @@
+"""
+Block or unblock many users at once.
+
+``set_blocked`` costs the same handful of queries however many users it
+touches: it locks and reads the ids that will change, updates them with
+one UPDATE, revokes the outstanding refresh tokens of every targeted
+blocked user with one INSERT ... SELECT, and writes one audit row. All of
+this happens in one transaction. Repeating a request changes nothing and
+revokes nothing, but it is still audited.
+"""
+from django.db import connections, router, transaction
+from django.db.models import DateTimeField, Exists, OuterRef, Value
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .authentication import forget_users
+from .blacklist import token_blacklisted
+from .models import User, UserBlockAudit
+
+FILTERS = {
+    'role': 'role',
+    'is_active': 'is_active',
+    'email_domain': 'email__iendswith',
+    'joined_before': 'date_joined__lt',
+}
+
+
+def target_users(actor, user_ids=None, filters=None):
+    """
+    The users a request names, never including ``actor``. A filter never
+    matches superusers; ask for them by id.
+    """
+    users = User.objects.exclude(pk=actor.pk)
+    if user_ids is not None:
+        return users.filter(pk__in=user_ids)
+    filters = dict(filters)
+    if 'email_domain' in filters:
+        filters['email_domain'] = '@' + filters['email_domain'].lstrip('@')
+    lookups = {FILTERS[name]: value for name, value in filters.items()}
+    return users.filter(is_superuser=False, **lookups)
+
+
+def revoke_tokens(users):
+    """
+    Blacklist every unexpired, not yet blacklisted refresh token of
+    ``users`` (a queryset) with one INSERT ... SELECT. Returns the count.
+    """
+    now = timezone.now()
+    db = router.db_for_write(BlacklistedToken)
+    outstanding = (
+        OutstandingToken.objects.using(db)
+        .filter(user__in=users.values('pk'), expires_at__gt=now)
+        .exclude(Exists(BlacklistedToken.objects.filter(token=OuterRef('pk'))))
+        .annotate(blacklisted_at=Value(now, output_field=DateTimeField()))
+        .order_by()
+        .values_list('pk', 'blacklisted_at')
+    )
+    connection = connections[db]
+    sql, params = outstanding.query.get_compiler(connection=connection).as_sql()
+    ops, quote = connection.ops, connection.ops.quote_name
+    # A concurrent request may blacklist the same token first; skip it.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{ops.insert_statement(on_conflict=OnConflict.IGNORE)} '
+            f'{quote(BlacklistedToken._meta.db_table)} '
+            f'({quote("token_id")}, {quote("blacklisted_at")}) {sql} '
+            f'{ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None)}',
+            params
+        )
+        revoked = cursor.rowcount
+    if revoked:
+        token_blacklisted()
+    return revoked
+
+
+@transaction.atomic
+def set_blocked(actor, blocked, user_ids=None, filters=None):
+    """
+    Block (or unblock) the users named by ``user_ids`` or ``filters`` and,
+    when blocking, revoke their refresh tokens. Returns the UserBlockAudit.
+    """
+    targets = target_users(actor, user_ids, filters)
+    changed = list(
+        targets.filter(is_blocked=not blocked)
+        .select_for_update()
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    if changed:
+        User.objects.filter(pk__in=changed).update(is_blocked=blocked)
+        forget_users(changed)
+
+    revoked = revoke_tokens(targets.filter(is_blocked=True)) if blocked else 0
+    criteria = {'user_ids': user_ids} if user_ids is not None else {'filter': filters}
+    return UserBlockAudit.objects.create(
+        actor=actor,
+        action='block' if blocked else 'unblock',
+        criteria=criteria,
+        user_ids=changed,
+        tokens_revoked=revoked,
+    )
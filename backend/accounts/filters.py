@@ -0,0 +1,39 @@
+import django_filters
+from django.db import connections
+
+from .models import User
+
+# Without ?is_blocked= / ?is_active=, the directory lists active, unblocked
+# users, which is the condition of the partial index user_directory_idx.
+DEFAULTS = {'is_blocked': False, 'is_active': True}
+
+
+class UserDirectoryFilter(django_filters.FilterSet):
+    """
+    ``?email=`` is a prefix match (typeahead). Emails are stored lowercase
+    (see LoginSerializer), so the prefix is lowercased rather than matched
+    case-insensitively, which no plain index could serve. PostgreSQL answers
+    ``LIKE 'abc%'`` from the varchar_pattern_ops index; SQLite's LIKE is
+    case-insensitive and skips indexes, but its binary text order makes the
+    prefix an exact key range instead.
+    """
+    email = django_filters.CharFilter(method='filter_email_prefix')
+    role = django_filters.ChoiceFilter(choices=User.role.field.choices)
+    is_blocked = django_filters.BooleanFilter()
+    is_active = django_filters.BooleanFilter()
+
+    class Meta:
+        model = User
+        fields = ['email', 'role', 'is_blocked', 'is_active']
+
+    def filter_email_prefix(self, queryset, name, value):
+        prefix = value.lower().strip()
+        if connections[queryset.db].vendor == 'sqlite':
+            return queryset.filter(email__gte=prefix, email__lt=prefix + '\U0010ffff')
+        return queryset.filter(email__startswith=prefix)
+
+    def filter_queryset(self, queryset):
+        for name, value in DEFAULTS.items():
+            if self.data.get(name) in (None, ''):
+                queryset = queryset.filter(**{name: value})
+        return super().filter_queryset(queryset)
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def _cost(algorithm):
+    return getattr(settings, 'PASSWORD_HASHER_COST', {}).get(algorithm, {})
+
+
+class CalibratedScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    Django's scrypt hasher with its cost read from
+    ``settings.PASSWORD_HASHER_COST['scrypt']`` (see calibrate_password_hasher).
+    Hashes made with other parameters still verify and are upgraded on the
+    user's next login.
+    """
+
+    def __init__(self):
+        cost = _cost(self.algorithm)
+        self.work_factor = cost.get('work_factor', self.work_factor)
+        self.block_size = cost.get('block_size', self.block_size)
+        self.parallelism = cost.get('parallelism', self.parallelism)
+        # hashlib.scrypt refuses to use more than 32MB unless told otherwise.
+        self.maxmem = max(self.maxmem, 256 * self.work_factor * self.block_size)
+
+
+class CalibratedArgon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 (needs argon2-cffi) with cost from ``settings.PASSWORD_HASHER_COST['argon2']``."""
+
+    def __init__(self):
+        cost = _cost(self.algorithm)
+        self.time_cost = cost.get('time_cost', self.time_cost)
+        self.memory_cost = cost.get('memory_cost', self.memory_cost)
+        self.parallelism = cost.get('parallelism', self.parallelism)
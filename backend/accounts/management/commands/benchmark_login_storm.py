@@ -0,0 +1,83 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from accounts.views import LoginView
+
+PASSWORD = 'Storm-Passw0rd'
+
+
+class Command(BaseCommand):
+    help = (
+        'Log --users accounts in at once from --concurrency client threads and report '
+        'logins/s and latency. Accounts start with PBKDF2 hashes like existing users, so '
+        'the first storm includes the rehash-on-login upgrade and the second shows the '
+        'steady state. Creates its own users and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Each client thread opens its own connection; use a shared database.')
+
+        pbkdf2 = PBKDF2PasswordHasher()
+        legacy_hash = pbkdf2.encode(PASSWORD, pbkdf2.salt())
+        users = User.objects.bulk_create(
+            User(email=f'login-storm-{i}@example.com', password=legacy_hash)
+            for i in range(options['users'])
+        )
+        try:
+            emails = [user.email for user in users]
+            self.storm('first login', emails, options['concurrency'])
+            upgraded = User.objects.filter(
+                pk__in=[user.pk for user in users],
+                password__startswith=get_hasher().algorithm + '$'
+            ).count()
+            self.stdout.write(f'{upgraded}/{len(users)} hashes upgraded to {get_hasher().algorithm}')
+            self.storm('second login', emails, options['concurrency'])
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def storm(self, label, emails, concurrency):
+        factory = APIRequestFactory()
+        view = LoginView.as_view()
+
+        def login(args):
+            i, email = args
+            # One address per agent, so the per-IP login throttle stays out of the way.
+            request = factory.post(
+                '/auth/login/',
+                {'email': email, 'password': PASSWORD, 'user_type': 'user'},
+                format='json', REMOTE_ADDR=f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'
+            )
+            start = time.perf_counter()
+            try:
+                response = view(request)
+            finally:
+                # Django closes the connection after each request by default.
+                connection.close()
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(login, enumerate(emails)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        statuses = Counter(status for _, status in results)
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f'{label:<14} {len(emails) / elapsed:8.1f} logins/s  '
+            f'p50 {statistics.median(latencies) * 1000:8.1f}ms  p99 {p99 * 1000:8.1f}ms  '
+            f'status {dict(statuses)}'
+        )
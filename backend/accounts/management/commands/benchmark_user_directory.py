@@ -0,0 +1,88 @@
+import random
+import statistics
+import string
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.filters import UserDirectoryFilter
+from accounts.models import User
+from accounts.views import UserListView
+
+DOMAIN = '@directory-benchmark.example.com'
+
+
+class Command(BaseCommand):
+    help = (
+        'Time GET /auth/users/list/ typeahead (?email=<prefix>) and paging requests '
+        'against --users generated accounts, and show the query plan of a prefix search. '
+        'Creates its own users and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__endswith=DOMAIN).exists():
+            raise CommandError(f'Users ending with {DOMAIN} already exist; delete them first.')
+        admin = User.objects.create_superuser(email=f'admin{DOMAIN}', password=None)
+        rng = random.Random(0)
+        names = [
+            ''.join(rng.choices(string.ascii_lowercase, k=8)) + f'{i}{DOMAIN}'
+            for i in range(options['users'])
+        ]
+        start = time.perf_counter()
+        User.objects.bulk_create(
+            (User(email=name, password='!', role='user', is_blocked=i % 50 == 0)
+             for i, name in enumerate(names)),
+            batch_size=5000
+        )
+        self.stdout.write(f'Created {len(names)} users in {time.perf_counter() - start:.1f}s')
+
+        try:
+            self.view = UserListView.as_view()
+            self.factory = APIRequestFactory()
+            self.admin = admin
+
+            plan = UserDirectoryFilter({'email': names[0][:3]}, queryset=User.objects.filter(
+                is_superuser=False)).qs.order_by('email', 'id')[:51].explain()
+            self.stdout.write(f'Plan for ?email={names[0][:3]}:\n{plan}')
+
+            for length in (1, 2, 3):
+                prefixes = [rng.choice(names)[:length] for _ in range(options['requests'])]
+                self.time(f'typeahead {length} char', [{'email': p, 'page_size': 10} for p in prefixes])
+            self.time('first page', [{}] * options['requests'])
+            cursors, params = [], {}
+            for _ in range(min(options['requests'], 200)):
+                response = self.get(params)
+                if not response.data['next']:
+                    break
+                params = {'cursor': parse_qs(urlsplit(response.data['next']).query)['cursor'][0]}
+                cursors.append(params)
+            self.time('next pages', cursors)
+        finally:
+            User.objects.filter(email__endswith=DOMAIN).delete()
+
+    def get(self, params):
+        request = self.factory.get('/auth/users/list/', params)
+        force_authenticate(request, self.admin)
+        response = self.view(request)
+        response.render()
+        if response.status_code != 200:
+            raise CommandError(f'{params} returned {response.status_code}')
+        return response
+
+    def time(self, label, requests):
+        latencies = []
+        for params in requests:
+            start = time.perf_counter()
+            self.get(params)
+            latencies.append(time.perf_counter() - start)
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f'{label:<20} {len(latencies):5d} requests  p50 {statistics.median(latencies) * 1000:7.2f}ms  '
+            f'p99 {p99 * 1000:7.2f}ms'
+        )
@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from accounts.provisioning import provision_users
+from accounts.views import UserCreateView
+
+PASSWORD = 'Import-Passw0rd'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare users/s for one POST /auth/users/create/ per user (on the first '
+        '--sample users) with accounts.provisioning at each --workers count. Creates its '
+        'own users and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--sample', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, action='append')
+
+    def handle(self, *args, **options):
+        prefix = 'import-benchmark-'
+        if User.objects.filter(email__startswith=prefix).exists():
+            raise CommandError(f'Users starting with {prefix} already exist; delete them first.')
+        admin = User.objects.create_superuser(email=f'{prefix}admin@example.com', password=None)
+        self.stdout.write(f'Hasher: {get_hasher().algorithm}')
+        try:
+            factory = APIRequestFactory()
+            # Without throttles: the per-admin limit would stop the sample at 30.
+            view = UserCreateView.as_view(throttle_classes=[])
+            start = time.perf_counter()
+            for i in range(options['sample']):
+                request = factory.post('/auth/users/create/', {
+                    'email': f'{prefix}single-{i}@example.com', 'password': PASSWORD,
+                    'confirm_password': PASSWORD, 'role': 'user',
+                }, format='json')
+                force_authenticate(request, admin)
+                response = view(request)
+                if response.status_code != 201:
+                    raise CommandError(f'Single create returned {response.status_code}: {response.data}')
+            self.report('one per request', options['sample'], time.perf_counter() - start)
+
+            for workers in options['workers'] or [1, None]:
+                rows = (
+                    (i, {'email': f'{prefix}{workers}-{i}@example.com', 'password': PASSWORD})
+                    for i in range(options['users'])
+                )
+                start = time.perf_counter()
+                report = provision_users(rows, batch_size=options['batch_size'], workers=workers)
+                elapsed = time.perf_counter() - start
+                if report['failed']:
+                    raise CommandError(f'Import rejected rows: {report["errors"][:3]}')
+                self.report(f'bulk, workers={workers or "cpu"}', report['created'], elapsed)
+        finally:
+            User.objects.filter(email__startswith=prefix).delete()
+
+    def report(self, label, users, elapsed):
+        self.stdout.write(f'{label:<20} {users:6d} users in {elapsed:7.2f}s  {users / elapsed:8.1f} users/s')
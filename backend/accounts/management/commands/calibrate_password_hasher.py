@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.management.base import BaseCommand
+from django.utils.crypto import get_random_string
+
+from accounts.hashers import CalibratedArgon2PasswordHasher, CalibratedScryptPasswordHasher
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the password hashers on this machine and suggest the strongest '
+        'PASSWORD_HASHER_COST that keeps one hash under --target-ms.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=100)
+        parser.add_argument('--max-memory-mb', type=int, default=64)
+        parser.add_argument('--rounds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.rounds = options['rounds']
+        target = options['target_ms'] / 1000
+        max_memory = options['max_memory_mb'] * 1024 * 1024
+
+        current = get_hasher()
+        self.stdout.write(f'Preferred hasher: {current.algorithm}')
+        pbkdf2 = PBKDF2PasswordHasher()
+        self.stdout.write(f'{f"pbkdf2 iterations={pbkdf2.iterations}":<32} {self.time(pbkdf2) * 1000:8.1f} ms')
+
+        best = None
+        for exponent in range(12, 21):
+            hasher = CalibratedScryptPasswordHasher()
+            hasher.work_factor = 2 ** exponent
+            hasher.maxmem = 256 * hasher.work_factor * hasher.block_size
+            memory = 128 * hasher.work_factor * hasher.block_size
+            if memory > max_memory:
+                break
+            elapsed = self.time(hasher)
+            self.stdout.write(
+                f'{f"scrypt work_factor=2**{exponent}":<32} {elapsed * 1000:8.1f} ms  {memory >> 20:4d} MB'
+            )
+            if elapsed > target:
+                break
+            best = {'work_factor': hasher.work_factor, 'block_size': hasher.block_size,
+                    'parallelism': hasher.parallelism}
+        if best:
+            self.stdout.write(self.style.SUCCESS(f"PASSWORD_HASHER_COST['scrypt'] = {best}"))
+
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            self.stdout.write('argon2-cffi is not installed; skipping Argon2.')
+            return
+
+        best = None
+        for time_cost in range(1, 11):
+            hasher = CalibratedArgon2PasswordHasher()
+            hasher.time_cost = time_cost
+            hasher.memory_cost = min(hasher.memory_cost, max_memory // 1024)
+            elapsed = self.time(hasher)
+            self.stdout.write(
+                f'{f"argon2 time_cost={time_cost}":<32} {elapsed * 1000:8.1f} ms  {hasher.memory_cost >> 10:4d} MB'
+            )
+            if elapsed > target:
+                break
+            best = {'time_cost': time_cost, 'memory_cost': hasher.memory_cost,
+                    'parallelism': hasher.parallelism}
+        if best:
+            self.stdout.write(self.style.SUCCESS(f"PASSWORD_HASHER_COST['argon2'] = {best}"))
+
+    def time(self, hasher):
+        password = get_random_string(16)
+        timings = []
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            hasher.encode(password, hasher.salt())
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import provision_users, read_csv
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users from a CSV file with an email,password[,role] header. Rows are '
+        'validated and inserted --batch-size at a time and passwords are hashed on '
+        '--workers processes. Invalid rows are listed and skipped.'
+    )
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'USER_IMPORT', {})
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=config.get('BATCH_SIZE', 500))
+        parser.add_argument('--workers', type=int, default=config.get('HASH_WORKERS'))
+        parser.add_argument('--dry-run', action='store_true', help='Validate without creating users.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = provision_users(
+                    read_csv(stream),
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - start
+
+        for error in report['errors']:
+            messages = '; '.join(
+                f'{field}: {" ".join(problems)}' for field, problems in error['errors'].items()
+            )
+            self.stdout.write(f'row {error["row"]} ({error["email"] or "no email"}): {messages}')
+        rows = report['created'] + report['failed']
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{report["created"]} users {verb}, {report["failed"]} rows rejected '
+            f'({rows} rows in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
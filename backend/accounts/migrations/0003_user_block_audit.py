@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_is_blocked_alter_user_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBlockAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('block', 'Block'), ('unblock', 'Unblock')], max_length=10)),
+                ('criteria', models.JSONField()),
+                ('user_ids', models.JSONField(default=list)),
+                ('tokens_revoked', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='block_audits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
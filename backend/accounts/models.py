@@ -35,5 +35,48 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # The user directory's default listing (accounts.filters), in
+            # keyset order, touching only the rows it can show.
+            models.Index(
+                fields=['email', 'id'],
+                condition=models.Q(is_blocked=False, is_active=True, is_superuser=False),
+                name='user_directory_idx',
+            ),
+            # Email prefix (LIKE 'abc%') typeahead; the unique index on email
+            # cannot serve LIKE under a non-C collation on PostgreSQL. Other
+            # databases ignore the opclass.
+            models.Index(
+                fields=['email'],
+                opclasses=['varchar_pattern_ops'],
+                name='user_email_prefix_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.email
+
+class UserBlockAudit(models.Model):
+    """One row per bulk block/unblock request (accounts.blocking)."""
+    ACTION_CHOICES = [('block', 'Block'), ('unblock', 'Unblock')]
+
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='block_audits'
+    )
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    # The request as given: {'user_ids': [...]} or {'filter': {...}}.
+    criteria = models.JSONField()
+    # Users whose is_blocked actually changed; empty for a repeated request.
+    user_ids = models.JSONField(default=list)
+    tokens_revoked = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return f'{self.action} {len(self.user_ids)} users by {self.actor_id} at {self.created_at}'
@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+class VerifierBusy(Exception):
+    """Every verification slot is taken; the caller should ask the client to retry."""
+
+
+class PasswordVerifier:
+    """
+    Runs password hashing on a fixed pool of threads. hashlib and argon2
+    release the GIL, so the pool hashes in parallel, but never on more than
+    ``workers`` threads at once: a login storm queues here instead of
+    taking the CPU (and, for memory-hard hashers, the RAM) from every other
+    request. At most ``max_pending`` verifications may wait; beyond that
+    callers get VerifierBusy straight away.
+    """
+
+    def __init__(self, workers=None, max_pending=256):
+        workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password')
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise VerifierBusy
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def check(self, password, encoded):
+        """
+        Return ``(is_correct, new_encoded)``. ``new_encoded`` is the password
+        re-hashed with the preferred hasher when the stored hash is outdated,
+        so the caller can save it without hashing on its own thread.
+        """
+        return self.submit(_check, password, encoded)
+
+    def burn(self, password):
+        """Hash ``password`` for nothing, so unknown accounts take as long as known ones."""
+        self.submit(make_password, password)
+
+
+def _check(password, encoded):
+    is_correct, must_update = verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, make_password(password)
+    return is_correct, None
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_password_verifier():
+    """The verifier configured by ``settings.PASSWORD_VERIFIER``."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                config = getattr(settings, 'PASSWORD_VERIFIER', {})
+                _verifier = PasswordVerifier(
+                    workers=config.get('WORKERS'),
+                    max_pending=config.get('MAX_PENDING', 256),
+                )
+    return _verifier
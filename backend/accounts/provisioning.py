@@ -0,0 +1,196 @@
+"""
+Bulk user creation for the provisioning endpoint and ``manage.py import_users``.
+
+Rows are validated a batch at a time with the same rules as
+UserCreatingSerializer. Each batch costs one query to find emails that are
+already taken and one ``bulk_create``. Password hashing dominates the cost,
+so it runs on a pool of processes: a short-lived one per import command,
+and one long-lived, small pool per server process for the endpoint.
+"""
+import csv
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import User
+from .serializers import password_rule_error
+
+REQUIRED_COLUMNS = ('email', 'password')
+
+
+def read_csv(stream):
+    """
+    ``(line number, row)`` for each record of a CSV text stream with a header
+    row that names at least the REQUIRED_COLUMNS (``role`` is optional).
+    """
+    reader = csv.DictReader(stream)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f'CSV header is missing: {", ".join(missing)}')
+    for row in reader:
+        yield reader.line_num, row
+
+
+class PasswordHashPool:
+    """
+    Hashes passwords on ``workers`` processes (default: one per CPU), started
+    on first use. The workers are spawned rather than forked, because forking
+    a server process that is running threads is unsafe. Each one sets
+    Django up from DJANGO_SETTINGS_MODULE, so it uses the same hashers.
+    With one worker, hashing runs inline. Threads may share a pool; their
+    batches queue for the same workers.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def hash(self, passwords):
+        if self.workers <= 1 or len(passwords) < 2:
+            return [make_password(password) for password in passwords]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_endpoint_pool = None
+_endpoint_pool_lock = threading.Lock()
+
+
+def get_endpoint_hash_pool():
+    """
+    The pool the provisioning endpoint hashes on: ``USER_IMPORT
+    ['ENDPOINT_HASH_WORKERS']`` processes, started by the first upload and
+    kept for the life of the server process, so concurrent uploads share
+    them instead of each starting a pool.
+    """
+    global _endpoint_pool
+    if _endpoint_pool is None:
+        with _endpoint_pool_lock:
+            if _endpoint_pool is None:
+                config = getattr(settings, 'USER_IMPORT', {})
+                _endpoint_pool = PasswordHashPool(config.get('ENDPOINT_HASH_WORKERS', 2))
+    return _endpoint_pool
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _row_errors(row, seen):
+    """``(email, password, role, errors)`` for one raw row."""
+    errors = {}
+    email = (row.get('email') or '').lower().strip()
+    try:
+        validate_email(email)
+    except ValidationError:
+        errors['email'] = ['Enter a valid email address.']
+    else:
+        if email in seen:
+            errors['email'] = ['This email appears earlier in the import.']
+
+    password = row.get('password') or ''
+    error = password_rule_error(password)
+    if error:
+        errors['password'] = [error]
+
+    role = (row.get('role') or '').strip() or 'user'
+    valid_roles = dict(User.role.field.choices)
+    if role not in valid_roles:
+        errors['role'] = [f"Role must be one of: {', '.join(valid_roles.keys())}"]
+    return email, password, role, errors
+
+
+def _taken(emails):
+    return set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+
+def provision_users(rows, batch_size=500, workers=None, dry_run=False, pool=None):
+    """
+    Create users from ``(row number, mapping)`` pairs, where each mapping has
+    ``email``, ``password`` and optionally ``role``. Rows that fail
+    validation are reported and skipped; the others are created. Returns
+    ``{'created': n, 'failed': n, 'errors': [{'row', 'email', 'errors'}]}``.
+    ``dry_run`` validates without hashing or inserting. Passwords are hashed
+    on ``pool``, or on a pool of ``workers`` processes started for this call.
+    """
+    if pool is None:
+        with PasswordHashPool(workers) as pool:
+            return provision_users(rows, batch_size, dry_run=dry_run, pool=pool)
+
+    report = {'created': 0, 'failed': 0, 'errors': []}
+    seen = set()
+
+    def fail(number, email, errors):
+        report['failed'] += 1
+        report['errors'].append({'row': number, 'email': email, 'errors': errors})
+
+    for batch in _batches(rows, batch_size):
+        valid = []
+        for number, row in batch:
+            email, password, role, errors = _row_errors(row, seen)
+            if errors:
+                fail(number, email, errors)
+                continue
+            seen.add(email)
+            valid.append((number, email, password, role))
+
+        taken = _taken([email for _, email, _, _ in valid])
+        for number, email, _, _ in valid:
+            if email in taken:
+                fail(number, email, {'email': ['A user with this email already exists.']})
+        valid = [entry for entry in valid if entry[1] not in taken]
+        if dry_run:
+            report['created'] += len(valid)
+            continue
+
+        hashes = pool.hash([password for _, _, password, _ in valid])
+        users = [
+            User(email=email, password=encoded, role=role,
+                 is_staff=role == 'admin', is_superuser=role == 'admin')
+            for (_, email, _, role), encoded in zip(valid, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        except IntegrityError:
+            # Someone created one of these emails since the check; report
+            # those rows and insert the rest.
+            taken = _taken([user.email for user in users])
+            for number, email, _, _ in valid:
+                if email in taken:
+                    fail(number, email, {'email': ['A user with this email already exists.']})
+            users = [user for user in users if user.email not in taken]
+            User.objects.bulk_create(users)
+        report['created'] += len(users)
+    return report
@@ -1,15 +1,16 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
 from .models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from .passwords import get_password_verifier
 
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('id', 'email', 'role','is_active')
+        fields = ('id', 'email', 'role', 'is_active', 'is_blocked')
 
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,35 +30,49 @@ class LoginSerializer(serializers.Serializer):
             # Normalize email to lowercase
             email = email.lower().strip()
             
+            # One query for the user; hashing runs on the bounded verifier pool.
+            verifier = get_password_verifier()
             try:
-                # Check if user exists and is active
                 user = User.objects.get(email=email)
-                if not user.is_active:
-                    raise serializers.ValidationError('User account is disabled')
-                
-                # Check if user is blocked
-                if hasattr(user, 'is_blocked') and user.is_blocked:
-                    raise serializers.ValidationError('Your account has been blocked')
-                
-                # Try to authenticate
-                authenticated_user = authenticate(
-                    request=self.context.get('request'),
-                    email=email,
-                    password=password
-                )
-                
-                if not authenticated_user:
-                    raise serializers.ValidationError('Invalid email or password')
-                
-                attrs['user'] = authenticated_user
-                return attrs
-                
             except User.DoesNotExist:
+                verifier.burn(password)
                 # Use a generic error message for security
                 raise serializers.ValidationError('Invalid email or password')
-                
+
+            if not user.is_active:
+                raise serializers.ValidationError('User account is disabled')
+
+            # Check if user is blocked
+            if user.is_blocked:
+                raise serializers.ValidationError('Your account has been blocked')
+
+            is_correct, upgraded = verifier.check(password, user.password)
+            if not is_correct:
+                raise serializers.ValidationError('Invalid email or password')
+
+            if upgraded:
+                # Transparently move the stored hash to the preferred hasher.
+                user.password = upgraded
+                user.save(update_fields=['password'])
+
+            attrs['user'] = user
+            return attrs
+
         raise serializers.ValidationError('Must include "email" and "password"')
         
+def password_rule_error(value):
+    """The first password rule ``value`` breaks, or None."""
+    if len(value) < 8:
+        return "Password must be at least 8 characters long."
+    if not any(char.isupper() for char in value):
+        return "Password must contain at least one uppercase letter."
+    if not any(char.islower() for char in value):
+        return "Password must contain at least one lowercase letter."
+    if not any(char.isdigit() for char in value):
+        return "Password must contain at least one number."
+    return None
+
+
 class UserCreatingSerializer(serializers.ModelSerializer):
     confirm_password = serializers.CharField(write_only=True)
     
@@ -81,18 +96,9 @@ class UserCreatingSerializer(serializers.ModelSerializer):
         return email
 
     def validate_password(self, value):
-        if len(value) < 8:
-            raise serializers.ValidationError("Password must be at least 8 characters long.")
-        
-        if not any(char.isupper() for char in value):
-            raise serializers.ValidationError("Password must contain at least one uppercase letter.")
-            
-        if not any(char.islower() for char in value):
-            raise serializers.ValidationError("Password must contain at least one lowercase letter.")
-            
-        if not any(char.isdigit() for char in value):
-            raise serializers.ValidationError("Password must contain at least one number.")
-        
+        error = password_rule_error(value)
+        if error:
+            raise serializers.ValidationError(error)
         return value
 
     def validate(self, data):
@@ -111,33 +117,40 @@ class UserCreatingSerializer(serializers.ModelSerializer):
         validated_data.pop('confirm_password', None)
         
         try:
-            # Use the custom manager to create the user
-            user = User.objects.create_user(
-                email=validated_data['email'],
-                password=validated_data['password']
+            role = validated_data.get('role', 'user')
+            # Set permissions based on role before the one INSERT.
+            user = User(
+                email=User.objects.normalize_email(validated_data['email']),
+                role=role,
+                is_staff=role == 'admin',
+                is_superuser=role == 'admin',
             )
-            
-            # Set additional fields
-            user.role = validated_data.get('role', 'user')
-            
-            # Set permissions based on role
-            if user.role == 'admin':
-                user.is_staff = True
-                user.is_superuser = True
-            
+            user.set_password(validated_data['password'])
             user.save()
             return user
             
         except Exception as e:
             raise serializers.ValidationError(f"Error creating user: {str(e)}")
-    
-# Admin User Block Serializer
-class BlockUserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ['is_blocked']
 
-    def update(self, instance, validated_data):
-        instance.is_blocked = True
-        instance.save()
-        return instance
\ No newline at end of file
+
+class UserFilterSerializer(serializers.Serializer):
+    role = serializers.ChoiceField(choices=User.role.field.choices, required=False)
+    is_active = serializers.BooleanField(required=False)
+    email_domain = serializers.CharField(required=False, max_length=254)
+    joined_before = serializers.DateTimeField(required=False)
+
+
+class BulkBlockSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['block', 'unblock'])
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=10000
+    )
+    filter = UserFilterSerializer(required=False)
+
+    def validate(self, data):
+        if ('user_ids' in data) == ('filter' in data):
+            raise serializers.ValidationError('Give either "user_ids" or "filter".')
+        if 'filter' in data and not data['filter']:
+            # An empty filter would match every user.
+            raise serializers.ValidationError({'filter': 'Give at least one condition.'})
+        return data
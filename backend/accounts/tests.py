@@ -1,3 +1,551 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import USER_CACHE_ALIAS, USER_STAMP_ALIAS, user_stamp_key
+from .blacklist import GENERATION_KEY, BlacklistIndex, BloomFilter, RefreshToken, get_blacklist_index, token_blacklisted
+from .models import User, UserBlockAudit
+from .passwords import PasswordVerifier
+from .provisioning import provision_users
+from .throttling import CacheBucketStore, LocalBucketStore, get_bucket_store
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        caches[USER_CACHE_ALIAS].clear()
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='Passw0rd!')
+        self.user = User.objects.create_user(email='user@example.com', password='Passw0rd!')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path)
+        user_queries = [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q['sql']]
+        return response, len(user_queries)
+
+    def test_repeat_requests_skip_user_lookup(self):
+        response, lookups = self.get('/api/tickets/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, 1)
+
+        response, lookups = self.get('/api/tickets/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, 0)
+
+    def test_blocking_takes_effect_immediately(self):
+        self.assertEqual(self.get('/auth/profile/')[0].status_code, 200)
+
+        admin = APIClient()
+        admin.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = admin.post(f'/auth/users/{self.user.pk}/block/')
+        self.assertEqual(response.status_code, 200)
+
+        response, _ = self.get('/auth/profile/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_role_change_evicts_cached_user(self):
+        self.assertEqual(self.get('/api/tickets/admin_stats/')[0].status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = 'admin'
+            self.user.is_staff = True
+            self.user.save()
+
+        response, lookups = self.get('/api/tickets/admin_stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, 1)
+
+    def worker(self, name):
+        # Each worker process has its own user cache; stamps are shared.
+        return override_settings(CACHES=dict(
+            settings.CACHES,
+            shared={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+            auth_users=dict(settings.CACHES[USER_CACHE_ALIAS], LOCATION=f'auth-users-{name}'),
+        ))
+
+    def block_in_other_worker(self, evict_stamp=False):
+        with self.worker('b'):
+            caches[USER_CACHE_ALIAS].clear()
+            caches[USER_STAMP_ALIAS].delete(user_stamp_key(self.user.pk))
+            self.assertEqual(self.get('/auth/profile/')[0].status_code, 200)
+            self.assertEqual(self.get('/auth/profile/')[1], 0)
+
+        with self.worker('a'):
+            admin = APIClient()
+            admin.force_authenticate(self.admin)
+            with self.captureOnCommitCallbacks(execute=True):
+                admin.post(f'/auth/users/{self.user.pk}/block/')
+            if evict_stamp:
+                caches[USER_STAMP_ALIAS].delete(user_stamp_key(self.user.pk))
+
+    def test_blocking_reaches_other_workers(self):
+        self.block_in_other_worker()
+        with self.worker('b'):
+            self.assertEqual(self.get('/auth/profile/')[0].status_code, 401)
+
+    def test_evicted_stamp_forces_a_reload(self):
+        self.block_in_other_worker(evict_stamp=True)
+        with self.worker('b'):
+            self.assertEqual(self.get('/auth/profile/')[0].status_code, 401)
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        'accounts.hashers.CalibratedScryptPasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ],
+    PASSWORD_HASHER_COST={'scrypt': {'work_factor': 2 ** 10}},
+)
+class LoginTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.user = User.objects.create_user(email='agent@example.com', password='Passw0rd!')
+        self.client = APIClient()
+
+    def login(self, email='agent@example.com', password='Passw0rd!'):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/auth/login/', {
+                'email': email, 'password': password, 'user_type': 'user'
+            }, format='json')
+        # Issuing the refresh token also records it for the blacklist.
+        return response, [q for q in ctx.captured_queries if '"accounts_user"' in q['sql']]
+
+    def test_login_looks_the_user_up_once(self):
+        response, queries = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json()['tokens'])
+        self.assertEqual(len(queries), 1)
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('Passw0rd!', hasher='md5'))
+
+        response, queries = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 2)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+
+        response, queries = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+    def test_rejects_bad_credentials(self):
+        self.assertEqual(self.login(password='wrong')[0].status_code, 400)
+        self.assertEqual(self.login(email='nobody@example.com')[0].status_code, 400)
+        self.user.is_blocked = True
+        self.user.save()
+        self.assertEqual(self.login()[0].status_code, 400)
+
+    def test_full_verifier_asks_clients_to_retry(self):
+        verifier = PasswordVerifier(workers=1, max_pending=0)
+        verifier.slots.acquire()
+        with mock.patch('accounts.serializers.get_password_verifier', return_value=verifier):
+            response, _ = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+@override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={
+    'login_ip': '5/min',
+    'login_account': '3/min',
+}))
+class ThrottleTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='Passw0rd!')
+        self.client = APIClient()
+
+    def login(self, email, ip):
+        return self.client.post('/auth/login/', {
+            'email': email, 'password': 'wrong', 'user_type': 'user'
+        }, format='json', REMOTE_ADDR=ip)
+
+    def test_account_limit_applies_across_ips(self):
+        for i in range(3):
+            self.assertEqual(self.login('Victim@example.com', f'10.0.0.{i}').status_code, 400)
+
+        with mock.patch('accounts.serializers.get_password_verifier') as verifier, \
+                CaptureQueriesContext(connection) as ctx:
+            response = self.login('victim@example.com ', '10.0.0.99')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Rejected before the user lookup and before any hashing.
+        self.assertEqual(len(ctx), 0)
+        verifier.assert_not_called()
+
+    def test_ip_limit_applies_across_accounts(self):
+        statuses = [self.login(f'user{i}@example.com', '10.0.0.1').status_code for i in range(6)]
+        self.assertEqual(statuses, [400] * 5 + [429])
+        self.assertEqual(self.login('user0@example.com', '10.0.0.2').status_code, 400)
+
+    def test_forwarded_for_does_not_reset_ip_limit(self):
+        statuses = [
+            self.client.post('/auth/login/', {
+                'email': f'user{i}@example.com', 'password': 'wrong', 'user_type': 'user'
+            }, format='json', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}').status_code
+            for i in range(6)
+        ]
+        self.assertEqual(statuses, [400] * 5 + [429])
+
+    def test_stats_are_staff_only(self):
+        self.login('user@example.com', '10.0.0.1')
+        self.client.force_authenticate(self.admin)
+        stats = self.client.get('/auth/throttle/stats/').json()
+        self.assertGreaterEqual(stats['login_ip']['allowed'], 1)
+        self.assertIn('throttled', stats['login_account'])
+
+        self.client.force_authenticate(User.objects.create_user(email='agent@example.com'))
+        self.assertEqual(self.client.get('/auth/throttle/stats/').status_code, 403)
+
+
+class BucketStoreTests(TestCase):
+    def drain(self, store, clock):
+        with mock.patch.object(type(store), 'now', lambda self: clock[0]):
+            return [store.take('bucket', interval=10, burst=3) for _ in range(4)]
+
+    def test_bucket_refills_one_token_per_interval(self):
+        clock = [1000.0]
+        for store in (LocalBucketStore(), CacheBucketStore()):
+            store.set('bucket', 0, 1)
+            self.assertEqual(self.drain(store, clock), [0, 0, 0, 10])
+            clock[0] += 10
+            self.assertEqual(self.drain(store, clock)[:2], [0, 10])
+            clock[0] += 100
+
+    def test_local_store_stays_bounded(self):
+        store = LocalBucketStore(max_keys=10)
+        for i in range(25):
+            store.take(f'ip-{i}', interval=1, burst=1)
+        self.assertLessEqual(len(store._tats), 10)
+
+
+class BlacklistIndexTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        get_blacklist_index().reset()
+        self.user = User.objects.create_user(email='user@example.com', password='Passw0rd!')
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/auth/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_unrevoked_tokens_skip_the_blacklist_query(self):
+        tokens = [RefreshToken.for_user(self.user) for _ in range(3)]
+        self.assertEqual(self.refresh(tokens[0]).status_code, 200)
+        with self.assertNumQueries(0):
+            for token in tokens:
+                self.assertEqual(self.refresh(token).status_code, 200)
+        self.assertGreaterEqual(get_blacklist_index().stats()['filtered'], 4)
+
+    def test_logout_revokes_the_token_in_a_warm_index(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/auth/logout/', {'refresh_token': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        # The second rejection is answered from the LRU.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_rows_written_elsewhere_are_picked_up(self):
+        index = BlacklistIndex(resync_seconds=3600)
+        revoked, kept = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        self.assertFalse(index.is_blacklisted(revoked['jti']))
+
+        # Another worker blacklists the token and bumps the shared generation.
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=revoked['jti']))
+        with self.captureOnCommitCallbacks(execute=True):
+            token_blacklisted()
+        self.assertTrue(index.is_blacklisted(revoked['jti']))
+        self.assertFalse(index.is_blacklisted(kept['jti']))
+
+        # Without the bump, the periodic resync catches it.
+        stale = BlacklistIndex(resync_seconds=0)
+        self.assertTrue(stale.is_blacklisted(revoked['jti']))
+
+    def test_bump_after_the_generation_was_evicted_forces_a_reload(self):
+        index = BlacklistIndex(resync_seconds=3600)
+        index.cache.delete(GENERATION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            token_blacklisted()
+        token = RefreshToken.for_user(self.user)
+        self.assertFalse(index.is_blacklisted(token['jti']))
+
+        # Evicted, then bumped again by the next blacklisting.
+        index.cache.delete(GENERATION_KEY)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        with self.captureOnCommitCallbacks(execute=True):
+            token_blacklisted()
+        self.assertTrue(index.is_blacklisted(token['jti']))
+
+    def test_process_local_generation_falls_back_to_the_database(self):
+        # The bump would reach only this process's cache, so every check queries.
+        index = BlacklistIndex(alias='default', resync_seconds=3600)
+        token = RefreshToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            self.assertFalse(index.is_blacklisted(token['jti']))
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertTrue(index.is_blacklisted(token['jti']))
+        self.assertEqual(index.stats()['loads'], 0)
+
+    def test_bloom_filter_false_positive_rate(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'in-{i}')
+        self.assertTrue(all(f'in-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'out-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class CompactTokenBlacklistTests(TestCase):
+    def test_deletes_only_expired_tokens_in_batches(self):
+        user = User.objects.create_user(email='user@example.com')
+        now = timezone.now()
+        for i in range(5):
+            expired = OutstandingToken.objects.create(
+                user=user, jti=f'expired-{i}', token='', expires_at=now - timedelta(hours=1)
+            )
+            if i % 2:
+                BlacklistedToken.objects.create(token=expired)
+        live = OutstandingToken.objects.create(
+            user=user, jti='live', token='', expires_at=now + timedelta(hours=1)
+        )
+        BlacklistedToken.objects.create(token=live)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('compact_token_blacklist', batch_size=2, stdout=out)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertIn('Deleted 5 expired outstanding and 2 blacklisted tokens.', out.getvalue())
+        self.assertIn(OutstandingToken._meta.db_table, out.getvalue())
+        table = OutstandingToken._meta.db_table
+        batches = [q for q in ctx.captured_queries if q['sql'].startswith(f'DELETE FROM "{table}"')]
+        self.assertEqual(len(batches), 3)
+
+
+class UserProvisioningTests(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='Passw0rd!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_csv_upload_creates_valid_rows_and_reports_the_rest(self):
+        upload = SimpleUploadedFile('users.csv', (
+            'email,password,role\n'
+            'New@Example.com,Passw0rd!,user\n'
+            'boss@example.com,Passw0rd!,admin\n'
+            'admin@example.com,Passw0rd!,user\n'
+            'new@example.com,Passw0rd!,user\n'
+            'not-an-email,short,owner\n'
+        ).encode(), content_type='text/csv')
+        response = self.client.post('/auth/users/bulk/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [4, 5, 6])
+        self.assertIn('already exists', errors[4]['email'][0])
+        self.assertIn('earlier in the import', errors[5]['email'][0])
+        self.assertEqual(sorted(errors[6]), ['email', 'password', 'role'])
+
+        boss = User.objects.get(email='boss@example.com')
+        self.assertTrue(boss.is_staff and boss.is_superuser)
+        self.assertTrue(User.objects.get(email='new@example.com').check_password('Passw0rd!'))
+
+    @override_settings(USER_IMPORT=dict(settings.USER_IMPORT, ENDPOINT_MAX_ROWS=2))
+    def test_endpoint_caps_rows_and_shares_one_pool(self):
+        users = [{'email': f'user{i}@example.com', 'password': 'Passw0rd!'} for i in range(3)]
+        response = self.client.post('/auth/users/bulk/', {'users': users}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('import_users', response.data['error'])
+        self.assertFalse(User.objects.filter(email__startswith='user').exists())
+
+        with mock.patch('accounts.views.provision_users', return_value={}) as provision:
+            for _ in range(2):
+                self.client.post('/auth/users/bulk/', {'users': users[:2]}, format='json')
+        pools = [call.kwargs['pool'] for call in provision.call_args_list]
+        self.assertIs(pools[0], pools[1])
+        self.assertEqual(pools[0].workers, settings.USER_IMPORT['ENDPOINT_HASH_WORKERS'])
+
+    def test_one_lookup_and_one_insert_per_batch(self):
+        rows = [(i, {'email': f'user{i}@example.com', 'password': 'Passw0rd!'}) for i in range(10)]
+        with CaptureQueriesContext(connection) as ctx:
+            report = provision_users(rows, batch_size=4, workers=1)
+        self.assertEqual(report, {'created': 10, 'failed': 0, 'errors': []})
+        user_queries = [q['sql'] for q in ctx.captured_queries if '"accounts_user"' in q['sql']]
+        self.assertEqual(len(user_queries), 6)
+
+    def test_json_rows_and_bad_requests(self):
+        response = self.client.post('/auth/users/bulk/', {'users': [
+            {'email': 'one@example.com', 'password': 'Passw0rd!'}, 'nonsense'
+        ]}, format='json')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+        upload = SimpleUploadedFile('users.csv', b'mail,secret\n', content_type='text/csv')
+        response = self.client.post('/auth/users/bulk/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/auth/users/bulk/', {}, format='json').status_code, 400)
+
+        self.client.force_authenticate(User.objects.create_user(email='agent@example.com'))
+        self.assertEqual(self.client.post('/auth/users/bulk/', {}, format='json').status_code, 403)
+
+    def test_import_command_hashes_on_worker_processes(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write('email,password\n')
+            for i in range(4):
+                csv_file.write(f'worker{i}@example.com,Passw0rd!\n')
+            csv_file.write('worker0@example.com,Passw0rd!\n')
+            csv_file.flush()
+
+            out = StringIO()
+            call_command('import_users', csv_file.name, '--dry-run', stdout=out)
+            self.assertIn('4 users would be created, 1 rows rejected', out.getvalue())
+            self.assertFalse(User.objects.filter(email__startswith='worker').exists())
+
+            out = StringIO()
+            call_command('import_users', csv_file.name, workers=2, stdout=out)
+        self.assertIn('row 6 (worker0@example.com)', out.getvalue())
+        self.assertEqual(User.objects.filter(email__startswith='worker').count(), 4)
+        self.assertTrue(User.objects.get(email='worker3@example.com').check_password('Passw0rd!'))
+
+
+class BulkBlockTests(TestCase):
+    def setUp(self):
+        caches[USER_CACHE_ALIAS].clear()
+        get_blacklist_index().reset()
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='Passw0rd!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def make_users(self, count, domain='example.com'):
+        users = User.objects.bulk_create(
+            User(email=f'user{i}@{domain}') for i in range(count)
+        )
+        for user in users:
+            RefreshToken.for_user(user)
+        return users
+
+    def block(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/auth/users/bulk-block/', data, format='json')
+
+    def test_query_count_does_not_grow_with_users(self):
+        few, many = self.make_users(2, 'few.com'), self.make_users(30, 'many.com')
+        counts = []
+        for users in (few, many):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.block(action='block', user_ids=[user.pk for user in users])
+            self.assertEqual(response.data['changed'], len(users))
+            self.assertEqual(response.data['tokens_revoked'], len(users))
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_blocking_revokes_tokens_and_is_idempotent(self):
+        user, bystander = self.make_users(2)
+        refresh = RefreshToken.for_user(user)
+        access = APIClient()
+        access.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(access.get('/auth/profile/').status_code, 200)
+
+        response = self.block(action='block', user_ids=[user.pk])
+        self.assertEqual(response.data['user_ids'], [user.pk])
+        self.assertEqual(response.data['tokens_revoked'], 2)
+        self.assertEqual(access.get('/auth/profile/').status_code, 401)
+        refreshed = self.client.post('/auth/refresh/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(refreshed.status_code, 401)
+        self.assertFalse(User.objects.get(pk=bystander.pk).is_blocked)
+
+        again = self.block(action='block', user_ids=[user.pk])
+        self.assertEqual((again.data['changed'], again.data['tokens_revoked']), (0, 0))
+        self.assertEqual(UserBlockAudit.objects.filter(actor=self.admin).count(), 2)
+
+    def test_filter_skips_superusers_and_the_actor(self):
+        self.make_users(3)
+        other_admin = User.objects.create_superuser(email='root@example.com')
+        response = self.block(action='block', filter={'email_domain': 'example.com'})
+        self.assertEqual(response.data['changed'], 3)
+        self.assertFalse(User.objects.get(pk=other_admin.pk).is_blocked)
+        self.assertFalse(User.objects.get(pk=self.admin.pk).is_blocked)
+
+        response = self.block(action='unblock', filter={'role': 'user'})
+        self.assertEqual(response.data['changed'], 3)
+        self.assertFalse(User.objects.filter(is_blocked=True).exists())
+        audit = UserBlockAudit.objects.first()
+        self.assertEqual((audit.action, audit.criteria), ('unblock', {'filter': {'role': 'user'}}))
+
+    def test_rejects_ambiguous_requests(self):
+        for data in ({'action': 'block'}, {'action': 'block', 'filter': {}},
+                     {'action': 'block', 'user_ids': [1], 'filter': {'role': 'user'}},
+                     {'action': 'ban', 'user_ids': [1]}):
+            self.assertEqual(self.block(**data).status_code, 400, data)
+
+    def test_single_block_revokes_tokens(self):
+        user, = self.make_users(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/auth/users/{user.pk}/block/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=user).count(), 1)
+        self.assertEqual(self.client.post(f'/auth/users/{self.admin.pk}/block/').status_code, 400)
+
+
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='Passw0rd!')
+        User.objects.bulk_create([
+            User(email='alice@example.com'),
+            User(email='albert@example.com', role='admin'),
+            User(email='bob@example.com'),
+            User(email='alfred@example.com', is_blocked=True),
+            User(email='alma@example.com', is_active=False),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def emails(self, **params):
+        response = self.client.get('/auth/users/list/', params)
+        self.assertEqual(response.status_code, 200)
+        return [user['email'] for user in response.data['results']]
+
+    def test_default_listing_and_filters(self):
+        self.assertEqual(self.emails(), ['albert@example.com', 'alice@example.com', 'bob@example.com'])
+        self.assertEqual(self.emails(email='AL'), ['albert@example.com', 'alice@example.com'])
+        self.assertEqual(self.emails(email='al', role='user'), ['alice@example.com'])
+        self.assertEqual(self.emails(is_blocked='true'), ['alfred@example.com'])
+        self.assertEqual(self.emails(is_active='false', email='al'), ['alma@example.com'])
+        self.assertEqual(self.emails(email='zed'), [])
+
+    def test_keyset_pages(self):
+        first = self.client.get('/auth/users/list/', {'page_size': 2}).data
+        self.assertEqual([user['email'] for user in first['results']], ['albert@example.com', 'alice@example.com'])
+        with self.assertNumQueries(1):
+            second = self.client.get(first['next']).data
+        self.assertEqual([user['email'] for user in second['results']], ['bob@example.com'])
+        self.assertIsNone(second['next'])
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.get(email='bob@example.com'))
+        self.assertEqual(self.client.get('/auth/users/list/').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/auth/users/list/').status_code, 401)
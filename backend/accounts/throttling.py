@@ -0,0 +1,203 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class BucketStore:
+    """
+    Holds one number per bucket: the GCRA "theoretical arrival time", i.e.
+    when the bucket will be full again. Subclasses implement ``now``, ``get``
+    and ``set``.
+    """
+
+    def now(self):
+        raise NotImplementedError
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, tat, ttl):
+        raise NotImplementedError
+
+    def take(self, key, interval, burst):
+        """
+        Take one token from a bucket holding ``burst`` tokens that refills one
+        every ``interval`` seconds. Returns 0 when a token was available,
+        otherwise the seconds until one will be.
+        """
+        now = self.now()
+        tat = max(self.get(key) or now, now) + interval
+        allowed_at = tat - burst * interval
+        if allowed_at > now:
+            return allowed_at - now
+        self.set(key, tat, tat - now)
+        return 0
+
+
+class LocalBucketStore(BucketStore):
+    """
+    Per-process buckets in a plain dict, with no lock on the request path.
+    Two threads racing on the same bucket can both take its last token, so
+    a bucket may briefly admit one extra request per racing thread. Expired
+    buckets are swept once ``max_keys`` is reached.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._tats = {}
+
+    def now(self):
+        return time.monotonic()
+
+    def get(self, key):
+        return self._tats.get(key)
+
+    def set(self, key, tat, ttl):
+        if len(self._tats) >= self.max_keys and key not in self._tats:
+            self._sweep()
+        self._tats[key] = tat
+
+    def _sweep(self):
+        now = self.now()
+        for key, tat in list(self._tats.items()):
+            if tat <= now:
+                self._tats.pop(key, None)
+        if len(self._tats) >= self.max_keys:
+            # Every bucket is live; forgetting them only loosens limits briefly.
+            self._tats.clear()
+
+    def clear(self):
+        self._tats.clear()
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Buckets in a Django cache alias shared by every worker (e.g. Redis).
+    Reads and writes are not one atomic step, so concurrent requests on the
+    same bucket from different workers can each take the last token.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def now(self):
+        return time.time()
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, tat, ttl):
+        self.cache.set(key, tat, timeout=max(1, int(ttl) + 1))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """The store configured by ``settings.THROTTLE_BUCKETS``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = getattr(settings, 'THROTTLE_BUCKETS', {})
+                backend = import_string(config.get('BACKEND', 'accounts.throttling.LocalBucketStore'))
+                _store = backend(**config.get('OPTIONS', {}))
+    return _store
+
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def _record(name, allowed):
+    with _counts_lock:
+        _counts[(name, 'allowed' if allowed else 'throttled')] += 1
+
+
+def throttle_stats():
+    """Allowed/throttled counts per rate name since this process started."""
+    with _counts_lock:
+        counts = dict(_counts)
+    stats = {}
+    for (name, outcome), count in sorted(counts.items()):
+        stats.setdefault(name, {'allowed': 0, 'throttled': 0})[outcome] = count
+    return stats
+
+
+def parse_rate(rate):
+    """``'5/min'`` -> ``(5, 60)``, as in DRF's DEFAULT_THROTTLE_RATES."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket limit keyed by ``get_key``. The rate is
+    ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['<view.throttle_scope>_<kind>']``
+    (e.g. ``login_ip``); scopes without a rate are not limited. The bucket
+    holds as many tokens as the rate allows per period.
+
+    DRF checks throttles before the view runs, so a rejected attempt costs
+    no query and no password hash.
+    """
+    kind = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}') if scope else None
+        if not rate:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+
+        num, period = parse_rate(rate)
+        name = f'{scope}_{self.kind}'
+        digest = hashlib.sha1(str(key).encode()).hexdigest()
+        wait = get_bucket_store().take(f'throttle:{name}:{digest}', period / num, num)
+        _record(name, not wait)
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AccountRateThrottle(TokenBucketThrottle):
+    """
+    Keyed by ``request.data[view.throttle_account_field]`` (normalized like
+    emails are at login) or, without that field, the authenticated user.
+    """
+    kind = 'account'
+
+    def get_key(self, request, view):
+        field = getattr(view, 'throttle_account_field', None)
+        if field:
+            value = request.data.get(field) if hasattr(request.data, 'get') else None
+            return str(value).lower().strip() if value else None
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
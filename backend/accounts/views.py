@@ -1,18 +1,29 @@
+import io
+from itertools import islice
+
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import LoginSerializer, UserSerializer
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from rest_framework import generics, permissions
-from .serializers import UserSerializer,BlockUserSerializer,UserCreatingSerializer,UserProfileSerializer
+from .serializers import UserSerializer,BulkBlockSerializer,UserCreatingSerializer,UserProfileSerializer
+from .blocking import set_blocked
+from .filters import UserDirectoryFilter
+from .blacklist import RefreshToken
 from .models import User
+from .passwords import VerifierBusy
+from .provisioning import get_endpoint_hash_pool, provision_users, read_csv
+from .throttling import AccountRateThrottle, IPRateThrottle, throttle_stats
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework.permissions import IsAdminUser
+from django_filters.rest_framework import DjangoFilterBackend
+from tickets.pagination import TicketCursorPagination
+from ticket_system.replicas import ReplicaReadMixin
 
 
 
@@ -21,6 +32,10 @@ User = get_user_model()
 # Create your views here.
 
 class LoginView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = 'login'
+    throttle_account_field = 'email'
+
     def post(self, request, *args, **kwargs):
         user_type = request.data.get('user_type')  # Make sure this matches frontend
 
@@ -49,12 +64,6 @@ class LoginView(APIView):
                     'error': f'Invalid user type. You are not authorized as {user_type}'
                 }, status=status.HTTP_403_FORBIDDEN)
 
-            if user.is_blocked:
-                return Response(
-                    {'error': 'You are blocked from logging in.'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
             refresh = RefreshToken.for_user(user)
             
             response_data = {
@@ -74,6 +83,12 @@ class LoginView(APIView):
             print("Login successful for user:", user.email)
             return Response(response_data, status=status.HTTP_200_OK)
 
+        except VerifierBusy:
+            return Response(
+                {'error': 'Too many logins in progress, please retry.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'}
+            )
         except Exception as e:
             print("Login error:", str(e))
             return Response(
@@ -94,6 +109,8 @@ class UserProfileView(generics.RetrieveAPIView):
 class UserCreateView(generics.CreateAPIView):
     serializer_class = UserCreatingSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = 'user_create'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -122,10 +139,69 @@ class UserCreateView(generics.CreateAPIView):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class UserListView(generics.ListAPIView):
-    queryset = User.objects.filter(is_blocked=False,is_active=True,is_superuser=False)
+class UserBulkCreateView(APIView):
+    """
+    Create many users in one request, from a CSV upload (``file``, with an
+    ``email,password[,role]`` header) or a JSON ``users`` list. Invalid rows
+    are reported by row number and skipped; the rest are created.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = 'user_bulk_create'
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            rows = read_csv(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        elif isinstance(request.data.get('users'), list):
+            rows = (
+                (number, row if isinstance(row, dict) else {})
+                for number, row in enumerate(request.data['users'], start=1)
+            )
+        else:
+            return Response(
+                {'error': 'Upload a CSV "file" or send a "users" list.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        config = getattr(settings, 'USER_IMPORT', {})
+        max_rows = config.get('ENDPOINT_MAX_ROWS', 1000)
+        try:
+            rows = list(islice(rows, max_rows + 1))
+            if len(rows) > max_rows:
+                return Response(
+                    {'error': f'At most {max_rows} users per request; use `manage.py import_users` for more.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            report = provision_users(
+                rows,
+                batch_size=config.get('BATCH_SIZE', 500),
+                pool=get_endpoint_hash_pool(),
+            )
+        except ValueError as e:
+            # A CSV without the required columns, or not UTF-8.
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class UserDirectoryPagination(TicketCursorPagination):
+    """Keyset pages of the user directory, in email order."""
+    ordering = 'email'
+
+
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    The admin user directory: keyset-paginated, ``?email=`` prefix search,
+    ``?role=``, ``?is_blocked=`` and ``?is_active=`` filters (active,
+    unblocked users by default). Superusers are never listed. Read from a
+    database replica when there is one.
+    """
+    queryset = User.objects.filter(is_superuser=False)
     serializer_class = UserSerializer
-    # permission_classes = [permissions.isAuthenticated]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserDirectoryFilter
+    pagination_class = UserDirectoryPagination
 
 
 class BlockUserView(APIView):
@@ -136,16 +212,55 @@ class BlockUserView(APIView):
             user = User.objects.get(id=user_id)
         except User.DoesNotExist:
             return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if user.pk == request.user.pk:
+            return Response({'detail': 'You cannot block yourself.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = BlockUserSerializer(user, data={'is_blocked': True}, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({'detail': 'User blocked successfully.'}, status=status.HTTP_200_OK)
+        # Also revokes the user's refresh tokens.
+        set_blocked(request.user, True, user_ids=[user.pk])
+        return Response({'detail': 'User blocked successfully.'}, status=status.HTTP_200_OK)
+
+
+class BulkBlockUsersView(APIView):
+    """
+    Block or unblock the users in ``user_ids``, or those matching ``filter``
+    (role, is_active, email_domain, joined_before), in one transaction.
+    Blocking also revokes their refresh tokens. Idempotent and audited.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkBlockSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        audit = set_blocked(
+            request.user,
+            data['action'] == 'block',
+            user_ids=data.get('user_ids'),
+            filters=data.get('filter'),
+        )
+        return Response({
+            'action': audit.action,
+            'changed': len(audit.user_ids),
+            'user_ids': audit.user_ids,
+            'tokens_revoked': audit.tokens_revoked,
+            'audit_id': audit.pk,
+        }, status=status.HTTP_200_OK)
     
 
+class ThrottleStatsView(APIView):
+    """Allowed/throttled counters per rate (this process only), for dashboards."""
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(throttle_stats())
+
+
 class RefreshTokenView(APIView):
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'refresh'
+
     def post(self, request):
         refresh_token = request.data.get('refresh')
         
@@ -0,0 +1,247 @@
+"""
+Read-replica routing (``settings.DATABASE_REPLICAS``).
+
+Views opt in with ReplicaReadMixin: their safe requests read from a
+healthy replica, picked round-robin once per request so that every query
+of a response sees the same snapshot. Everything else reads and writes the
+primary (``default``): other views, writes and the reads that follow them
+in the same request, migrations and management commands.
+
+Replicas lag behind the primary, so a user who has just written reads
+from the primary for ``STICKY_SECONDS`` afterwards. The router notes every
+write made while serving a request, and ReplicaRoutingMiddleware pins the
+request's user once the response is ready. Pins live in the
+``CACHE_ALIAS`` cache, which must be shared so that a write served by one
+worker pins reads served by the others; with replicas configured on a
+per-process cache, the router refuses to start.
+
+A replica that cannot be connected to, or that is more than
+``MAX_LAG_SECONDS`` behind (checked at most every ``CHECK_SECONDS``), is
+skipped for ``RETRY_SECONDS``. With no healthy replica, reads fall back to
+the primary.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'db:pinned:{}'
+
+# Replication lag in seconds; 0 while the replica has replayed everything it received.
+LAG_SQL = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+
+def replica_settings():
+    config = getattr(settings, 'DATABASE_REPLICAS', {})
+    return {
+        'ALIASES': config.get('ALIASES', []),
+        'STICKY_SECONDS': config.get('STICKY_SECONDS', 5),
+        'RETRY_SECONDS': config.get('RETRY_SECONDS', 30),
+        'CHECK_SECONDS': config.get('CHECK_SECONDS', 5),
+        'MAX_LAG_SECONDS': config.get('MAX_LAG_SECONDS', 10),
+        'CACHE_ALIAS': config.get('CACHE_ALIAS', 'shared'),
+    }
+
+
+class RequestState:
+    """What the router has learned about the request being served."""
+    __slots__ = ('replica_reads', 'replica', 'wrote')
+
+    def __init__(self):
+        self.replica_reads = False
+        self.replica = None
+        self.wrote = False
+
+
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class ReplicaSet:
+    """
+    Round-robin over the replica aliases that are up. Health is tracked per
+    process: a replica that fails a check is skipped until
+    ``retry_seconds`` have passed, then tried again.
+    """
+
+    def __init__(self, aliases, retry_seconds=30, check_seconds=5, max_lag_seconds=10):
+        self.aliases = list(aliases)
+        self.retry_seconds = retry_seconds
+        self.check_seconds = check_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._down_until = {}
+        self._checked_at = {}
+        self._stats = {'replica_reads': 0, 'primary_fallbacks': 0, 'failovers': 0}
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            down = sorted(alias for alias, until in self._down_until.items() if until > now)
+            return dict(self._stats, down=down)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def choose(self):
+        """A healthy replica alias, or None to use the primary."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [alias for alias in self.aliases if self._down_until.get(alias, 0) <= now]
+            start = next(self._turn)
+        for i in range(len(candidates)):
+            alias = candidates[(start + i) % len(candidates)]
+            if self.check(alias, now):
+                self._count('replica_reads')
+                return alias
+        self._count('primary_fallbacks')
+        return None
+
+    def check(self, alias, now):
+        connection = connections[alias]
+        with self._lock:
+            due = now - self._checked_at.get(alias, float('-inf')) >= self.check_seconds
+            if due:
+                self._checked_at[alias] = now
+        try:
+            if connection.connection is None or not connection.is_usable():
+                connection.close()
+                connection.ensure_connection()
+            if due and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(LAG_SQL)
+                    if cursor.fetchone()[0] > self.max_lag_seconds:
+                        raise DatabaseError(f'{alias} is lagging.')
+        except DatabaseError:
+            self.mark_down(alias, now)
+            return False
+        return True
+
+    def mark_down(self, alias, now=None):
+        with self._lock:
+            self._down_until[alias] = (now or time.monotonic()) + self.retry_seconds
+            self._stats['failovers'] += 1
+
+
+class ReplicaRouter:
+    """Send opted-in reads to a replica (see the module docstring); everything else to ``default``."""
+
+    def __init__(self):
+        config = replica_settings()
+        if config['ALIASES'] and isinstance(caches[config['CACHE_ALIAS']], (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                f"DATABASE_REPLICAS['CACHE_ALIAS'] ({config['CACHE_ALIAS']!r}) is a per-process cache; "
+                'read-your-writes pins need a cache shared by every worker.'
+            )
+        self.replicas = ReplicaSet(
+            config['ALIASES'],
+            retry_seconds=config['RETRY_SECONDS'],
+            check_seconds=config['CHECK_SECONDS'],
+            max_lag_seconds=config['MAX_LAG_SECONDS'],
+        )
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or not state.replica_reads:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = self.replicas.choose() or DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+            # The rest of this request must see its own write.
+            state.replica_reads = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+
+def pin_to_primary(user_id):
+    config = replica_settings()
+    caches[config['CACHE_ALIAS']].set(PIN_KEY.format(user_id), 1, config['STICKY_SECONDS'])
+
+
+def is_pinned(user_id):
+    return caches[replica_settings()['CACHE_ALIAS']].get(PIN_KEY.format(user_id)) is not None
+
+
+class ReplicaReadMixin:
+    """
+    For DRF views whose safe requests may read from a replica;
+    ``replica_actions`` limits a viewset to some of its actions. Users
+    pinned by a recent write keep reading the primary.
+    """
+    replica_actions = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _request_state.get()
+        if state is None or request.method not in SAFE_METHODS:
+            return
+        if self.replica_actions is not None and getattr(self, 'action', None) not in self.replica_actions:
+            return
+        user = request.user
+        if user.is_authenticated and is_pinned(user.pk):
+            return
+        state.replica_reads = True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Gives each request its routing state, and pins the user to the primary
+    after a request that wrote. DRF sets ``request.user`` on the underlying
+    request once it has authenticated, so the user is known by then.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Build the routers with the application, so that ReplicaRouter's
+        # configuration errors stop the server starting.
+        router.routers
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState()
+        token = _request_state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_state.reset(token)
+            self.pin(request, state)
+
+    async def __acall__(self, request):
+        state = RequestState()
+        token = _request_state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+            self.pin(request, state)
+
+    def pin(self, request, state):
+        user = getattr(request, 'user', None)
+        if state.wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
+from tempfile import gettempdir
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -67,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ticket_system.replicas.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'ticket_system.urls'
@@ -91,6 +94,14 @@ WSGI_APPLICATION = 'ticket_system.wsgi.application'
 
 
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before
+# reuse. Django 5.0 has no connection pool of its own; put pgbouncer in
+# front of PostgreSQL when workers outnumber what the server's
+# max_connections allows. Prefer session pooling. Under transaction pooling
+# set DB_TRANSACTION_POOLING=True: it turns off the named server-side
+# cursors that QuerySet.iterator() uses (e.g. the ticket export), which a
+# transaction pooler breaks. iterator() then receives each query's whole
+# result at once, so exports are no longer streamed from the database.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -99,9 +110,38 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_TRANSACTION_POOLING', default=False, cast=bool),
     }
 }
 
+# Streaming read replicas of the default database, one per host in
+# DB_REPLICA_HOSTS (host or host:port, comma separated). Tests read the
+# primary through them.
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+for number, replica_host in enumerate(DB_REPLICA_HOSTS, 1):
+    host, _, port = replica_host.partition(':')
+    DATABASES[f'replica{number}'] = dict(
+        DATABASES['default'], HOST=host, PORT=port or DATABASES['default']['PORT'], TEST={'MIRROR': 'default'}
+    )
+
+# Safe reads of the views using ticket_system.replicas.ReplicaReadMixin go to
+# a healthy replica. A user who wrote reads the primary for STICKY_SECONDS
+# after; pins live in CACHE_ALIAS, which must be shared between workers
+# (the router raises ImproperlyConfigured on a per-process cache). A
+# replica that fails to connect, or lags more than MAX_LAG_SECONDS (checked
+# every CHECK_SECONDS), is skipped for RETRY_SECONDS.
+DATABASE_ROUTERS = ['ticket_system.replicas.ReplicaRouter']
+DATABASE_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': 5,
+    'RETRY_SECONDS': 30,
+    'CHECK_SECONDS': 5,
+    'MAX_LAG_SECONDS': 10,
+    'CACHE_ALIAS': 'shared',
+}
+
 
 
 
@@ -124,6 +164,43 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# New hashes use Argon2 when argon2-cffi is installed and scrypt otherwise;
+# PBKDF2 stays last so existing hashes verify and are upgraded at login.
+# Run `manage.py calibrate_password_hasher` on production hardware to pick
+# PASSWORD_HASHER_COST.
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.CalibratedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+]
+if find_spec('argon2') is not None:
+    PASSWORD_HASHERS.insert(0, 'accounts.hashers.CalibratedArgon2PasswordHasher')
+
+PASSWORD_HASHER_COST = {
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    'argon2': {'time_cost': 2, 'memory_cost': 102400, 'parallelism': 8},
+}
+
+# Login hashing runs on a bounded thread pool (accounts.passwords); WORKERS
+# defaults to the CPU count. Logins beyond MAX_PENDING get a 503.
+PASSWORD_VERIFIER = {
+    'WORKERS': None,
+    'MAX_PENDING': 256,
+}
+
+# Bulk user provisioning (accounts.provisioning): rows per validation and
+# INSERT batch, and processes hashing passwords for `manage.py import_users`
+# (default: one per CPU). The endpoint takes at most ENDPOINT_MAX_ROWS rows
+# per request and hashes on one pool of ENDPOINT_HASH_WORKERS processes per
+# server process, shared by concurrent uploads.
+USER_IMPORT = {
+    'BATCH_SIZE': 500,
+    'HASH_WORKERS': None,
+    'ENDPOINT_HASH_WORKERS': 2,
+    'ENDPOINT_MAX_ROWS': 1000,
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -147,10 +224,58 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # State every worker process must see: auth user stamps, the token
+    # blacklist generation, replica read pins. Redis at REDIS_URL (needs the
+    # redis package) when set; otherwise files under SHARED_CACHE_DIR, which
+    # only the workers of one host share. FileBasedCache leaves expired files
+    # until they are read and, at MAX_ENTRIES (300 by default), deletes a
+    # random third of them, live or not; the high limit keeps culls rare. A
+    # culled stamp or blacklist generation only forces a reload, and a culled
+    # read pin sends that user's reads to a replica early.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('SHARED_CACHE_DIR', default=str(Path(gettempdir()) / 'ticket_system_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Users resolved from access tokens (accounts.authentication), per
+    # process. Each hit is checked against the user's stamp in 'shared',
+    # which every save, block or role change replaces, so changes reach all
+    # workers on their next request; the timeout only bounds memory.
+    'auth_users': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
+    # Reverse proxies in front of the app. The client IP that throttles key
+    # on is REMOTE_ADDR when 0; with N proxies, it is the address the
+    # outermost one saw, taken from X-Forwarded-For. Never leave it unset:
+    # DRF would then key on the whole client-supplied header.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Token-bucket limits for the auth routes (accounts.throttling), keyed
+    # '<view throttle_scope>_<ip|account>'.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_account': '5/min',
+        'refresh_ip': '60/min',
+        'user_create_ip': '30/min',
+        'user_create_account': '30/min',
+        'user_bulk_create_account': '10/hour',
+    },
     # 'DEFAULT_PERMISSION_CLASSES': [
     #     'rest_framework.permissions.IsAuthenticated',
     # ],
@@ -159,6 +284,94 @@ REST_FRAMEWORK = {
     # ],
 }
 
+# Versioned response cache for ticket list/detail reads (tickets.cache).
+# The local-memory LRU is only correct with a single worker process; point
+# BACKEND at 'tickets.cache.DjangoCache' with OPTIONS {'alias': ...} on a
+# shared cache (e.g. Redis) for multi-process deployments.
+TICKET_CACHE = {
+    'BACKEND': 'tickets.cache.LocMemLRUCache',
+    'OPTIONS': {
+        'max_entries': 1024,
+        'max_bytes': 32 * 1024 * 1024,
+        'timeout': 300,
+    },
+}
+
+# Change feed at /api/tickets/events/ (tickets.feed), served over ASGI.
+# The in-process broker only reaches clients connected to the same worker;
+# multi-worker deployments need a broker that relays through a shared
+# channel (see tickets.feed.BaseBroker).
+TICKET_FEED = {
+    'BACKEND': 'tickets.feed.InProcessBroker',
+    'OPTIONS': {
+        'max_pending': 100,
+    },
+}
+
+# Archival of resolved tickets (tickets.archive, `manage.py archive_tickets`):
+# resolved tickets untouched for AFTER_DAYS (at least 31) move to the archive
+# table, BATCH_SIZE per transaction.
+TICKET_ARCHIVE = {
+    'AFTER_DAYS': 90,
+    'BATCH_SIZE': 1000,
+}
+
+# Daily ticket flow rollup behind /api/tickets/timeseries/ (tickets.rollups).
+# `manage.py compact_ticket_rollups` (run nightly) recomputes the last
+# COMPACT_DAYS days from the tickets.
+TICKET_ROLLUPS = {
+    'COMPACT_DAYS': 35,
+}
+
+# SLA deadlines (tickets.sla; targets are Ticket.SLA_TARGETS). Tickets due
+# within AT_RISK_MINUTES are "at risk"; `manage.py sweep_sla_breaches` (run
+# every minute) flags breaches SWEEP_BATCH_SIZE per transaction.
+TICKET_SLA = {
+    'AT_RISK_MINUTES': 60,
+    'SWEEP_BATCH_SIZE': 1000,
+}
+
+# Monthly range partitioning of the ticket table on created_at (PostgreSQL
+# 13+ only; tickets.partitions). When enabled, migration 0010 converts the
+# table online; `manage.py partition_tickets` (run daily from cron) keeps
+# MONTHS_AHEAD months of partitions ready.
+TICKET_PARTITIONING = {
+    'ENABLED': config('TICKET_PARTITIONING', default=False, cast=bool),
+    'MONTHS_AHEAD': 3,
+}
+
+# Serve ticket list/detail/stats reads from tickets.async_views. Only worth
+# enabling under an ASGI server; under WSGI each async view gets its own loop.
+TICKET_ASYNC_READS = config('TICKET_ASYNC_READS', default=False, cast=bool)
+
+# Where throttle buckets live. LocalBucketStore is per process; use
+# 'accounts.throttling.CacheBucketStore' with OPTIONS {'alias': ...} on a
+# shared cache to enforce limits across workers.
+THROTTLE_BUCKETS = {
+    'BACKEND': 'accounts.throttling.LocalBucketStore',
+    'OPTIONS': {
+        'max_keys': 100000,
+    },
+}
+
+# Refresh-token blacklist checks (accounts.blacklist). Each process keeps a
+# Bloom filter of revoked jtis and reloads it when the generation number in
+# the cache `alias` changes, so a logout in one worker reaches the others on
+# their next check. The alias must be shared between workers: on a
+# per-process cache (LocMemCache) the filter is skipped and every check
+# queries the database. Expired rows are removed by
+# `manage.py compact_token_blacklist`.
+TOKEN_BLACKLIST = {
+    'BACKEND': 'accounts.blacklist.BlacklistIndex',
+    'OPTIONS': {
+        'alias': 'shared',
+        'capacity': 100000,
+        'error_rate': 0.01,
+        'lru_size': 10000,
+        'resync_seconds': 60,
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
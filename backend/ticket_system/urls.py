@@ -14,10 +14,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path,include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from tickets.views import TicketViewSet
+from tickets import async_views
+from tickets.views import TicketViewSet, ticket_events
 # Create a router and register our viewset
 router = DefaultRouter()
 router.register(r'tickets', TicketViewSet, basename='ticket')
@@ -25,5 +27,21 @@ router.register(r'tickets', TicketViewSet, basename='ticket')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/',include('accounts.urls')),
+    # Ahead of the router, whose detail route would otherwise match "events".
+    path('api/tickets/events/', ticket_events, name='ticket-events'),
     path('api/', include(router.urls)),
-]
\ No newline at end of file
+]
+
+if settings.TICKET_ASYNC_READS:
+    # Serve ticket reads from the async views, ahead of the router's routes.
+    # Numeric pks only, so the router still gets the list-level actions.
+    urlpatterns[-1:-1] = [
+        path('api/tickets/', async_views.reads_or(
+            async_views.ticket_list, {'get': 'list', 'post': 'create'}
+        )),
+        path('api/tickets/stats/', async_views.ticket_stats),
+        path('api/tickets/admin_stats/', async_views.ticket_admin_stats),
+        re_path(r'^api/tickets/(?P<pk>[0-9]+)/$', async_views.reads_or(async_views.ticket_detail, {
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+        })),
+    ]
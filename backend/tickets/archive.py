@@ -0,0 +1,95 @@
+"""
+Archival tiering: old resolved tickets leave the hot tickets_ticket table.
+
+``archive_resolved`` moves resolved tickets last updated more than
+``after_days`` ago into ArchivedTicket, ``batch_size`` at a time. Each
+batch is one short transaction (a locking SELECT of the ids, one
+INSERT ... SELECT into the archive and one DELETE), so a ticket is never
+in both tables or in neither, and live writes are only blocked for one
+batch. The stats counters are left alone: they count archived tickets too,
+and a resolved ticket never changes bucket.
+
+TicketViewSet reads the archive on ``?include_archived=1`` and when a
+retrieve misses the hot table.
+"""
+import time
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import DateTimeField, Value
+from django.utils import timezone
+
+from .cache import invalidate_on_commit
+from .models import ArchivedTicket, Ticket
+
+# admin_stats joins the resolutions of the last 30 days to their tickets in
+# tickets_ticket, so those must stay hot.
+MIN_AFTER_DAYS = 31
+
+FIELDS = [
+    'id', 'title', 'description', 'created_at', 'updated_at',
+    'created_by', 'assigned_to', 'priority', 'status', 'search_vector',
+]
+
+
+def archivable(after_days, now=None):
+    """Resolved tickets last updated more than ``after_days`` ago, oldest first."""
+    if after_days < MIN_AFTER_DAYS:
+        raise ValueError(f'Tickets must be at least {MIN_AFTER_DAYS} days old to be archived.')
+    cutoff = (now or timezone.now()) - timedelta(days=after_days)
+    return Ticket.objects.filter(status='resolved', updated_at__lt=cutoff).order_by('updated_at', 'id')
+
+
+def _copy(ids, now):
+    """Copy tickets ``ids`` into the archive with one INSERT ... SELECT."""
+    db = router.db_for_write(ArchivedTicket)
+    rows = (
+        Ticket.objects.using(db)
+        .filter(pk__in=ids)
+        .annotate(archived_at=Value(now, output_field=DateTimeField()))
+        .order_by()
+        .values_list(*[Ticket._meta.get_field(name).attname for name in FIELDS], 'archived_at')
+    )
+    connection = connections[db]
+    sql, params = rows.query.get_compiler(connection=connection).as_sql()
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(ArchivedTicket._meta.get_field(name).column) for name in FIELDS + ['archived_at']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(ArchivedTicket._meta.db_table)} ({columns}) {sql}', params
+        )
+
+
+def archive_batch(queryset, batch_size):
+    """Move the first ``batch_size`` tickets of ``queryset``. Returns how many moved."""
+    with transaction.atomic():
+        # Concurrent archivers skip each other's batches instead of
+        # copying the same tickets twice.
+        batch = list(
+            queryset.select_for_update(skip_locked=True).values_list('pk', 'created_by_id')[:batch_size]
+        )
+        if not batch:
+            return 0
+        ids = [pk for pk, _ in batch]
+        _copy(ids, timezone.now())
+        Ticket.objects.filter(pk__in=ids).delete()
+        for owner_id in {owner_id for _, owner_id in batch}:
+            invalidate_on_commit(owner_id)
+    return len(batch)
+
+
+def archive_resolved(after_days, batch_size=1000, pause=0.0):
+    """
+    Archive every ticket ``archivable(after_days)`` selects, in batches.
+    Yields the size of each batch as it commits.
+    """
+    queryset = archivable(after_days)
+    while True:
+        moved = archive_batch(queryset, batch_size)
+        if not moved:
+            return
+        yield moved
+        if pause:
+            time.sleep(pause)
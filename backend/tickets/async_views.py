@@ -0,0 +1,151 @@
+"""
+Async-native ticket reads for ASGI deployments (``settings.TICKET_ASYNC_READS``).
+
+``list``, ``retrieve``, ``stats`` and ``admin_stats`` run their queries
+through Django's async ORM and share everything else (authentication,
+permissions, filtering, pagination, serializers, ETags and the response
+cache) with TicketViewSet. Writes and the other actions on the same URLs
+still go to the viewset.
+
+Django 5.0's database backends are synchronous, so the async ORM still
+hands each query to a worker thread; what these views avoid is holding a
+thread for the whole request. ``benchmark_async_reads`` measures the
+difference against the sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.response import Response
+
+from .cache import acached_response
+from .etags import aconditional_response, aqueryset_etag, aqueryset_state, state_etag
+from .models import ArchivedTicket, Ticket
+from .pagination import TicketCursorPagination
+from .stats import aadmin_ticket_stats, aticket_stats, counters_for, events_for
+from .views import TicketViewSet
+
+
+async def _dispatch(request, action, handler, detail=False, **kwargs):
+    """The parts of ``APIView.dispatch`` a read needs, with ``handler`` awaited."""
+    view = TicketViewSet(
+        basename='ticket', detail=detail, action_map={'get': action},
+        args=(), kwargs=kwargs, format_kwarg=None
+    )
+    view.request = request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    try:
+        # Authentication may hit the database; permissions read request.user.
+        await sync_to_async(view.initial)(request, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            raise MethodNotAllowed(request.method)
+        response = await handler(view, request)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    return view.finalize_response(request, response)
+
+
+async def _filtered(view, queryset):
+    # Filter backends can validate lookups against the database.
+    return await sync_to_async(view.filter_queryset)(queryset)
+
+
+async def _list(view, request):
+    queryset = await _filtered(view, view.get_queryset())
+    paginator = view.paginator
+    extra = ()
+    if view.include_archived:
+        if not isinstance(paginator, TicketCursorPagination):
+            raise ValidationError({'include_archived': ['Requires cursor pagination.']})
+        archived = await _filtered(view, view.get_archive_queryset())
+        state = await aqueryset_state(archived)
+        extra = (state['last_update'], state['count'])
+
+    async def render():
+        if view.include_archived:
+            page = await paginator.apaginate_querysets([queryset, archived], request, view)
+        elif isinstance(paginator, TicketCursorPagination):
+            page = await paginator.apaginate_queryset(queryset, request, view)
+        else:
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+        return paginator.get_paginated_response(view.get_serializer(page, many=True).data)
+
+    etag = await aqueryset_etag(request, queryset, *extra)
+    return await aconditional_response(
+        request, etag, lambda: acached_response(request, 'list', render, etag=etag)
+    )
+
+
+async def _retrieve(view, request):
+    pk = view.kwargs['pk']
+    state = await aqueryset_state(view.get_queryset().filter(pk=pk))
+    archived = not state['count']
+    if archived:
+        state = await aqueryset_state(view.get_archive_queryset().filter(pk=pk))
+
+    async def render():
+        queryset = view.get_archive_queryset() if archived else view.get_queryset()
+        try:
+            ticket = await (await _filtered(view, queryset)).aget(pk=pk)
+        except (Ticket.DoesNotExist, ArchivedTicket.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        view.check_object_permissions(request, ticket)
+        return Response(view.get_serializer(ticket).data)
+
+    etag = state_etag(request, state)
+    return await aconditional_response(
+        request, etag, lambda: acached_response(request, 'retrieve', render, pk=pk, etag=etag)
+    )
+
+
+async def _stats(view, request):
+    async def render():
+        return Response(await aticket_stats(counters_for(request.user)))
+
+    etag = await aqueryset_etag(request, view.get_queryset())
+    return await aconditional_response(request, etag, render)
+
+
+async def _admin_stats(view, request):
+    user = request.user
+    if not user.is_staff:
+        return Response({"error": "Not authorized"}, status=403)
+
+    async def render():
+        return Response(await aadmin_ticket_stats(counters_for(user), events_for(user)))
+
+    # The 30 day windows move daily, so today's date is part of the tag.
+    etag = await aqueryset_etag(request, view.get_queryset(), timezone.localdate())
+    return await aconditional_response(request, etag, render)
+
+
+async def ticket_list(request):
+    return await _dispatch(request, 'list', _list)
+
+
+async def ticket_detail(request, pk):
+    return await _dispatch(request, 'retrieve', _retrieve, detail=True, pk=pk)
+
+
+async def ticket_stats(request):
+    return await _dispatch(request, 'stats', _stats)
+
+
+async def ticket_admin_stats(request):
+    return await _dispatch(request, 'admin_stats', _admin_stats)
+
+
+def reads_or(async_view, actions):
+    """
+    Route GET/HEAD to ``async_view`` and every other method to the
+    TicketViewSet ``actions`` that normally serve the URL.
+    """
+    sync_view = TicketViewSet.as_view(actions, basename='ticket')
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+    return view
@@ -0,0 +1,175 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from accounts.models import User
+from . import counters, events, feed, sla
+from .cache import invalidate_on_commit
+from .models import Ticket
+from .serializers import TicketSerializer
+
+RESOLVED_MESSAGE = 'This ticket is already resolved and cannot be edited.'
+
+
+def _preload_users(items):
+    """One query for every assignee referenced by ``items``."""
+    ids = set()
+    for item in items:
+        value = item.get('assigned_to') if isinstance(item, dict) else None
+        if value not in (None, ''):
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                pass
+    return User.objects.in_bulk(ids)
+
+
+def _error(index, errors, pk=None):
+    result = {'index': index, 'status': 'error', 'errors': errors}
+    if pk is not None:
+        result['id'] = pk
+    return result
+
+
+def _invalidate(tickets):
+    for owner_id in {ticket.created_by_id for ticket in tickets}:
+        invalidate_on_commit(owner_id)
+
+
+def bulk_create(serializer, user):
+    """
+    Validate every item of a ``TicketSerializer(many=True)`` on its own and
+    insert the valid ones with a single ``bulk_create``.
+    """
+    items = serializer.initial_data
+    child = serializer.child
+    child.context['users'] = _preload_users(items)
+
+    results, tickets = [], []
+    for index, item in enumerate(items):
+        try:
+            data = child.run_validation(item)
+        except serializers.ValidationError as exc:
+            results.append(_error(index, exc.detail))
+            continue
+        ticket = Ticket(created_by=user, **data)
+        # bulk_create() bypasses Ticket.save().
+        ticket.refresh_due_at()
+        tickets.append((index, ticket))
+
+    with transaction.atomic():
+        created = Ticket.objects.bulk_create([ticket for _, ticket in tickets])
+        after = [counters.bucket(ticket) for ticket in created]
+        counters.record_bulk([], after)
+        events.record(events.created(created, user))
+        _invalidate(created)
+        feed.publish_on_commit('created', feed.bucket_changes(created, [None] * len(created), after))
+
+    results.extend(
+        {'index': index, 'id': ticket.pk, 'status': 'created'}
+        for index, ticket in tickets
+    )
+    return sorted(results, key=lambda result: result['index'])
+
+
+def bulk_update(queryset, items, context):
+    """
+    Partially update many tickets: one locking SELECT for the whole batch,
+    per-item validation, and a single ``bulk_update``. Resolved tickets stay
+    immutable.
+    """
+    context = dict(context, users=_preload_users(items))
+    ids = [item.get('id') for item in items if isinstance(item, dict)]
+
+    results, changed, before, previous, fields = [], [], [], [], set()
+    with transaction.atomic():
+        tickets = queryset.select_related(None).select_for_update().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        seen = set()
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            ticket = tickets.get(pk) if isinstance(pk, int) else None
+            if ticket is None:
+                results.append(_error(index, {'id': ['Not found.']}, pk))
+                continue
+            if pk in seen:
+                results.append(_error(index, {'id': ['Duplicate id in request.']}, pk))
+                continue
+            seen.add(pk)
+            if ticket.status == 'resolved':
+                results.append(_error(index, {'status': [RESOLVED_MESSAGE]}, pk))
+                continue
+
+            serializer = TicketSerializer(ticket, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                results.append(_error(index, serializer.errors, pk))
+                continue
+
+            before.append(counters.bucket(ticket))
+            previous.append(events.snapshot(ticket))
+            for attr, value in serializer.validated_data.items():
+                setattr(ticket, attr, value)
+                fields.add(attr)
+            if ticket.refresh_due_at():
+                fields.update(('due_at', 'sla_breached_at'))
+            changed.append(ticket)
+            results.append({'index': index, 'id': pk, 'status': 'updated'})
+
+        if changed:
+            now = timezone.now()
+            for ticket in changed:
+                ticket.updated_at = now
+            Ticket.objects.bulk_update(changed, sorted(fields | {'updated_at'}), batch_size=500)
+            after = [counters.bucket(ticket) for ticket in changed]
+            counters.record_bulk(before, after)
+            events.record(events.updated(changed, previous, context['request'].user, now))
+            _invalidate(changed)
+            feed.publish_on_commit('updated', feed.bucket_changes(changed, before, after))
+    return results
+
+
+def bulk_transition(queryset, ids, status, actor=None):
+    """
+    Move many tickets to ``status`` with one locking SELECT and one
+    ``UPDATE ... WHERE id IN (...)``. Resolved tickets are left untouched.
+    """
+    results = {}
+    with transaction.atomic():
+        tickets = list(
+            queryset.select_related(None).select_for_update().filter(pk__in=ids).only(
+                'id', 'title', 'created_by', 'assigned_to', 'status', 'priority', 'created_at'
+            )
+        )
+        movable = []
+        for ticket in tickets:
+            if ticket.status == 'resolved':
+                results[ticket.pk] = {'id': ticket.pk, 'status': 'error', 'errors': {'status': [RESOLVED_MESSAGE]}}
+            elif ticket.status == status:
+                results[ticket.pk] = {'id': ticket.pk, 'status': 'unchanged'}
+            else:
+                movable.append(ticket)
+                results[ticket.pk] = {'id': ticket.pk, 'status': 'updated'}
+
+        if movable:
+            before = [counters.bucket(ticket) for ticket in movable]
+            previous = [events.snapshot(ticket) for ticket in movable]
+            now = timezone.now()
+            # Every move changes which SLA deadline is ticking.
+            Ticket.objects.filter(pk__in=[ticket.pk for ticket in movable]).update(
+                status=status, updated_at=now, due_at=sla.due_at_expression(status), sla_breached_at=None
+            )
+            for ticket in movable:
+                ticket.status = status
+                ticket.updated_at = now
+                ticket.due_at, ticket.sla_breached_at = ticket.sla_due_at(), None
+            after = [counters.bucket(ticket) for ticket in movable]
+            counters.record_bulk(before, after)
+            events.record(events.updated(movable, previous, actor, now))
+            _invalidate(movable)
+            feed.publish_on_commit('updated', feed.bucket_changes(movable, before, after))
+
+    return [
+        results.get(pk, {'id': pk, 'status': 'error', 'errors': {'id': ['Not found.']}})
+        for pk in ids
+    ]
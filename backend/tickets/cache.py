@@ -0,0 +1,239 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+
+GLOBAL_VERSION_KEY = 'tickets:version:all'
+OWNER_VERSION_KEY = 'tickets:version:owner:{}'
+
+
+class BaseResponseCache:
+    """
+    Storage for cached ticket responses and their version counters. Values
+    are pickled so callers can never mutate what is cached. Subclasses
+    implement ``_get``, ``_set``, the version methods and ``clear``;
+    hit/miss/eviction counters live here.
+    """
+
+    def __init__(self, timeout=300):
+        self.timeout = timeout
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0}
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def get(self, key):
+        raw = self._get(key)
+        if raw is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        self._count('sets')
+        self._set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, raw):
+        raise NotImplementedError
+
+    def get_version(self, key):
+        raise NotImplementedError
+
+    def incr_version(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LocMemLRUCache(BaseResponseCache):
+    """
+    Process-local LRU bounded by entry count and total pickled size.
+
+    Versions live in the same process, so this is only correct with a single
+    worker process; multi-process deployments should use DjangoCache on a
+    shared (e.g. Redis) cache.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, timeout=300):
+        super().__init__(timeout)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, raw)
+        self._versions = {}
+        self._bytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                return None
+            self._data.move_to_end(key)
+            return raw
+
+    def _set(self, key, raw):
+        if len(raw) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (time.monotonic() + self.timeout, raw)
+            self._bytes += len(raw)
+            evicted = 0
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._discard(oldest)
+                evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+
+    def _discard(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def get_version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def incr_version(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+
+class DjangoCache(BaseResponseCache):
+    """
+    Stores responses in a Django cache alias, e.g. one configured with
+    ``django.core.cache.backends.redis.RedisCache``. Version counters use
+    the cache's atomic ``incr`` and never expire; if one is evicted anyway
+    it is re-seeded from the clock, so it can never fall back to a value
+    whose entries are still cached.
+    """
+
+    def __init__(self, alias='default', timeout=300):
+        super().__init__(timeout)
+        self.cache = caches[alias]
+
+    def _get(self, key):
+        return self.cache.get(key)
+
+    def _set(self, key, raw):
+        self.cache.set(key, raw, self.timeout)
+
+    def get_version(self, key):
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def incr_version(self, key):
+        self.cache.add(key, time.time_ns(), timeout=None)
+        return self.cache.incr(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ticket_cache():
+    """The response cache configured by ``settings.TICKET_CACHE``."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = getattr(settings, 'TICKET_CACHE', {})
+                backend = import_string(config.get('BACKEND', 'tickets.cache.LocMemLRUCache'))
+                _cache = backend(**config.get('OPTIONS', {}))
+    return _cache
+
+
+def version_key(user):
+    """Staff see every ticket, so they share the global version."""
+    if user.is_staff:
+        return GLOBAL_VERSION_KEY
+    return OWNER_VERSION_KEY.format(user.pk)
+
+
+def response_key(request, action, pk=None, etag=None):
+    cache = get_ticket_cache()
+    user = request.user
+    scope = 'all' if user.is_staff else f'owner:{user.pk}'
+    version = cache.get_version(version_key(user))
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.sha1(f'{request.get_host()}?{params}'.encode()).hexdigest()
+    return f'tickets:{action}:{scope}:v{version}:{pk or ""}:{etag or ""}:{digest}'
+
+
+def cached_response(request, action, render, pk=None, etag=None):
+    """
+    Serve ``render()``'s data from the cache, filling it on a miss. Pass the
+    response's ``etag`` when it may have been read from a lagging replica,
+    so the entry only serves requests that saw the same state.
+    """
+    cache = get_ticket_cache()
+    key = response_key(request, action, pk, etag)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+    response = render()
+    if response.status_code == 200:
+        cache.set(key, response.data)
+    return response
+
+
+async def acached_response(request, action, render, pk=None, etag=None):
+    """``cached_response`` for a coroutine function ``render``."""
+    cache = get_ticket_cache()
+    key = response_key(request, action, pk, etag)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+    response = await render()
+    if response.status_code == 200:
+        cache.set(key, response.data)
+    return response
+
+
+def bump_versions(owner_id):
+    cache = get_ticket_cache()
+    cache.incr_version(OWNER_VERSION_KEY.format(owner_id))
+    cache.incr_version(GLOBAL_VERSION_KEY)
+
+
+def invalidate_on_commit(owner_id):
+    """Bump versions once the write is visible, so no reader can cache pre-commit data under the new version."""
+    transaction.on_commit(partial(bump_versions, owner_id))
@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import rollups
+from .models import ArchivedTicket, Ticket, TicketCounter
+
+
+def bucket(ticket):
+    """The counter bucket a ticket belongs to, plus whether it is unassigned."""
+    key = (
+        ticket.created_by_id,
+        ticket.status,
+        ticket.priority,
+        timezone.localdate(ticket.created_at),
+    )
+    return key, ticket.assigned_to_id is None
+
+
+def _apply(key, count, unassigned):
+    owner_id, status, priority, day = key
+    counter, _ = TicketCounter.objects.get_or_create(
+        owner_id=owner_id, status=status, priority=priority, day=day
+    )
+    TicketCounter.objects.filter(pk=counter.pk).update(
+        count=F('count') + count,
+        unassigned=F('unassigned') + unassigned,
+    )
+
+
+# Every counter change also moves the daily flow rollup (tickets.rollups).
+def record_created(ticket):
+    key, unassigned = bucket(ticket)
+    _apply(key, 1, int(unassigned))
+    rollups.record([], [(key, unassigned)])
+
+
+def record_deleted(ticket):
+    key, unassigned = bucket(ticket)
+    _apply(key, -1, -int(unassigned))
+    # A resolved ticket was resolved when it was last updated.
+    rollups.record([(key, unassigned)], [], resolved_on=timezone.localdate(ticket.updated_at))
+
+
+def record_changed(before, ticket):
+    """Move a ticket between buckets; ``before`` is ``bucket(ticket)`` taken pre-save."""
+    after = bucket(ticket)
+    if before == after:
+        return
+    (old_key, old_unassigned), (new_key, new_unassigned) = before, after
+    if old_key == new_key:
+        _apply(old_key, 0, int(new_unassigned) - int(old_unassigned))
+        return
+    _apply(old_key, -1, -int(old_unassigned))
+    _apply(new_key, 1, int(new_unassigned))
+    rollups.record([before], [after])
+
+
+def record_bulk(before, after):
+    """
+    Apply many ticket changes at once. ``before`` and ``after`` are lists of
+    ``bucket()`` snapshots; each touched bucket is written once.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for key, unassigned in before:
+        deltas[key][0] -= 1
+        deltas[key][1] -= int(unassigned)
+    for key, unassigned in after:
+        deltas[key][0] += 1
+        deltas[key][1] += int(unassigned)
+    for key, (count, unassigned) in deltas.items():
+        if count or unassigned:
+            _apply(key, count, unassigned)
+    rollups.record(before, after)
+
+
+def expected_counters(tickets=None):
+    """
+    Bucket counts computed from scratch, keyed like :func:`bucket`. By
+    default archived tickets count too, as they did before archival.
+    """
+    querysets = [Ticket.objects.all(), ArchivedTicket.objects.all()] if tickets is None else [tickets]
+    expected = {}
+    for queryset in querysets:
+        rows = queryset.order_by().values(
+            'created_by_id', 'status', 'priority', 'created_at__date'
+        ).annotate(
+            count=Count('id'),
+            unassigned=Count('id', filter=Q(assigned_to__isnull=True)),
+        )
+        for row in rows:
+            key = (row['created_by_id'], row['status'], row['priority'], row['created_at__date'])
+            count, unassigned = expected.get(key, (0, 0))
+            expected[key] = (count + row['count'], unassigned + row['unassigned'])
+    return expected
+
+
+def stored_counters():
+    rows = TicketCounter.objects.exclude(count=0, unassigned=0).values_list(
+        'owner_id', 'status', 'priority', 'day', 'count', 'unassigned'
+    )
+    return {tuple(row[:4]): (row[4], row[5]) for row in rows}
+
+
+def counter_drift(expected=None):
+    """Bucket keys whose stored value disagrees with the ticket tables."""
+    expected = expected_counters() if expected is None else expected
+    stored = stored_counters()
+    return {
+        key for key in set(expected) | set(stored)
+        if expected.get(key) != stored.get(key)
+    }
+
+
+@transaction.atomic
+def rebuild_counters():
+    """
+    Recompute every counter from the live and archived tickets. Returns the
+    keys whose stored value disagreed with the recomputed one.
+    """
+    expected = expected_counters()
+    drift = counter_drift(expected)
+
+    TicketCounter.objects.all().delete()
+    TicketCounter.objects.bulk_create(
+        TicketCounter(
+            owner_id=owner_id, status=status, priority=priority, day=day,
+            count=count, unassigned=unassigned,
+        )
+        for (owner_id, status, priority, day), (count, unassigned) in expected.items()
+    )
+    return drift
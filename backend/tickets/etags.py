@@ -0,0 +1,77 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _etag(request, state, extra):
+    user = request.user
+    parts = [
+        'all' if user.is_staff else f'owner:{user.pk}',
+        state['last_update'].isoformat() if state['last_update'] else '',
+        str(state['count']),
+        urlencode(sorted(request.query_params.lists()), doseq=True),
+        *map(str, extra),
+    ]
+    return quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+
+
+def queryset_state(queryset):
+    """``max(updated_at)`` and the row count of ``queryset``, in one aggregate query."""
+    return queryset.order_by().aggregate(last_update=Max('updated_at'), count=Count('id'))
+
+
+async def aqueryset_state(queryset):
+    return await queryset.order_by().aaggregate(last_update=Max('updated_at'), count=Count('id'))
+
+
+def state_etag(request, state, *extra):
+    """The ETag for a ``queryset_state`` result."""
+    return _etag(request, state, extra)
+
+
+def queryset_etag(request, queryset, *extra):
+    """
+    A strong ETag for whatever ``queryset`` renders to. Every ticket write
+    moves ``max(updated_at)`` or the row count, so one aggregate over the
+    (indexed) filter columns is enough to detect change without evaluating
+    the queryset itself.
+    """
+    return _etag(request, queryset_state(queryset), extra)
+
+
+async def aqueryset_etag(request, queryset, *extra):
+    return _etag(request, await aqueryset_state(queryset), extra)
+
+
+def _not_modified(request, etag):
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    return etag in if_none_match or '*' in if_none_match
+
+
+def _tag(response, etag):
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, render):
+    """
+    Answer ``If-None-Match`` with 304 before anything is serialized;
+    otherwise tag ``render()``'s response.
+    """
+    if _not_modified(request, etag):
+        return _tag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return _tag(render(), etag)
+
+
+async def aconditional_response(request, etag, render):
+    """``conditional_response`` for a coroutine function ``render``."""
+    if _not_modified(request, etag):
+        return _tag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return _tag(await render(), etag)
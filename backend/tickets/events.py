@@ -0,0 +1,78 @@
+"""
+The append-only ticket event log (TicketEvent).
+
+Every ticket write builds its events from ``snapshot`` values taken before
+and after the change and hands them all to ``record``. ``record`` writes
+them with one multi-row INSERT in the same transaction as the write, so a
+bulk request of any size costs one extra statement. The log also can never
+disagree with the tickets: an in-memory buffer flushed later would be
+cheaper still, but it would lose events whenever a worker dies.
+"""
+from django.utils import timezone
+
+from .models import TicketEvent
+
+TRACKED_FIELDS = ('status', 'priority', 'assigned_to')
+
+
+def snapshot(ticket):
+    """The tracked fields of ``ticket``, to diff against after a write."""
+    return {
+        'status': ticket.status,
+        'priority': ticket.priority,
+        'assigned_to': ticket.assigned_to_id,
+    }
+
+
+def diff(before, after):
+    """``{field: [old, new]}`` for the tracked fields that changed."""
+    return {
+        field: [before[field], after[field]]
+        for field in TRACKED_FIELDS
+        if before[field] != after[field]
+    }
+
+
+def _event(ticket, actor, kind, changes, now):
+    status = changes.get('status')
+    return TicketEvent(
+        ticket_id=ticket.pk,
+        actor_id=actor.pk if actor else None,
+        kind=kind,
+        status=status[1] if status else None,
+        changes=changes,
+        created_at=now,
+    )
+
+
+def created(tickets, actor, now=None):
+    now = now or timezone.now()
+    empty = dict.fromkeys(TRACKED_FIELDS)
+    return [_event(ticket, actor, 'created', diff(empty, snapshot(ticket)), now) for ticket in tickets]
+
+
+def updated(tickets, before, actor, now=None):
+    """Events for the tickets whose tracked fields changed; ``before`` are their snapshots."""
+    now = now or timezone.now()
+    events = []
+    for ticket, old in zip(tickets, before):
+        changes = diff(old, snapshot(ticket))
+        if changes:
+            events.append(_event(ticket, actor, 'updated', changes, now))
+    return events
+
+
+def deleted(tickets, actor, now=None):
+    now = now or timezone.now()
+    return [_event(ticket, actor, 'deleted', {}, now) for ticket in tickets]
+
+
+def breached(tickets, now=None):
+    """Events for tickets past ``due_at``: ``{"breached": [null, "response"|"resolution"]}``."""
+    now = now or timezone.now()
+    return [_event(ticket, None, 'breached', {'breached': [None, ticket.sla_target()]}, now) for ticket in tickets]
+
+
+def record(events):
+    if events:
+        TicketEvent.objects.bulk_create(events, batch_size=1000)
@@ -0,0 +1,77 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'priority': 'priority',
+    'status': 'status',
+    'created_by': 'created_by__email',
+    'assigned_to': 'assigned_to__email',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """A file-like object that hands each written line straight back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size):
+    """
+    Ticket rows as plain dicts, read through a server-side cursor so only
+    ``chunk_size`` rows are held in memory at a time.
+    """
+    rows = queryset.values_list(*EXPORT_FIELDS.values())
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+def stream_csv(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=list(EXPORT_FIELDS))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+async def aiter_chunks(content):
+    """
+    ``content`` as an async iterator for ASGI. Django would otherwise drain
+    a sync iterator into a list before sending it; here each chunk is
+    pulled in the sync thread that holds the database cursor.
+    """
+    done = object()
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(content, done)) is not done:
+            yield chunk
+    finally:
+        await sync_to_async(content.close)()
+
+
+def export_response(queryset, output, chunk_size, asynchronous=False):
+    rows = export_rows(queryset, chunk_size)
+    content = stream_csv(rows) if output == 'csv' else stream_ndjson(rows)
+    if asynchronous:
+        content = aiter_chunks(content)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="tickets.{output}"'
+    return response
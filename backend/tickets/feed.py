@@ -0,0 +1,220 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Sent to a subscriber whose queue overflowed; the client should refetch.
+RESYNC = {'type': 'resync'}
+
+
+def _stats_delta(before, after):
+    """How one ticket write moves the dashboard counters (see tickets.stats)."""
+    delta = Counter()
+    for bucket, sign in ((before, -1), (after, 1)):
+        if bucket is None:
+            continue
+        (_owner, status, priority, _day), unassigned = bucket
+        delta['total_tickets'] += sign
+        delta[f'{status}_tickets'] += sign
+        delta[f'{priority}_priority'] += sign
+        delta['unassigned_tickets'] += sign * unassigned
+    return {key: value for key, value in delta.items() if value}
+
+
+def change(ticket, before, after):
+    """
+    A JSON-ready snapshot of one ticket write, taken from the ``counters.bucket``
+    values on either side of it (``before`` is None for a create, ``after``
+    for a delete).
+    """
+    return {
+        'owner': ticket.created_by_id,
+        'ticket': {
+            'id': ticket.pk,
+            'title': ticket.title,
+            'status': ticket.status,
+            'priority': ticket.priority,
+            'assigned_to': ticket.assigned_to_id,
+            'updated_at': ticket.updated_at.isoformat() if ticket.updated_at else None,
+        },
+        'stats': _stats_delta(before, after),
+    }
+
+
+def bucket_changes(tickets, before, after):
+    """``change`` for parallel lists of tickets and their bucket snapshots."""
+    return [change(*args) for args in zip(tickets, before, after)]
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue on its event loop plus the scope
+    it may see. Scoping runs in the publishing thread, so changes a
+    subscriber cannot see never wake its loop.
+    """
+
+    def __init__(self, broker, user, loop, max_pending):
+        self.broker = broker
+        self.user_id = user.pk
+        self.is_staff = user.is_staff
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+
+    def scope(self, event):
+        changes = event['changes']
+        if not self.is_staff:
+            changes = [item for item in changes if item['owner'] == self.user_id]
+        if not changes:
+            return None
+        stats = Counter()
+        for item in changes:
+            stats.update(item['stats'])
+        return {
+            'type': event['type'],
+            'tickets': [item['ticket'] for item in changes],
+            'stats': {key: value for key, value in stats.items() if value},
+        }
+
+    def deliver(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # A client this far behind cannot apply deltas any more.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.broker._count('overflows')
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class BaseBroker:
+    """
+    Fans ticket change events out to the subscribers connected to this
+    process. ``publish`` may be called from any thread; subclasses decide how
+    events reach ``dispatch``. A cross-process broker (e.g. Redis pub/sub)
+    publishes to its channel and calls ``dispatch`` for each message it
+    receives, so events must stay JSON-serializable.
+    """
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._stats = {'published': 0, 'delivered': 0, 'overflows': 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, subscribers=len(self._subscribers))
+
+    def subscribe(self, user):
+        """Must be called from the event loop that will read the subscription."""
+        subscription = Subscription(self, user, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        raise NotImplementedError
+
+    def dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        delivered = 0
+        for subscription in subscribers:
+            payload = subscription.scope(event)
+            if payload is None:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, payload)
+            except RuntimeError:
+                # The subscriber's loop is gone.
+                self.unsubscribe(subscription)
+                continue
+            delivered += 1
+        self._count('published')
+        self._count('delivered', delivered)
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Delivers events to subscribers in the publishing process only, which is
+    enough for a single ASGI worker.
+    """
+
+    def publish(self, event):
+        self.dispatch(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """The broker configured by ``settings.TICKET_FEED``."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'TICKET_FEED', {})
+                backend = import_string(config.get('BACKEND', 'tickets.feed.InProcessBroker'))
+                _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish_on_commit(kind, changes):
+    """Publish once the write is visible, so subscribers never refetch pre-commit data."""
+    if changes:
+        event = {'type': kind, 'changes': changes}
+        transaction.on_commit(partial(get_event_broker().publish, event))
+
+
+def format_event(payload):
+    return f'data: {json.dumps(payload, separators=(",", ":"))}\n\n'
+
+
+async def event_stream(subscription, heartbeat, expires_at, reauthorize=None):
+    """
+    Server-Sent Events for ``subscription``. An idle stream only sends a
+    comment every ``heartbeat`` seconds to keep proxies from closing it, and
+    it ends when the access token expires so the client reconnects with a
+    fresh one. ``reauthorize``, if given, is awaited once per ``heartbeat``;
+    the stream ends as soon as it returns False (the user was blocked, or
+    their staff status and so their scope changed).
+    """
+    loop = asyncio.get_running_loop()
+    broker = subscription.broker
+    checked_at = loop.time()
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            now = loop.time()
+            remaining = expires_at - now
+            if remaining <= 0:
+                return
+            if reauthorize is not None and now - checked_at >= heartbeat:
+                if not await reauthorize():
+                    return
+                checked_at = now
+            try:
+                payload = await asyncio.wait_for(subscription.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(payload)
+    finally:
+        broker.unsubscribe(subscription)
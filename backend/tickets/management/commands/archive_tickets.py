@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.archive import archivable, archive_resolved
+
+
+class Command(BaseCommand):
+    help = (
+        'Move resolved tickets last updated more than --after-days ago out of the live '
+        'ticket table into the archive, --batch-size tickets per short transaction. Safe '
+        'to run while serving traffic; schedule it (e.g. nightly from cron). Archived '
+        'tickets are still counted by the stats endpoints and readable with '
+        '?include_archived=1.'
+    )
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'TICKET_ARCHIVE', {})
+        parser.add_argument('--after-days', type=int, default=config.get('AFTER_DAYS', 90))
+        parser.add_argument('--batch-size', type=int, default=config.get('BATCH_SIZE', 1000))
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help='Seconds to sleep between batches, to leave room for other writers.'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only count the tickets that would move.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['dry_run']:
+                count = archivable(options['after_days']).count()
+                self.stdout.write(f'{count} tickets would be archived.')
+                return
+            start = time.perf_counter()
+            archived = batches = 0
+            for moved in archive_resolved(options['after_days'], options['batch_size'], options['pause']):
+                archived += moved
+                batches += 1
+        except ValueError as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} tickets in {batches} batches ({elapsed:.1f}s).'
+        ))
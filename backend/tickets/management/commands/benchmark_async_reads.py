@@ -0,0 +1,95 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from tickets import async_views, counters
+from tickets.cache import bump_versions
+from tickets.models import Ticket
+from tickets.views import TicketViewSet
+
+ENDPOINTS = {
+    'list': ('/api/tickets/', 'list', async_views.ticket_list),
+    'stats': ('/api/tickets/stats/', 'stats', async_views.ticket_stats),
+    'admin_stats': ('/api/tickets/admin_stats/', 'admin_stats', async_views.ticket_admin_stats),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/second and p99 latency of the sync TicketViewSet reads with '
+        'tickets.async_views at N concurrent clients, the way an ASGI server runs them. '
+        'Every request carries a unique query parameter so none is answered from the '
+        'response cache. Creates its own tickets and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--tickets', type=int, default=1000)
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), action='append')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Each request thread opens its own connection; use a shared database.')
+
+        user = User.objects.create_user(email='async-benchmark@example.com', password=None)
+        user.is_staff = True
+        user.save()
+        tickets = Ticket.objects.bulk_create(
+            Ticket(title=f'Benchmark {i}', description='', created_by=user)
+            for i in range(options['tickets'])
+        )
+        buckets = [counters.bucket(ticket) for ticket in tickets]
+        counters.record_bulk([], buckets)
+        try:
+            token = str(AccessToken.for_user(user))
+            for name in options['endpoint'] or sorted(ENDPOINTS):
+                path, action, async_view = ENDPOINTS[name]
+                sync_view = sync_to_async(TicketViewSet.as_view({'get': action}, basename='ticket'))
+                for label, view in (('sync', sync_view), ('async', async_view)):
+                    latencies, elapsed = asyncio.run(
+                        self.drive(view, path, token, options['clients'], options['requests'])
+                    )
+                    self.report(f'{name} {label}', latencies, elapsed)
+        finally:
+            counters.record_bulk(buckets, [])
+            Ticket.objects.filter(created_by=user).delete()
+            user.delete()
+            bump_versions(user.pk)
+
+    async def drive(self, view, path, token, clients, total):
+        factory = AsyncRequestFactory()
+        pending = iter(range(total))
+        latencies = []
+
+        async def client():
+            for n in pending:
+                request = factory.get(
+                    path, {'benchmark': n}, headers={'Authorization': f'Bearer {token}'}
+                )
+                start = time.perf_counter()
+                # One thread-sensitive context per request, as Django's ASGIHandler does.
+                async with ThreadSensitiveContext():
+                    response = await view(request)
+                    response.render()
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f'{path} returned {response.status_code}')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies, time.perf_counter() - start
+
+    def report(self, label, latencies, elapsed):
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f'{label:<18} {len(latencies) / elapsed:10.0f} req/s  '
+            f'p50 {statistics.median(latencies) * 1000:8.1f}ms  p99 {p99 * 1000:8.1f}ms'
+        )
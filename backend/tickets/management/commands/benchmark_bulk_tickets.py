@@ -0,0 +1,77 @@
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from tickets.models import Ticket
+from tickets.views import TicketViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare closing N tickets one PATCH at a time with a single bulk_transition call. '
+        'Runs inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['count'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def make_tickets(self, user, count):
+        return list(Ticket.objects.bulk_create(
+            Ticket(title=f'Benchmark {i}', description='', created_by=user) for i in range(count)
+        ))
+
+    def timed(self, label, count, fn):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{label:<16} {count} tickets  {elapsed:8.3f}s  '
+            f'{count / elapsed:10.0f} tickets/s  {len(ctx):6d} queries'
+        )
+
+    def run(self, count):
+        factory = APIRequestFactory()
+        user = User.objects.create_user(email='bulk-benchmark@example.com', password=None)
+        user.is_staff = True
+        user.save()
+
+        one_by_one = self.make_tickets(user, count)
+        update = TicketViewSet.as_view({'patch': 'partial_update'})
+
+        def patch_each():
+            for ticket in one_by_one:
+                request = factory.patch(f'/api/tickets/{ticket.pk}/', {'status': 'resolved'}, format='json')
+                force_authenticate(request, user)
+                update(request, pk=ticket.pk)
+
+        bulk_tickets = self.make_tickets(user, count)
+        transition = TicketViewSet.as_view({'post': 'bulk_transition'})
+
+        def transition_all():
+            request = factory.post(
+                '/api/tickets/bulk_transition/',
+                {'ids': [ticket.pk for ticket in bulk_tickets], 'status': 'resolved'},
+                format='json'
+            )
+            force_authenticate(request, user)
+            transition(request)
+
+        self.timed('PATCH one-by-one', count, patch_each)
+        self.timed('bulk_transition', count, transition_all)
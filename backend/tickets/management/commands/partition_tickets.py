@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from tickets.pagination import Cursor, TicketCursorPagination
+from tickets.partitions import TABLE, convert, create_partitions, explain_partitions, is_partitioned
+from tickets.views import TicketViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the monthly partitions of the ticket table for the next --months-ahead '
+        'months (schedule it, e.g. daily from cron). --convert first partitions a plain '
+        'table online; --explain shows which partitions the ticket list and stats '
+        'endpoints read. PostgreSQL only; see tickets.partitions.'
+    )
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'TICKET_PARTITIONING', {})
+        parser.add_argument('--months-ahead', type=int, default=config.get('MONTHS_AHEAD', 3))
+        parser.add_argument('--convert', action='store_true', help='Partition the plain ticket table first.')
+        parser.add_argument('--explain', action='store_true', help='EXPLAIN ANALYZE the endpoint queries.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Ticket partitioning needs PostgreSQL; other databases keep the plain table.')
+        try:
+            if options['convert'] and convert(connection, options['months_ahead']):
+                self.stdout.write(f'Converted {TABLE} to a partitioned table.')
+        except ValueError as e:
+            raise CommandError(e)
+        if not is_partitioned(connection):
+            raise CommandError(f'{TABLE} is not partitioned; run with --convert first.')
+
+        created = create_partitions(connection, options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {", ".join(created)}.' if created else 'All partitions exist.'
+        ))
+        if options['explain']:
+            self.explain()
+
+    def explain(self):
+        user = User.objects.filter(is_staff=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('--explain needs a staff user to query as.')
+        paginator = TicketCursorPagination()
+        paginator.base_url = '/api/tickets/'
+        three_months_ago = Cursor(value=(timezone.now() - timedelta(days=90)).isoformat(), pk=2 ** 62, reverse=False)
+        requests = [
+            ('list', 'list', '/api/tickets/'),
+            ('list, 3 months back', 'list', paginator.encode_cursor(three_months_ago)),
+            ('stats', 'stats', '/api/tickets/stats/'),
+            ('admin_stats', 'admin_stats', '/api/tickets/admin_stats/'),
+        ]
+        factory = APIRequestFactory()
+        for label, action, path in requests:
+            request = factory.get(path)
+            force_authenticate(request, user)
+            view = TicketViewSet.as_view({'get': action}, basename='ticket')
+            with CaptureQueriesContext(connection) as ctx:
+                view(request).render()
+            for query in ctx.captured_queries:
+                if f'FROM "{TABLE}"' not in query['sql']:
+                    continue
+                planned, executed = explain_partitions(connection, query['sql'])
+                self.stdout.write(
+                    f'{label:<22} planned {len(planned):3d}  read {len(executed):3d}  '
+                    f'{", ".join(sorted(executed)) or "-"}\n    {query["sql"][:160]}'
+                )
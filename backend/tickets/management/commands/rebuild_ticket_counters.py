@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from tickets.counters import counter_drift, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ticket stats counters from the live and archived tickets (e.g. after a bulk import).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report buckets that have drifted; do not write anything.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = counter_drift()
+        else:
+            drift = rebuild_counters()
+
+        for owner_id, status, priority, day in sorted(drift, key=str):
+            self.stdout.write(f'drift: owner={owner_id} status={status} priority={priority} day={day}')
+
+        if options['check']:
+            self.stdout.write(f'{len(drift)} bucket(s) out of date.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Counters rebuilt, {len(drift)} bucket(s) corrected.'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.sla import pending, sla_settings, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        'Flag tickets whose SLA deadline (due_at) has passed and record a "breached" event '
+        'for each, --batch-size per short transaction. Each run reads only the tickets it '
+        'flags; schedule it every minute, or keep it running with --every.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=sla_settings()['SWEEP_BATCH_SIZE'])
+        parser.add_argument('--every', type=float, help='Sweep again every this many seconds, until interrupted.')
+        parser.add_argument('--explain', action='store_true', help="Print the sweep query's plan and exit.")
+
+    def handle(self, *args, **options):
+        if options['explain']:
+            self.stdout.write(pending().explain())
+            return
+        while True:
+            start = time.perf_counter()
+            flagged = sum(sweep(options['batch_size']))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'{timezone.now():%Y-%m-%d %H:%M:%S} flagged {flagged} breached tickets ({elapsed:.3f}s).'
+            ))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
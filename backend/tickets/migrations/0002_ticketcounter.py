@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketCounter = apps.get_model('tickets', 'TicketCounter')
+    db = schema_editor.connection.alias
+    rows = Ticket.objects.using(db).order_by().values(
+        'created_by_id', 'status', 'priority', 'created_at__date'
+    ).annotate(
+        count=models.Count('id'),
+        unassigned=models.Count('id', filter=models.Q(assigned_to__isnull=True)),
+    )
+    TicketCounter.objects.using(db).bulk_create(
+        TicketCounter(
+            owner_id=row['created_by_id'], status=row['status'], priority=row['priority'],
+            day=row['created_at__date'], count=row['count'], unassigned=row['unassigned'],
+        )
+        for row in rows.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('unassigned', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ticketcounter',
+            constraint=models.UniqueConstraint(fields=('owner', 'status', 'priority', 'day'), name='unique_ticket_counter_bucket'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
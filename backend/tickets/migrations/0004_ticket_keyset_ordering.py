@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_ticket_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='ticket',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_owner_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_unassigned_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-created_at', '-id'], name='ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='ticket_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', True)), fields=['-created_at', '-id'], name='ticket_unassigned_idx'),
+        ),
+    ]
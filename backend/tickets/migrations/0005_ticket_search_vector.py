@@ -0,0 +1,67 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:05
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# The search column is maintained by a trigger so bulk writes and raw SQL
+# stay searchable too. Everything here is PostgreSQL-only; other backends
+# keep the (unused) column and search through tickets.search.InMemorySearchBackend.
+FORWARD_SQL = [
+    """
+    CREATE FUNCTION tickets_ticket_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER tickets_ticket_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON tickets_ticket
+    FOR EACH ROW EXECUTE FUNCTION tickets_ticket_search_vector_update();
+    """,
+    "UPDATE tickets_ticket SET title = title;",
+    "CREATE INDEX ticket_search_vector_idx ON tickets_ticket USING gin (search_vector);",
+    "CREATE INDEX ticket_title_trgm_idx ON tickets_ticket USING gin (title gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS ticket_title_trgm_idx;",
+    "DROP INDEX IF EXISTS ticket_search_vector_idx;",
+    "DROP TRIGGER IF EXISTS tickets_ticket_search_vector_trigger ON tickets_ticket;",
+    "DROP FUNCTION IF EXISTS tickets_ticket_search_vector_update();",
+]
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in REVERSE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_ticket_keyset_ordering'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='ticket',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def resolve_assignees(apps, schema_editor):
+    """
+    Map the free-form assigned_to strings onto users. The admin UI stored
+    user ids; anything else is tried as an email. Unresolvable values are
+    left unassigned.
+    """
+    Ticket = apps.get_model('tickets', 'Ticket')
+    User = apps.get_model('accounts', 'User')
+    db = schema_editor.connection.alias
+
+    values = (
+        Ticket.objects.using(db).exclude(assigned_to__isnull=True).exclude(assigned_to='')
+        .order_by().values_list('assigned_to', flat=True).distinct()
+    )
+    ids = {v.strip() for v in values if v.strip().isdigit()}
+    emails = {v.strip().lower() for v in values if '@' in v}
+
+    by_id = {
+        str(pk): pk for pk in User.objects.using(db).filter(pk__in=ids).values_list('pk', flat=True)
+    }
+    by_email = dict(
+        User.objects.using(db).annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails).values_list('email_lower', 'pk')
+    )
+
+    for value in values:
+        key = value.strip()
+        user_id = by_id.get(key) or by_email.get(key.lower())
+        if user_id is not None:
+            Ticket.objects.using(db).filter(assigned_to=value).update(assignee=user_id)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # The assignee FK is DEFERRABLE INITIALLY DEFERRED. Any check still
+        # queued by the UPDATEs above would make the ALTER TABLEs that
+        # follow in this transaction fail with "pending trigger events";
+        # run them now.
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+def restore_assignees(apps, schema_editor):
+    Ticket = apps.get_model('tickets', 'Ticket')
+    db = schema_editor.connection.alias
+    for pk, assignee_id in Ticket.objects.using(db).filter(
+        assignee__isnull=False
+    ).values_list('pk', 'assignee_id').iterator():
+        Ticket.objects.using(db).filter(pk=pk).update(assigned_to=str(assignee_id))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_ticket_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_unassigned_idx',
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='assignee',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_tickets', to=settings.AUTH_USER_MODEL, db_index=False),
+        ),
+        migrations.RunPython(resolve_assignees, restore_assignees),
+        migrations.RemoveField(
+            model_name='ticket',
+            name='assigned_to',
+        ),
+        migrations.RenameField(
+            model_name='ticket',
+            old_name='assignee',
+            new_name='assigned_to',
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assigned_to', '-created_at', '-id'], name='ticket_assignee_created_idx'),
+        ),
+    ]
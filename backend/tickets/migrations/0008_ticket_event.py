@@ -0,0 +1,59 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Time-range scans over all events use a BRIN index on created_at, which
+# stays a few pages however large the table grows because rows are appended
+# in time order. BRIN is PostgreSQL-only.
+BRIN_SQL = 'CREATE INDEX ticket_event_created_brin ON tickets_ticketevent USING brin (created_at);'
+DROP_BRIN_SQL = 'DROP INDEX IF EXISTS ticket_event_created_brin;'
+
+# Tickets resolved before the log existed get one "resolved" event at their
+# updated_at, which is what the resolution metrics used until now.
+BACKFILL_SQL = """
+    INSERT INTO tickets_ticketevent (ticket_id, actor_id, kind, status, changes, created_at)
+    SELECT id, NULL, 'updated', 'resolved', '{"status": [null, "resolved"]}', updated_at
+    FROM tickets_ticket WHERE status = 'resolved'
+"""
+
+
+def create_index_and_backfill(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(BRIN_SQL)
+    schema_editor.execute(BACKFILL_SQL)
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_BRIN_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_ticket_etag_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved')], max_length=20, null=True)),
+                ('changes', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='tickets.ticket')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_event_ticket_idx'), models.Index(condition=models.Q(('status', 'resolved')), fields=['created_at'], name='ticket_event_resolved_idx')],
+            },
+        ),
+        migrations.RunPython(create_index_and_backfill, drop_brin_index),
+    ]
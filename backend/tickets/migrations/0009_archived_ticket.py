@@ -0,0 +1,68 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:44
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL-only storage and search setup for the archive. TOAST compresses
+# values once a row passes toast_tuple_target (2kB by default); archived
+# rows are only ever read back one page at a time, so compress anything
+# over 128 bytes. search_vector is copied from tickets_ticket on archival,
+# so the archive needs the same GIN indexes but no trigger.
+FORWARD_SQL = [
+    "ALTER TABLE tickets_archivedticket SET (toast_tuple_target = 128);",
+    "CREATE INDEX archive_search_vector_idx ON tickets_archivedticket USING gin (search_vector);",
+    "CREATE INDEX archive_title_trgm_idx ON tickets_archivedticket USING gin (title gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS archive_title_trgm_idx;",
+    "DROP INDEX IF EXISTS archive_search_vector_idx;",
+]
+
+
+def set_up_archive_storage(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_archive_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in REVERSE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticket_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved')], max_length=20)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('assigned_to', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tickets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['-created_at', '-id'], name='archive_created_idx'), models.Index(fields=['created_by', '-created_at', '-id'], name='archive_owner_created_idx')],
+            },
+        ),
+        migrations.RunPython(set_up_archive_storage, drop_archive_indexes),
+    ]
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+
+# Optional: only runs on PostgreSQL with TICKET_PARTITIONING['ENABLED'].
+# Not atomic, because the conversion builds its index CONCURRENTLY; see
+# tickets.partitions.convert. The model state does not change, so later
+# migrations and the ORM see the same table.
+
+
+def partition_ticket_table(apps, schema_editor):
+    config = getattr(settings, 'TICKET_PARTITIONING', {})
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or not config.get('ENABLED'):
+        return
+    from tickets.partitions import convert
+    convert(connection, config.get('MONTHS_AHEAD', 3))
+
+
+def check_not_partitioned(apps, schema_editor):
+    from tickets.partitions import is_partitioned
+    if is_partitioned(schema_editor.connection):
+        raise IrreversibleError('tickets_ticket is partitioned; un-partitioning means copying it back by hand.')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('tickets', '0009_archived_ticket'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_ticket_table, check_not_partitioned),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_rollups(apps, schema_editor):
+    """Backfill from the live and archived tickets, as tickets.rollups.rebuild_rollups does."""
+    TicketDailyRollup = apps.get_model('tickets', 'TicketDailyRollup')
+    db = schema_editor.connection.alias
+    rows = {}
+    for model_name in ('Ticket', 'ArchivedTicket'):
+        tickets = apps.get_model('tickets', model_name).objects.using(db).order_by()
+        for column, queryset, field in (
+            (0, tickets, 'created_at__date'),
+            (1, tickets.filter(status='resolved'), 'updated_at__date'),
+        ):
+            counts = queryset.values_list('created_by_id', 'priority', field).annotate(count=models.Count('id'))
+            for owner_id, priority, day, count in counts.iterator():
+                rows.setdefault((owner_id, priority, day), [0, 0])[column] += count
+    TicketDailyRollup.objects.using(db).bulk_create(
+        (
+            TicketDailyRollup(owner_id=owner_id, priority=priority, day=day, created=created, resolved=resolved)
+            for (owner_id, priority, day), (created, resolved) in rows.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_ticket_partitioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('day', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='ticket_rollup_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketdailyrollup',
+            constraint=models.UniqueConstraint(fields=('owner', 'priority', 'day'), name='unique_ticket_rollup_bucket'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:03
+
+from datetime import timedelta
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Ticket.SLA_TARGETS when this migration was written.
+SLA_TARGETS = {
+    'low': {'response': timedelta(days=1), 'resolution': timedelta(days=7)},
+    'medium': {'response': timedelta(hours=8), 'resolution': timedelta(days=3)},
+    'high': {'response': timedelta(hours=1), 'resolution': timedelta(days=1)},
+}
+
+
+def populate_due_at(apps, schema_editor):
+    """Set due_at on unresolved tickets, one UPDATE per (status, priority)."""
+    Ticket = apps.get_model('tickets', 'Ticket')
+    db = schema_editor.connection.alias
+    for status, target in (('open', 'response'), ('in_progress', 'resolution')):
+        for priority, targets in SLA_TARGETS.items():
+            Ticket.objects.using(db).filter(status=status, priority=priority).update(
+                due_at=models.F('created_at') + models.Value(targets[target])
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_ticket_daily_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='due_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_breached_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='ticketevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('breached', 'SLA breached')], max_length=10),
+        ),
+        # Before the indexes, so they are built once over the backfilled rows.
+        migrations.RunPython(populate_due_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('due_at__isnull', False)), fields=['due_at'], name='ticket_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('due_at__isnull', False), ('sla_breached_at__isnull', True)), fields=['due_at'], name='ticket_sla_pending_idx'),
+        ),
+    ]
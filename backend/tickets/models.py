@@ -1,4 +1,8 @@
+from datetime import timedelta
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 
 class Ticket(models.Model):
@@ -7,6 +11,13 @@ class Ticket(models.Model):
         ('medium', 'Medium'),
         ('high', 'High'),
     ]
+    # Service level targets per priority, from created_at: leaving "open"
+    # (response) and reaching "resolved" (resolution). See tickets.sla.
+    SLA_TARGETS = {
+        'low': {'response': timedelta(days=1), 'resolution': timedelta(days=7)},
+        'medium': {'response': timedelta(hours=8), 'resolution': timedelta(days=3)},
+        'high': {'response': timedelta(hours=1), 'resolution': timedelta(days=1)},
+    }
     
     STATUS_CHOICES = [
         ('open', 'Open'),
@@ -16,17 +27,23 @@ class Ticket(models.Model):
     
     title = models.CharField(max_length=200)
     description = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the instance is built rather than when it is inserted, so
+    # due_at can be derived from it before the INSERT.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         User, 
         on_delete=models.CASCADE, 
         related_name='created_tickets'
     )
-    assigned_to = models.CharField(
-        max_length=255,
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
         null=True,
-        blank=True
+        blank=True,
+        related_name='assigned_tickets',
+        # Covered by ticket_assignee_created_idx below.
+        db_index=False
     )
     priority = models.CharField(
         max_length=10,
@@ -38,9 +55,231 @@ class Ticket(models.Model):
         choices=STATUS_CHOICES,
         default='open'
     )
+    # Maintained by a database trigger on PostgreSQL (see migration 0005);
+    # unused elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # The next SLA deadline (see sla_due_at); NULL once resolved. Kept in
+    # step by save() and the bulk writes; when it moves, the breach flag the
+    # SLA sweeper set for the previous deadline is cleared.
+    due_at = models.DateTimeField(null=True, editable=False)
+    sla_breached_at = models.DateTimeField(null=True, editable=False)
+
+    # On PostgreSQL the table may be range-partitioned by month of
+    # created_at (tickets.partitions); the indexes below are then
+    # partitioned indexes.
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Default list ordering (and pagination key) for staff, and a user's own tickets.
+            models.Index(fields=['-created_at', '-id'], name='ticket_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='ticket_owner_created_idx'),
+            # ?status= filters and the open/aging range scans on created_at.
+            models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'),
+            # An agent's queue (?assigned_to=<id>) and, since NULLs are indexed,
+            # the unassigned queue (?assigned_to__isnull=true).
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='ticket_assignee_created_idx'),
+            # "Resolved in the last 30 days" in admin_stats (status=resolved, updated_at range).
+            models.Index(fields=['status', 'updated_at'], name='ticket_status_updated_idx'),
+            # max(updated_at)/count(*) behind the ETags, as index-only scans.
+            models.Index(fields=['updated_at'], name='ticket_updated_idx'),
+            models.Index(fields=['created_by', 'updated_at'], name='ticket_owner_updated_idx'),
+            # Breached and at-risk tickets (due_at ranges) for the SLA endpoint.
+            models.Index(fields=['due_at'], condition=models.Q(due_at__isnull=False), name='ticket_due_idx'),
+            # Deadlines the SLA sweeper has yet to flag. Flagged tickets leave
+            # the index, so a sweep reads only the tickets it flags.
+            models.Index(
+                fields=['due_at'],
+                condition=models.Q(due_at__isnull=False, sla_breached_at__isnull=True),
+                name='ticket_sla_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def sla_target(self):
+        """The SLA target ticking for the current status: "response", "resolution" or None."""
+        if self.status == 'resolved':
+            return None
+        return 'response' if self.status == 'open' else 'resolution'
+
+    def sla_due_at(self):
+        target = self.sla_target()
+        if target is None:
+            return None
+        return self.created_at + self.SLA_TARGETS[self.priority][target]
+
+    def refresh_due_at(self):
+        """Recompute ``due_at``; returns whether it (and so the breach flag) changed."""
+        due_at = self.sla_due_at()
+        if due_at == self.due_at:
+            return False
+        self.due_at = due_at
+        self.sla_breached_at = None
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.refresh_due_at() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'due_at', 'sla_breached_at'}
+        super().save(*args, **kwargs)
+
+
+class ArchivedTicket(models.Model):
+    """
+    Resolved tickets moved out of tickets_ticket by tickets.archive, under
+    their original ids. Resolved tickets are immutable, so rows are never
+    updated; the stats counters keep counting them (see tickets.counters).
+    On PostgreSQL the table compresses descriptions more aggressively than
+    tickets_ticket and has the same search indexes (migration 0009).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_tickets',
+        # Covered by archive_owner_created_idx below.
+        db_index=False
+    )
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES)
+    search_vector = SearchVectorField(null=True, editable=False)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # ?include_archived=1 lists, staff and per owner, in the default order.
+            models.Index(fields=['-created_at', '-id'], name='archive_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='archive_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class TicketCounter(models.Model):
+    """
+    Materialized ticket counts, one row per (owner, status, priority, day).
+    Maintained by tickets.counters alongside every Ticket write so the stats
+    endpoints read O(buckets) rows instead of scanning tickets_ticket.
+    """
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='ticket_counters'
+    )
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    unassigned = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'status', 'priority', 'day'],
+                name='unique_ticket_counter_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_id}/{self.status}/{self.priority}/{self.day}: {self.count}'
+
+
+class TicketDailyRollup(models.Model):
+    """
+    Daily ticket flow, one row per (owner, priority, day): tickets created
+    and tickets resolved that day. The open backlog at the end of a day is
+    the running total of created minus resolved. Maintained by
+    tickets.rollups alongside the counters and recompacted nightly, so the
+    timeseries endpoint reads O(days) rows whatever the ticket count.
+    """
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='ticket_rollups'
+    )
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'priority', 'day'],
+                name='unique_ticket_rollup_bucket'
+            ),
+        ]
+        indexes = [
+            # Staff windows span every owner; the unique index serves one owner's.
+            models.Index(fields=['day'], name='ticket_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_id}/{self.priority}/{self.day}: +{self.created} -{self.resolved}'
+
+
+class TicketEvent(models.Model):
+    """
+    Append-only ticket history (tickets.events): one row per create, delete,
+    or update that changed a tracked field, with the diff as
+    ``{field: [old, new]}``, and one per missed SLA deadline (tickets.sla).
+    Rows are never updated. Neither foreign key is enforced by the
+    database, so history outlives deleted tickets and users.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'),
+        ('breached', 'SLA breached'),
+    ]
+
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='events'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # The new status when this event changed it, so status transitions
+    # (e.g. resolutions) can be counted without reading ``changes``.
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES, null=True)
+    changes = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['created_at', 'id']
+        indexes = [
+            # A ticket's history, in order (the history endpoint's keyset).
+            models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_event_ticket_idx'),
+            # Resolution metrics in admin_stats; small, since only resolutions are indexed.
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='resolved'),
+                name='ticket_event_resolved_idx',
+            ),
+        ]
+        # Other time-range scans use a BRIN index on created_at on
+        # PostgreSQL; see migration 0008.
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'{self.kind} #{self.ticket_id} at {self.created_at}'
@@ -0,0 +1,207 @@
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from itertools import chain
+from urllib import parse
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple('Cursor', ['value', 'pk', 'reverse'])
+
+
+class TicketCursorPagination(BasePagination):
+    """
+    Keyset pagination on (ordering field, id), ``created_at`` by default.
+
+    The cursor carries the key of the last row served, so each page is a
+    bounded index range scan: page 10,000 costs the same as page 1, and rows
+    inserted while a client is paging never shift or duplicate results.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` reading the page through the async ORM."""
+        return self._set_page([obj async for obj in self._page_queryset(queryset, request, view)])
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        One page over several querysets with the same fields, e.g. live and
+        archived tickets. Each contributes its own next ``page_size + 1``
+        rows past the cursor, and the page is the head of those merged, so
+        every source is still read by an index range scan.
+        """
+        return self._set_page(self._merge(
+            [list(self._page_queryset(queryset, request, view)) for queryset in self._sources(querysets)]
+        ))
+
+    async def apaginate_querysets(self, querysets, request, view=None):
+        pages = []
+        for queryset in self._sources(querysets):
+            pages.append([obj async for obj in self._page_queryset(queryset, request, view)])
+        return self._set_page(self._merge(pages))
+
+    def _sources(self, querysets):
+        # A search with no matches in one source returns .none() without the
+        # search_rank annotation; it would otherwise change the ordering.
+        return [queryset for queryset in querysets if not queryset.query.is_empty()] or querysets[:1]
+
+    def _merge(self, pages):
+        rows = sorted(
+            chain.from_iterable(pages),
+            key=lambda obj: (getattr(obj, self.field), obj.pk),
+            reverse=self.descending != self.reverse
+        )
+        return rows[:self.page_size + 1]
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request, queryset)
+
+        self.reverse = self.cursor is not None and self.cursor.reverse
+        descending = self.descending != self.reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(prefix + self.field, prefix + 'id')
+
+        if self.cursor is not None:
+            lookup = 'lt' if descending else 'gt'
+            # The outer bound is what lets the (field, id) index start the
+            # scan at the cursor; the OR alone reads every row before it.
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}e': self.cursor.value}),
+                Q(**{f'{self.field}__{lookup}': self.cursor.value}) |
+                Q(**{self.field: self.cursor.value, f'id__{lookup}': self.cursor.pk})
+            )
+
+        # Fetch one extra row to find out whether there is a following page.
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return ``(field, descending)``, honouring the view's OrderingFilter.
+        Search results are ranked best match first unless ?ordering= is given.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            if 'search_rank' in queryset.query.annotations:
+                ordering = ['-search_rank']
+            else:
+                ordering = [self.ordering]
+        order = ordering[0]
+        return order.lstrip('-'), order.startswith('-')
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            value = self.get_ordering_field(queryset).to_python(tokens['v'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(value=value, pk=pk, reverse=reverse)
+
+    def get_ordering_field(self, queryset):
+        """The model field or annotation output field ``self.field`` orders by."""
+        if self.field in queryset.query.annotations:
+            return queryset.query.annotations[self.field].output_field
+        try:
+            return queryset.model._meta.get_field(self.field)
+        except FieldDoesNotExist:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        tokens = {'v': self._format(cursor.value), 'i': str(cursor.pk)}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance, reverse):
+        return Cursor(value=getattr(instance, self.field), pk=instance.pk, reverse=reverse)
+
+    @staticmethod
+    def _format(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self._position(self.page[-1], reverse=False))
+        return self.encode_cursor(self.cursor._replace(reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self._position(self.page[0], reverse=True))
+        return self.encode_cursor(self.cursor._replace(reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class TicketEventPagination(TicketCursorPagination):
+    """A ticket's history, oldest event first, on ticket_event_ticket_idx."""
+    page_size = 100
+    max_page_size = 500
+    ordering = 'created_at'
+
+
+class TicketDuePagination(TicketCursorPagination):
+    """Breached and at-risk tickets, earliest deadline first, on ticket_due_idx."""
+    ordering = 'due_at'
+
+
+class TicketOffsetPagination(LimitOffsetPagination):
+    """Opt-in ``?pagination=offset&limit=&offset=`` paging, for clients that need page numbers."""
+    default_limit = 50
+    max_limit = 200
@@ -0,0 +1,238 @@
+"""
+Optional monthly range partitioning of tickets_ticket on ``created_at``,
+on PostgreSQL 13+ (``settings.TICKET_PARTITIONING``). Other backends keep
+the plain table.
+
+Ticket reads are mostly of recent tickets: the list is ordered by
+``-created_at`` and paged by keyset on it. With one partition per month, a
+cursor page is planned against the partitions at or before its cursor
+only, and the first page stops after the newest partition or two.
+
+``convert`` partitions the existing table without copying a row. The old
+table becomes the partition for everything before a boundary one to two
+months ahead. Its range CHECK and the (id, created_at) primary key index
+are built first without blocking writes, so the final swap only changes
+the catalog and holds its lock for milliseconds. Months from the boundary
+on get their own partitions.
+
+``create_partitions`` adds the coming months; run it from cron
+(``manage.py partition_tickets``). Rows that arrive before their month
+exists land in a DEFAULT partition and are moved out when it is created.
+"""
+import json
+import re
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+TABLE = 'tickets_ticket'
+LEGACY = f'{TABLE}_legacy'
+DEFAULT = f'{TABLE}_default'
+SEQUENCE = f'{TABLE}_id_seq'
+MIN_PG_VERSION = 130000  # BEFORE ROW triggers (the search trigger) on partitioned tables
+
+ON_LEGACY_RE = re.compile(rf' ON (?:\S+\.)?{LEGACY} ')
+UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(day, months=0):
+    """The first day of the month ``months`` after ``day``'s."""
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def month_bound(month):
+    # Partition bounds are UTC midnights, whatever TIME_ZONE is.
+    return datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def partition_bounds(connection):
+    """``{partition: bound expression}`` for every partition of the ticket table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)',
+            [TABLE]
+        )
+        return dict(cursor.fetchall())
+
+
+def _legacy_upper_bound(bounds):
+    match = UPPER_BOUND_RE.search(bounds.get(LEGACY, ''))
+    return datetime.fromisoformat(match.group(1)) if match else None
+
+
+def create_partitions(connection, months_ahead, today=None):
+    """
+    Make sure this month and the next ``months_ahead`` have partitions,
+    moving any of their rows out of the DEFAULT partition. Returns the
+    names of the partitions created.
+    """
+    today = today or timezone.now().date()
+    bounds = partition_bounds(connection)
+    covered_until = _legacy_upper_bound(bounds)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = month_start(today, offset)
+        name = partition_name(month)
+        if name in bounds or (covered_until and month_bound(month) < covered_until):
+            continue
+        _create_partition(connection, name, month_bound(month), month_bound(month_start(month, 1)))
+        created.append(name)
+    return created
+
+
+def _create_partition(connection, name, lower, upper):
+    # Attaching a filled table would scan it under lock; this one holds at
+    # most the few rows the DEFAULT partition caught. Indexes, foreign keys
+    # and triggers are cloned from the parent on ATTACH.
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)')
+        if DEFAULT in partition_bounds(connection):
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {DEFAULT} WHERE created_at >= %s AND created_at < %s '
+                f'RETURNING *) INSERT INTO {name} SELECT * FROM moved',
+                [lower, upper]
+            )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+
+
+def convert(connection, months_ahead=3, today=None, concurrently=True):
+    """
+    Turn the plain ticket table into a partitioned one (see the module
+    docstring). Returns False if it already is. Pass ``concurrently=False``
+    to run inside a transaction, e.g. in tests.
+    """
+    if connection.vendor != 'postgresql' or connection.pg_version < MIN_PG_VERSION:
+        raise ValueError('Ticket partitioning needs PostgreSQL 13 or later.')
+    if is_partitioned(connection):
+        return False
+    today = today or timezone.now().date()
+    boundary = month_bound(month_start(today, 2)).isoformat()
+    concurrently = 'CONCURRENTLY ' if concurrently else ''
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conrelid::regclass::text FROM pg_constraint WHERE contype = 'f' "
+            "AND confrelid = to_regclass(%s)", [TABLE]
+        )
+        referencing = [row[0] for row in cursor.fetchall()]
+        if referencing:
+            raise ValueError(f'Foreign keys from {", ".join(referencing)} would keep pointing at {LEGACY}.')
+
+        # Everything that reads the whole table, without blocking writes:
+        # VALIDATE only takes a SHARE UPDATE EXCLUSIVE lock. Safe to re-run.
+        cursor.execute(f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {LEGACY}_range')
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {LEGACY}_range CHECK (created_at < '{boundary}') NOT VALID")
+        cursor.execute(f'ALTER TABLE {TABLE} VALIDATE CONSTRAINT {LEGACY}_range')
+        cursor.execute(f'DROP INDEX {concurrently}IF EXISTS {LEGACY}_pkey')
+        cursor.execute(f'CREATE UNIQUE INDEX {concurrently}{LEGACY}_pkey ON {TABLE} (id, created_at)')
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # Give up rather than queue every ticket request behind a long reader.
+        cursor.execute("SET LOCAL lock_timeout = '5s'")
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY}')
+
+        # The primary key of a partitioned table must include created_at.
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [LEGACY]
+        )
+        cursor.execute(f'ALTER TABLE {LEGACY} DROP CONSTRAINT {cursor.fetchone()[0]}')
+        cursor.execute(f'ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_pkey PRIMARY KEY USING INDEX {LEGACY}_pkey')
+
+        # Partitioned tables cannot have identity columns before PostgreSQL
+        # 17; ids continue from a plain sequence owned by the new table.
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {LEGACY}')
+        next_id = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [LEGACY])
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute(f'ALTER TABLE {LEGACY} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        cursor.execute(f'ALTER TABLE {LEGACY} ALTER COLUMN id DROP DEFAULT')
+        if old_sequence:
+            cursor.execute(f'DROP SEQUENCE IF EXISTS {old_sequence}')
+
+        cursor.execute(f'CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+        cursor.execute(f'CREATE SEQUENCE {SEQUENCE} START WITH {int(next_id)} OWNED BY {TABLE}.id')
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)')
+
+        # Foreign keys and triggers move to the parent. Identical foreign
+        # keys on the old table are adopted on ATTACH, not re-validated.
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'", [LEGACY]
+        )
+        for name, definition in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+        cursor.execute(
+            'SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger '
+            'WHERE tgrelid = %s::regclass AND NOT tgisinternal', [LEGACY]
+        )
+        for name, definition in cursor.fetchall():
+            cursor.execute(f'DROP TRIGGER {name} ON {LEGACY}')
+            cursor.execute(ON_LEGACY_RE.sub(f' ON {TABLE} ', definition, count=1))
+
+        cursor.execute(
+            'SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid '
+            'WHERE x.indrelid = %s::regclass AND NOT x.indisprimary', [LEGACY]
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+        )
+        cursor.execute(f'ALTER TABLE {LEGACY} DROP CONSTRAINT {LEGACY}_range')
+
+        # The parent's indexes keep the names migrations know. Creating
+        # them adopts the old table's identical indexes instead of building.
+        for name, definition in indexes:
+            cursor.execute(f'ALTER INDEX {name} RENAME TO {name}_legacy')
+            cursor.execute(ON_LEGACY_RE.sub(f' ON {TABLE} ', definition, count=1))
+
+        cursor.execute(f'CREATE TABLE {DEFAULT} PARTITION OF {TABLE} DEFAULT')
+
+    create_partitions(connection, months_ahead, today)
+    return True
+
+
+def explain_partitions(connection, sql):
+    """
+    ``(planned, executed)``: the ticket partitions in the plan of ``sql``
+    after plan-time pruning, and those EXPLAIN ANALYZE actually read.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (ANALYZE, FORMAT JSON) ' + sql)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    planned, executed = set(), set()
+
+    def walk(node):
+        relation = node.get('Relation Name', '')
+        if relation.startswith(TABLE):
+            planned.add(relation)
+            if node.get('Actual Loops'):
+                executed.add(relation)
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return planned, executed
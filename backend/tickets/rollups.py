@@ -0,0 +1,120 @@
+"""
+The daily ticket flow rollup (TicketDailyRollup) behind /api/tickets/timeseries/.
+
+Rows are moved by the same ``counters.bucket`` snapshots as the stats
+counters, inside the same transaction as the ticket write: a ticket counts
+as created on the day it was created, and as resolved on the day it moved
+to "resolved" (resolved tickets are immutable, so that is also their
+``updated_at``). Deleting a ticket takes it out of both, as if it never
+existed; archiving leaves the rollup alone.
+
+The backlog is not stored. One created ticket would otherwise have to be
+added to every later day; as a running total it is one SUM.
+
+``rebuild_rollups`` recomputes a window of days from the live and archived
+tickets and deletes rows that have dropped to zero. Run it nightly
+(``manage.py compact_ticket_rollups``) to correct any drift, e.g. from
+writes made behind the ORM's back.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+
+from .models import ArchivedTicket, Ticket, TicketDailyRollup
+
+
+def deltas(before, after, resolved_on=None):
+    """
+    ``{(owner_id, priority, day): [created, resolved]}`` for a write that
+    turned the ``before`` bucket snapshots into the ``after`` ones.
+    Resolutions are dated ``resolved_on``, today by default.
+    """
+    resolved_on = resolved_on or timezone.localdate()
+    changes = defaultdict(lambda: [0, 0])
+    for sign, snapshots in ((-1, before), (1, after)):
+        for (owner_id, status, priority, day), _ in snapshots:
+            changes[owner_id, priority, day][0] += sign
+            if status == 'resolved':
+                changes[owner_id, priority, resolved_on][1] += sign
+    return changes
+
+
+def _increment(field, changes, column, match):
+    whens = [When(match[key], then=Value(delta[column])) for key, delta in changes.items() if delta[column]]
+    return F(field) + Case(*whens, default=Value(0)) if whens else F(field)
+
+
+def record(before, after, resolved_on=None):
+    """
+    Apply a write to the rollup with two statements however many rows it
+    touches: create the missing rows, then add every delta in one UPDATE.
+    """
+    changes = {key: delta for key, delta in deltas(before, after, resolved_on).items() if any(delta)}
+    if not changes:
+        return
+    TicketDailyRollup.objects.bulk_create(
+        [TicketDailyRollup(owner_id=owner_id, priority=priority, day=day) for owner_id, priority, day in changes],
+        ignore_conflicts=True,
+    )
+    match = {
+        key: Q(owner_id=key[0], priority=key[1], day=key[2]) for key in changes
+    }
+    TicketDailyRollup.objects.filter(reduce(or_, match.values())).update(
+        created=_increment('created', changes, 0, match),
+        resolved=_increment('resolved', changes, 1, match),
+    )
+
+
+def expected_rollups(since=None):
+    """Rollup rows computed from scratch (for days from ``since`` on), keyed like ``deltas``."""
+    expected = defaultdict(lambda: [0, 0])
+    for model in (Ticket, ArchivedTicket):
+        created = model.objects.order_by()
+        resolved = model.objects.filter(status='resolved').order_by()
+        if since is not None:
+            created = created.filter(created_at__date__gte=since)
+            resolved = resolved.filter(updated_at__date__gte=since)
+        for column, queryset, field in ((0, created, 'created_at__date'), (1, resolved, 'updated_at__date')):
+            rows = queryset.values_list('created_by_id', 'priority', field).annotate(count=Count('id'))
+            for owner_id, priority, day, count in rows:
+                expected[owner_id, priority, day][column] += count
+    return {key: tuple(value) for key, value in expected.items()}
+
+
+def stored_rollups(since=None):
+    rows = TicketDailyRollup.objects.exclude(created=0, resolved=0)
+    if since is not None:
+        rows = rows.filter(day__gte=since)
+    return {
+        (owner_id, priority, day): (created, resolved)
+        for owner_id, priority, day, created, resolved
+        in rows.values_list('owner_id', 'priority', 'day', 'created', 'resolved')
+    }
+
+
+@transaction.atomic
+def rebuild_rollups(days=None):
+    """
+    Recompute the rollup for the last ``days`` days (all of it by default).
+    Returns the keys whose stored value disagreed with the recomputed one.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1) if days else None
+    expected = expected_rollups(since)
+    stored = stored_rollups(since)
+    drift = {key for key in set(expected) | set(stored) if expected.get(key) != stored.get(key)}
+
+    window = TicketDailyRollup.objects.all() if since is None else TicketDailyRollup.objects.filter(day__gte=since)
+    window.delete()
+    TicketDailyRollup.objects.bulk_create(
+        (
+            TicketDailyRollup(owner_id=owner_id, priority=priority, day=day, created=created, resolved=resolved)
+            for (owner_id, priority, day), (created, resolved) in expected.items()
+        ),
+        batch_size=1000,
+    )
+    return drift
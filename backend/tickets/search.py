@@ -0,0 +1,169 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Cast
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import Ticket
+
+WORD_RE = re.compile(r'\w+')
+
+# Ranks are stored as scaled integers so they can serve as an exact
+# pagination key (see TicketCursorPagination).
+RANK_SCALE = 1000000
+
+
+def tokenize(text):
+    return WORD_RE.findall((text or '').lower())
+
+
+class BaseSearchBackend:
+    """
+    A ticket search backend filters a queryset down to the tickets matching
+    ``term`` and annotates each one with an integer ``search_rank``.
+    """
+
+    def search(self, queryset, term):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search over the trigger-maintained, GIN-indexed
+    ``Ticket.search_vector`` column. Every word is matched as a prefix, and
+    a trigram match on the title catches typos and infix fragments.
+
+    Both conditions are operators the GIN indexes serve (``@@`` and pg_trgm's
+    ``%``), so PostgreSQL ORs two bitmap index scans instead of reading the
+    table; ``similarity()`` is only computed for ranking the matches. The
+    trigram cut-off is the server's ``pg_trgm.similarity_threshold``
+    (0.3 by default).
+    """
+    config = 'english'
+
+    def search(self, queryset, term):
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+        words = tokenize(term)
+        if not words:
+            return queryset.none()
+        query = SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            search_type='raw',
+            config=self.config,
+        )
+        return queryset.filter(
+            # The lookup class, since django.contrib.postgres (which would
+            # register title__trigram_similar) is not an installed app.
+            Q(search_vector=query) | Q(TrigramSimilar(F('title'), term))
+        ).annotate(
+            search_rank=Cast(
+                (SearchRank(F('search_vector'), query) + TrigramSimilarity('title', term)) * RANK_SCALE,
+                IntegerField()
+            )
+        )
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+    A process-local inverted index for SQLite (tests and local development),
+    one per searched model (live and archived tickets).
+
+    An index is rebuilt whenever its table's (count, max id, max updated_at)
+    signature changes, so it never serves stale matches.
+    """
+    title_weight = 2
+    description_weight = 1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}  # model -> (signature, postings, terms)
+
+    def _current_signature(self, model):
+        return tuple(model.objects.aggregate(
+            count=Count('id'), last_id=Max('id'), last_update=Max('updated_at')
+        ).values())
+
+    def _build(self, model):
+        postings = defaultdict(lambda: defaultdict(int))
+        rows = model.objects.order_by().values_list('id', 'title', 'description')
+        for pk, title, description in rows.iterator():
+            for word in tokenize(title):
+                postings[word][pk] += self.title_weight
+            for word in tokenize(description):
+                postings[word][pk] += self.description_weight
+        return {word: dict(hits) for word, hits in postings.items()}
+
+    def index(self, model=Ticket):
+        signature = self._current_signature(model)
+        with self._lock:
+            cached = self._indexes.get(model)
+            if cached is None or cached[0] != signature:
+                postings = self._build(model)
+                cached = self._indexes[model] = (signature, postings, sorted(postings))
+            return cached[1], cached[2]
+
+    def match(self, term, model=Ticket):
+        """Return ``{ticket_id: score}`` for tickets containing every word as a prefix."""
+        postings, terms = self.index(model)
+        scores = None
+        for word in tokenize(term):
+            hits = defaultdict(int)
+            i = bisect_left(terms, word)
+            while i < len(terms) and terms[i].startswith(word):
+                for pk, weight in postings[terms[i]].items():
+                    hits[pk] += weight
+                i += 1
+            if scores is None:
+                scores = hits
+            else:
+                scores = {pk: scores[pk] + hits[pk] for pk in scores.keys() & hits.keys()}
+        return scores or {}
+
+    def search(self, queryset, term):
+        scores = self.match(term, queryset.model)
+        if not scores:
+            return queryset.none()
+        return queryset.filter(id__in=scores).annotate(
+            search_rank=Case(
+                *[When(id=pk, then=Value(score * RANK_SCALE)) for pk, score in scores.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+
+_backends = {}
+
+
+def get_search_backend():
+    """
+    The backend named by ``settings.TICKET_SEARCH_BACKEND``, or full-text
+    search on PostgreSQL and the in-memory index anywhere else.
+    """
+    path = getattr(settings, 'TICKET_SEARCH_BACKEND', None)
+    if path is None:
+        if connection.vendor == 'postgresql':
+            path = 'tickets.search.PostgresSearchBackend'
+        else:
+            path = 'tickets.search.InMemorySearchBackend'
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+class TicketSearchFilter(filters.SearchFilter):
+    """Drop-in replacement for SearchFilter that delegates to the configured search backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, ' '.join(terms))
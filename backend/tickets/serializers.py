@@ -1,26 +1,62 @@
 from rest_framework import serializers
 from accounts.models import User
-from .models import Ticket
+from .models import Ticket, TicketEvent
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'is_staff')
 
+class UserPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves users from ``context['users']`` (an ``in_bulk`` dict) when the
+    caller has preloaded them, so bulk writes don't look users up one by one.
+    """
+    def to_internal_value(self, data):
+        users = self.context.get('users')
+        if users is None:
+            return super().to_internal_value(data)
+        try:
+            return users[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    assigned_to = UserPrimaryKeyField(queryset=User.objects.all(), allow_null=True, required=False)
     created_by_email = serializers.EmailField(source='created_by.email', read_only=True)
-    assigned_to_email = serializers.EmailField(source='assigned_to.email', read_only=True)
+    assigned_to_email = serializers.EmailField(source='assigned_to.email', read_only=True, allow_null=True)
 
     class Meta:
         model = Ticket
         fields = [
             'id', 'title', 'description', 'priority', 'status',
             'created_by', 'assigned_to', 'created_at', 'updated_at',
-            'created_by_email', 'assigned_to_email'
+            'created_by_email', 'assigned_to_email', 'due_at', 'sla_breached_at'
         ]
-        read_only_fields = ['created_by', 'created_at', 'updated_at']
+        read_only_fields = ['created_by', 'created_at', 'updated_at', 'due_at', 'sla_breached_at']
 
     def create(self, validated_data):
         # Set the created_by field to the current user
         validated_data['created_by'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class BulkTransitionSerializer(serializers.Serializer):
+    """``context['max_items']`` caps ``ids``, like the other bulk actions' item count."""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES)
+
+    def validate_ids(self, ids):
+        max_items = self.context['max_items']
+        if len(ids) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} tickets per request.')
+        return ids
+
+
+class TicketEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TicketEvent
+        fields = ['id', 'kind', 'changes', 'actor', 'created_at']
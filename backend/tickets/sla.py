@@ -0,0 +1,106 @@
+"""
+SLA deadlines and breach detection.
+
+Every unresolved ticket has one deadline ticking, ``Ticket.due_at``: the
+response target of its priority while it is open, then the resolution
+target (``Ticket.SLA_TARGETS``, counted from ``created_at``). Ticket.save()
+and the bulk writes keep it in step with status and priority.
+
+``sweep`` flags tickets whose deadline has passed: it sets
+``sla_breached_at`` and records a "breached" event. It reads the partial
+index of unflagged deadlines (ticket_sla_pending_idx) up to now, and
+flagged tickets leave that index. A sweep therefore costs what it flags,
+however many tickets are open. A deadline that moves clears the flag, so
+the new deadline is swept in its turn. Run it every minute
+(``manage.py sweep_sla_breaches``).
+
+``in_state`` selects the breached and at-risk tickets for the SLA
+endpoint, as range scans on ticket_due_idx.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.utils import timezone
+
+from . import events
+from .cache import invalidate_on_commit
+from .models import Ticket
+
+STATES = ('breached', 'at_risk')
+
+
+def sla_settings():
+    config = getattr(settings, 'TICKET_SLA', {})
+    return {
+        'AT_RISK_MINUTES': config.get('AT_RISK_MINUTES', 60),
+        'SWEEP_BATCH_SIZE': config.get('SWEEP_BATCH_SIZE', 1000),
+    }
+
+
+def due_at_expression(status):
+    """``due_at`` as a database expression, for an UPDATE moving tickets to ``status``."""
+    if status == 'resolved':
+        return Value(None, output_field=DateTimeField())
+    target = 'response' if status == 'open' else 'resolution'
+    return Case(
+        *[
+            When(priority=priority, then=F('created_at') + Value(targets[target]))
+            for priority, targets in Ticket.SLA_TARGETS.items()
+        ],
+        output_field=DateTimeField(),
+    )
+
+
+def in_state(queryset, state, now=None):
+    """The tickets of ``queryset`` past their deadline, or due within AT_RISK_MINUTES."""
+    now = now or timezone.now()
+    if state == 'breached':
+        return queryset.filter(due_at__lte=now)
+    window = timedelta(minutes=sla_settings()['AT_RISK_MINUTES'])
+    return queryset.filter(due_at__gt=now, due_at__lte=now + window)
+
+
+def pending(now=None):
+    """Unflagged tickets whose deadline has passed, earliest first."""
+    return Ticket.objects.filter(
+        sla_breached_at__isnull=True, due_at__lte=now or timezone.now()
+    ).order_by('due_at')
+
+
+def sweep_batch(now, batch_size):
+    """Flag the first ``batch_size`` newly breached tickets. Returns how many."""
+    with transaction.atomic():
+        # Tickets locked by a concurrent write are left for the next sweep.
+        batch = list(
+            pending(now).select_for_update(skip_locked=True)
+            .only('id', 'created_by', 'status', 'priority', 'due_at')[:batch_size]
+        )
+        if not batch:
+            return 0
+        # updated_at moves too, so ETags and cached responses show the flag.
+        Ticket.objects.filter(pk__in=[ticket.pk for ticket in batch]).update(
+            sla_breached_at=now, updated_at=now
+        )
+        events.record(events.breached(batch, now))
+        for owner_id in {ticket.created_by_id for ticket in batch}:
+            invalidate_on_commit(owner_id)
+    return len(batch)
+
+
+def sweep(batch_size=None, pause=0.0, now=None):
+    """
+    Flag every ticket whose deadline passed by ``now``, in batches.
+    Yields the size of each batch as it commits.
+    """
+    batch_size = batch_size or sla_settings()['SWEEP_BATCH_SIZE']
+    now = now or timezone.now()
+    while True:
+        flagged = sweep_batch(now, batch_size)
+        if not flagged:
+            return
+        yield flagged
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,236 @@
+import asyncio
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Ticket, TicketCounter, TicketDailyRollup, TicketEvent
+from .partitions import month_start
+
+TIMESERIES_BUCKETS = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+}
+
+
+def _total(field='count', **filters):
+    return Coalesce(Sum(field, filter=Q(**filters) if filters else None), 0)
+
+
+def _status_counters():
+    return {
+        'total_tickets': _total(),
+        'open_tickets': _total(status='open'),
+        'in_progress_tickets': _total(status='in_progress'),
+        'resolved_tickets': _total(status='resolved'),
+    }
+
+
+def counters_for(user):
+    """The counter buckets visible to ``user``, mirroring TicketViewSet.get_queryset."""
+    if user.is_staff:
+        return TicketCounter.objects.all()
+    return TicketCounter.objects.filter(owner=user)
+
+
+def rollups_for(user):
+    """The daily flow rollup rows visible to ``user``."""
+    if user.is_staff:
+        return TicketDailyRollup.objects.all()
+    return TicketDailyRollup.objects.filter(owner=user)
+
+
+def events_for(user):
+    """The ticket events visible to ``user``, mirroring TicketViewSet.get_queryset."""
+    if user.is_staff:
+        return TicketEvent.objects.all()
+    return TicketEvent.objects.filter(ticket__created_by=user)
+
+
+def ticket_stats(counters):
+    """Status counters for the dashboard, summed from the counter buckets."""
+    return counters.aggregate(**_status_counters())
+
+
+def _days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _admin_queries(counters, events, now):
+    """
+    The three independent admin_stats queries: bucket aggregates, the
+    daily created trend, and the daily resolved trend. Also returns the
+    days the trends cover.
+    """
+    now = now or timezone.now()
+    since = timezone.localdate(now - timedelta(days=30))
+    last_month = timezone.make_aware(datetime.combine(since, time.min))
+
+    aggregates = _status_counters()
+    aggregates.update({
+        # Priority breakdown
+        'high_priority': _total(priority='high'),
+        'medium_priority': _total(priority='medium'),
+        'low_priority': _total(priority='low'),
+
+        # Time-based metrics
+        'created_last_30_days': _total(day__gte=since),
+
+        # Response metrics
+        'unassigned_tickets': _total('unassigned'),
+        'aging_tickets': _total(status='open', day__lt=since),
+    })
+
+    # Resolutions come from the event log (ticket_event_resolved_idx);
+    # resolved tickets are immutable, so each is resolved at most once. One
+    # grouped query gives the daily throughput, and its per-day sums give
+    # the totals.
+    daily_resolved = events.filter(
+        status='resolved', created_at__gte=last_month
+    ).annotate(
+        day=TruncDate('created_at')
+    ).values('day').annotate(
+        count=Count('id'),
+        resolution_time=Sum(F('created_at') - F('ticket__created_at')),
+    ).order_by('day')
+
+    # Daily tickets trend
+    daily = counters.filter(
+        day__gte=since
+    ).values('day').annotate(
+        count=Sum('count')
+    ).filter(count__gt=0).order_by('day')
+    return aggregates, daily, daily_resolved, _days(since, timezone.localdate(now))
+
+
+def _daily(rows, days):
+    """One entry per day, zero on days without rows."""
+    counts = {row['day']: row['count'] for row in rows}
+    return [{'date': day, 'count': counts.get(day, 0)} for day in days]
+
+
+def _add_resolutions(stats, rows, days):
+    resolved = sum(row['count'] for row in rows)
+    total_time = sum((row['resolution_time'] for row in rows), timedelta())
+    stats['resolved_last_30_days'] = resolved
+    stats['avg_resolution_hours'] = (
+        round(total_time.total_seconds() / resolved / 3600, 1) if resolved else None
+    )
+    stats['daily_resolved'] = _daily(rows, days)
+    return stats
+
+
+def admin_ticket_stats(counters, events, now=None):
+    """
+    Every admin dashboard counter in one aggregation pass over the counter
+    buckets, the daily trend as a second (grouped) query, and resolution
+    metrics from the event log (``events``).
+
+    Buckets are per day, so the 30 day windows are evaluated on calendar
+    days; the result only depends on the data and today's date. Buckets do
+    not record when a ticket was resolved, so ``resolved_last_30_days``,
+    ``avg_resolution_hours`` (resolution event minus ticket creation) and
+    ``daily_resolved`` come from the "resolved" events, grouped per day.
+    """
+    aggregates, daily, daily_resolved, days = _admin_queries(counters, events, now)
+    stats = counters.aggregate(**aggregates)
+    stats['daily_tickets'] = _daily(daily, days)
+    return _add_resolutions(stats, list(daily_resolved), days)
+
+
+async def aticket_stats(counters):
+    return await counters.aaggregate(**_status_counters())
+
+
+async def aadmin_ticket_stats(counters, events, now=None):
+    """``admin_ticket_stats`` with its queries awaited concurrently."""
+    aggregates, daily, daily_resolved, days = _admin_queries(counters, events, now)
+
+    async def rows(queryset):
+        return [row async for row in queryset]
+
+    stats, daily_rows, resolved_rows = await asyncio.gather(
+        counters.aaggregate(**aggregates), rows(daily), rows(daily_resolved)
+    )
+    stats['daily_tickets'] = _daily(daily_rows, days)
+    return _add_resolutions(stats, resolved_rows, days)
+
+
+def bucket_start(day, bucket):
+    """The first day of the ``bucket`` (day, ISO week or month) holding ``day``."""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start, end, bucket):
+    """Every bucket overlapping ``start``..``end``, by first day."""
+    day = bucket_start(start, bucket)
+    starts = []
+    while day <= end:
+        starts.append(day)
+        if bucket == 'month':
+            day = month_start(day, 1)
+        else:
+            day += timedelta(days=7 if bucket == 'week' else 1)
+    return starts
+
+
+def ticket_timeseries(rollups, start, end, bucket='day'):
+    """
+    Tickets created and resolved per ``bucket`` from ``start`` to ``end``
+    (inclusive), and the open backlog at the end of each bucket, in total
+    and per priority. Every bucket is present, zero when nothing happened.
+    Buckets are labelled by their first day; the first and last may be cut
+    short by the window.
+
+    Two grouped queries over the rollup: the backlog carried into the
+    window, and the window summed per bucket and priority by the database.
+    Python only lays the sums out as one column per priority and takes
+    running totals, so the cost follows the number of buckets rather than
+    tickets or days.
+    """
+    carried = {
+        row['priority']: row['created'] - row['resolved']
+        for row in rollups.filter(day__lt=start).order_by().values('priority').annotate(
+            created=Sum('created'), resolved=Sum('resolved')
+        )
+    }
+    rows = rollups.filter(day__gte=start, day__lte=end).annotate(
+        period=TIMESERIES_BUCKETS[bucket]
+    ).order_by().values('period', 'priority').annotate(created=Sum('created'), resolved=Sum('resolved'))
+
+    starts = bucket_starts(start, end, bucket)
+    index = {day: i for i, day in enumerate(starts)}
+    priorities = [priority for priority, _ in Ticket.PRIORITY_CHOICES]
+    created = {priority: [0] * len(starts) for priority in priorities}
+    resolved = {priority: [0] * len(starts) for priority in priorities}
+    for row in rows:
+        created[row['priority']][index[row['period']]] += row['created']
+        resolved[row['priority']][index[row['period']]] += row['resolved']
+    backlog = {
+        priority: list(accumulate(
+            (c - r for c, r in zip(created[priority], resolved[priority])),
+            initial=carried.get(priority, 0),
+        ))[1:]
+        for priority in priorities
+    }
+
+    columns = {'created': created, 'resolved': resolved, 'backlog': backlog}
+    totals = {name: [sum(values) for values in zip(*column.values())] for name, column in columns.items()}
+    return [
+        {
+            'date': day,
+            **{name: totals[name][i] for name in columns},
+            'priorities': {
+                priority: {name: column[priority][i] for name, column in columns.items()}
+                for priority in priorities
+            },
+        }
+        for i, day in enumerate(starts)
+    ]
@@ -1,3 +1,1474 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import tracemalloc
+from base64 import b64encode
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import request_finished, request_started
+from django.db import OperationalError, close_old_connections, connection, connections, router
+from django.test import AsyncClient, AsyncRequestFactory, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import USER_CACHE_ALIAS
+from accounts.models import User
+from ticket_system import replicas
+from . import async_views, partitions
+from .cache import bump_versions, get_ticket_cache, LocMemLRUCache
+from .counters import bucket, counter_drift, rebuild_counters
+from .feed import RESYNC, InProcessBroker, change
+from .models import ArchivedTicket, Ticket, TicketCounter, TicketDailyRollup, TicketEvent
+from .pagination import Cursor, TicketCursorPagination
+from .rollups import expected_rollups, rebuild_rollups, stored_rollups
+
+REPLICA = 'replica'
+
+
+class TicketTestMixin:
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', password='Passw0rd!')
+        self.admin.is_staff = True
+        self.admin.role = 'admin'
+        self.admin.save()
+        self.user = User.objects.create_user(email='user@example.com', password='Passw0rd!')
+        self.client = APIClient()
+        get_ticket_cache().clear()
+        caches[USER_CACHE_ALIAS].clear()
+
+    def make_ticket(self, **kwargs):
+        kwargs.setdefault('title', 'Printer on fire')
+        kwargs.setdefault('description', 'It is really on fire')
+        kwargs.setdefault('created_by', self.user)
+        ticket = Ticket.objects.create(**kwargs)
+        # Writes outside TicketViewSet must invalidate cached reads themselves.
+        bump_versions(ticket.created_by_id)
+        return ticket
+
+
+class AdminStatsTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        old = timezone.now() - timedelta(days=45)
+        self.make_ticket(priority='high')
+        self.make_ticket(priority='medium', status='in_progress', assigned_to=self.admin)
+        aged = self.make_ticket()
+        Ticket.objects.filter(pk=aged.pk).update(created_at=old, updated_at=old)
+        resolved = self.make_ticket()
+        rebuild_counters()
+        # Resolution metrics come from the event log, so resolve through the API.
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/tickets/{resolved.pk}/', {'status': 'resolved', 'assigned_to': self.admin.pk})
+
+    def test_admin_stats_counters(self):
+        self.client.force_authenticate(self.admin)
+        data = self.client.get('/api/tickets/admin_stats/').json()
+
+        self.assertEqual(data['total_tickets'], 4)
+        self.assertEqual(data['open_tickets'], 2)
+        self.assertEqual(data['in_progress_tickets'], 1)
+        self.assertEqual(data['resolved_tickets'], 1)
+        self.assertEqual(data['high_priority'], 1)
+        self.assertEqual(data['medium_priority'], 1)
+        self.assertEqual(data['low_priority'], 2)
+        self.assertEqual(data['created_last_30_days'], 3)
+        self.assertEqual(data['resolved_last_30_days'], 1)
+        self.assertEqual(data['avg_resolution_hours'], 0.0)
+        self.assertEqual(sum(day['count'] for day in data['daily_resolved']), 1)
+        self.assertEqual(data['unassigned_tickets'], 2)
+        self.assertEqual(data['aging_tickets'], 1)
+        self.assertEqual(sum(day['count'] for day in data['daily_tickets']), 3)
+
+    def test_admin_stats_query_count(self):
+        # The ETag aggregate, one aggregate pass over the counters, one
+        # group-by for the daily trend and one group-by over the resolution
+        # events. Adding a metric must not add another round trip.
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/tickets/admin_stats/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_stats_query_count(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/tickets/stats/').json()
+        self.assertEqual(data['total_tickets'], 4)
+        self.assertEqual(data['open_tickets'], 2)
+
+    def test_admin_stats_requires_staff(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/tickets/admin_stats/')
+        self.assertEqual(response.status_code, 403)
+
+
+class TicketCounterTests(TicketTestMixin, TestCase):
+    def test_viewset_writes_keep_counters_in_sync(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/tickets/', {
+            'title': 'VPN down', 'description': 'Cannot connect', 'priority': 'high',
+        })
+        self.assertEqual(response.status_code, 201)
+        ticket_id = response.json()['id']
+        self.assertEqual(counter_drift(), set())
+
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/tickets/{ticket_id}/', {'status': 'in_progress'})
+        self.client.patch(f'/api/tickets/{ticket_id}/', {'assigned_to': self.admin.pk})
+        self.assertEqual(counter_drift(), set())
+
+        data = self.client.get('/api/tickets/stats/').json()
+        self.assertEqual(data['in_progress_tickets'], 1)
+
+        self.client.delete(f'/api/tickets/{ticket_id}/')
+        self.assertEqual(counter_drift(), set())
+        self.assertEqual(self.client.get('/api/tickets/stats/').json()['total_tickets'], 0)
+
+    def test_stats_scoped_to_owner(self):
+        self.make_ticket()
+        self.make_ticket(created_by=self.admin)
+        rebuild_counters()
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/tickets/stats/').json()['total_tickets'], 1)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/tickets/stats/').json()['total_tickets'], 2)
+
+    def test_rebuild_command_reconciles_bulk_import(self):
+        Ticket.objects.bulk_create([
+            Ticket(title=f'Imported {i}', description='', created_by=self.user)
+            for i in range(5)
+        ])
+        self.assertEqual(len(counter_drift()), 1)
+
+        out = StringIO()
+        call_command('rebuild_ticket_counters', stdout=out)
+        self.assertIn('1 bucket(s) corrected', out.getvalue())
+        self.assertEqual(counter_drift(), set())
+        self.assertEqual(TicketCounter.objects.get().count, 5)
+
+
+class TicketIndexTests(TicketTestMixin, TestCase):
+    """The queries TicketViewSet issues must be served by the indexes on Ticket."""
+
+    def setUp(self):
+        super().setUp()
+        self.make_ticket()
+        self.make_ticket(status='resolved', assigned_to=self.admin)
+
+    def ticket_query_plan(self, url, user, index=-1, table='tickets_ticket'):
+        """Plan of the ``index``-th ``table`` query the endpoint runs; the first is the ETag aggregate."""
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        sql = [
+            q['sql'] for q in ctx.captured_queries
+            if f'FROM "{table}"' in q['sql']
+        ][index]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # The tables are tiny; make the planner show what it would use at scale.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return ' '.join(str(col) for row in cursor.fetchall() for col in row)
+
+    def test_staff_list_uses_created_index(self):
+        plan = self.ticket_query_plan('/api/tickets/', self.admin)
+        self.assertIn('ticket_created_idx', plan)
+
+    def test_own_list_uses_owner_created_index(self):
+        plan = self.ticket_query_plan('/api/tickets/', self.user)
+        self.assertIn('ticket_owner_created_idx', plan)
+
+    def test_status_filter_uses_status_created_index(self):
+        plan = self.ticket_query_plan('/api/tickets/?status=open', self.admin)
+        self.assertIn('ticket_status_created_idx', plan)
+
+    def test_assignee_filters_use_assignee_index(self):
+        plan = self.ticket_query_plan(f'/api/tickets/?assigned_to={self.admin.pk}', self.admin)
+        self.assertIn('ticket_assignee_created_idx', plan)
+        plan = self.ticket_query_plan('/api/tickets/?assigned_to__isnull=true', self.admin)
+        self.assertIn('ticket_assignee_created_idx', plan)
+
+    def test_etag_queries_use_covering_indexes(self):
+        plan = self.ticket_query_plan('/api/tickets/', self.admin, index=0)
+        self.assertIn('ticket_updated_idx', plan)
+        plan = self.ticket_query_plan('/api/tickets/stats/', self.user, index=0)
+        self.assertIn('ticket_owner_updated_idx', plan)
+
+    def test_admin_stats_uses_resolved_index(self):
+        plan = self.ticket_query_plan('/api/tickets/admin_stats/', self.admin, table='tickets_ticketevent')
+        self.assertIn('ticket_event_resolved_idx', plan)
+
+    def test_archived_list_uses_archive_index(self):
+        plan = self.ticket_query_plan('/api/tickets/?include_archived=1', self.user, table='tickets_archivedticket')
+        self.assertIn('archive_owner_created_idx', plan)
+
+    def test_history_uses_ticket_event_index(self):
+        ticket = Ticket.objects.first()
+        plan = self.ticket_query_plan(f'/api/tickets/{ticket.pk}/history/', self.admin, table='tickets_ticketevent')
+        self.assertIn('ticket_event_ticket_idx', plan)
+
+
+class TicketPaginationTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+        # Identical timestamps exercise the id tie-breaker in the cursor key.
+        same_time = timezone.now()
+        for i in range(5):
+            ticket = self.make_ticket(title=f'Ticket {i}')
+            Ticket.objects.filter(pk=ticket.pk).update(created_at=same_time)
+
+    def walk(self, url):
+        titles = []
+        while url:
+            data = self.client.get(url).json()
+            titles.extend(ticket['title'] for ticket in data['results'])
+            url = data['next']
+        return titles
+
+    def test_cursor_pagination_is_default(self):
+        data = self.client.get('/api/tickets/?page_size=2').json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['previous'])
+        self.assertIn('cursor=', data['next'])
+
+    def test_walk_visits_every_ticket_once(self):
+        titles = self.walk('/api/tickets/?page_size=2')
+        self.assertEqual(titles, [f'Ticket {i}' for i in reversed(range(5))])
+
+    def test_walk_is_stable_under_concurrent_inserts(self):
+        first = self.client.get('/api/tickets/?page_size=2').json()
+        self.make_ticket(title='Inserted meanwhile')
+
+        titles = [ticket['title'] for ticket in first['results']]
+        titles += self.walk(first['next'])
+        self.assertEqual(titles, [f'Ticket {i}' for i in reversed(range(5))])
+
+    def test_previous_link_returns_to_earlier_page(self):
+        first = self.client.get('/api/tickets/?page_size=2').json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_deep_page_is_a_bounded_range_scan(self):
+        first = self.client.get('/api/tickets/?page_size=2').json()
+        get_ticket_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first['next'])
+        page = [q['sql'] for q in ctx.captured_queries if 'ORDER BY "tickets_ticket"."created_at" DESC' in q['sql']]
+        self.assertEqual(len(page), 1)
+        self.assertIn('"tickets_ticket"."created_at" <= ', page[0])
+        self.assertIn('"tickets_ticket"."id" < ', page[0])
+        self.assertIn('LIMIT 3', page[0])
+        self.assertNotIn('OFFSET', page[0])
+
+    def test_offset_pagination_is_opt_in(self):
+        data = self.client.get('/api/tickets/?pagination=offset&limit=2&offset=4').json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([t['title'] for t in data['results']], ['Ticket 0'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/tickets/?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_invalid_value(self):
+        cursor = b64encode(b'v=notadate&i=1').decode('ascii')
+        response = self.client.get(f'/api/tickets/?cursor={cursor}')
+        self.assertEqual(response.status_code, 404)
+
+
+class TicketSearchTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+        self.make_ticket(title='Printer jammed', description='Paper stuck in tray 2')
+        self.make_ticket(title='Laptop battery', description='The printer driver drains it')
+        self.make_ticket(title='VPN timeout', description='Disconnects every hour')
+
+    def search(self, term, **params):
+        params['search'] = term
+        return [t['title'] for t in self.client.get('/api/tickets/', params).json()['results']]
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search('printer'), ['Printer jammed', 'Laptop battery'])
+
+    def test_partial_words_match(self):
+        self.assertEqual(self.search('print'), ['Printer jammed', 'Laptop battery'])
+        self.assertEqual(self.search('disconn'), ['VPN timeout'])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search('printer tray'), ['Printer jammed'])
+        self.assertEqual(self.search('printer vpn'), [])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search('keyboard'), [])
+        self.make_ticket(title='Keyboard missing keys')
+        self.assertEqual(self.search('keyboard'), ['Keyboard missing keys'])
+
+    def test_search_respects_scope_and_filters(self):
+        self.make_ticket(title='Printer on floor 3', created_by=self.admin, status='resolved')
+        self.assertEqual(self.search('printer', status='resolved'), ['Printer on floor 3'])
+        self.client.force_authenticate(self.user)
+        self.assertNotIn('Printer on floor 3', self.search('printer'))
+
+    def test_ranked_results_paginate(self):
+        first = self.client.get('/api/tickets/', {'search': 'printer', 'page_size': 1}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [t['title'] for t in first['results'] + second['results']],
+            ['Printer jammed', 'Laptop battery']
+        )
+        self.assertIsNone(second['next'])
+
+
+class TicketListQueryCountTests(TicketTestMixin, TestCase):
+    def list_queries(self, tickets):
+        Ticket.objects.all().delete()
+        for _ in range(tickets):
+            self.make_ticket(assigned_to=self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get('/api/tickets/', {'page_size': 200}).json()
+        self.assertEqual(len(data['results']), tickets)
+        return len(ctx)
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.list_queries(2), self.list_queries(20))
+
+    def test_serializes_related_emails(self):
+        ticket = self.make_ticket(assigned_to=self.admin)
+        self.client.force_authenticate(self.admin)
+        data = self.client.get(f'/api/tickets/{ticket.pk}/').json()
+        self.assertEqual(data['created_by_email'], 'user@example.com')
+        self.assertEqual(data['assigned_to'], self.admin.pk)
+        self.assertEqual(data['assigned_to_email'], 'admin@example.com')
+
+    def test_unassign_with_empty_value(self):
+        ticket = self.make_ticket(assigned_to=self.admin)
+        self.client.force_authenticate(self.admin)
+        data = self.client.patch(f'/api/tickets/{ticket.pk}/', {'assigned_to': ''}).json()
+        self.assertIsNone(data['assigned_to'])
+        self.assertIsNone(data['assigned_to_email'])
+
+
+class TicketCacheTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.make_ticket()
+
+    def test_repeated_reads_are_served_from_cache(self):
+        hits = get_ticket_cache().stats()['hits']
+        self.client.force_authenticate(self.user)
+        first = self.client.get('/api/tickets/').json()
+        # Only the ETag aggregate runs on a cache hit.
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/tickets/').json()
+        self.assertEqual(first, second)
+        self.client.get(f'/api/tickets/{self.ticket.pk}/')
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/tickets/{self.ticket.pk}/')
+        self.assertEqual(get_ticket_cache().stats()['hits'] - hits, 2)
+
+    def test_params_and_scope_are_part_of_the_key(self):
+        self.make_ticket(created_by=self.admin, status='resolved')
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(len(self.client.get('/api/tickets/').json()['results']), 2)
+        self.assertEqual(len(self.client.get('/api/tickets/?status=resolved').json()['results']), 1)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(len(self.client.get('/api/tickets/').json()['results']), 1)
+
+    def test_writes_invalidate_owner_and_staff_views(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get('/api/tickets/')
+        self.client.force_authenticate(self.user)
+        self.client.get(f'/api/tickets/{self.ticket.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tickets/{self.ticket.pk}/', {'priority': 'high'})
+
+        self.assertEqual(self.client.get(f'/api/tickets/{self.ticket.pk}/').json()['priority'], 'high')
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/tickets/').json()['results'][0]['priority'], 'high')
+
+    def test_other_owners_stay_cached(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get('/api/tickets/?created_by=%d' % self.admin.pk)
+        self.client.force_authenticate(self.user)
+        self.client.get('/api/tickets/')
+        bump_versions(self.admin.pk)
+        with self.assertNumQueries(1):
+            self.client.get('/api/tickets/')
+
+    def test_cache_stats_is_staff_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/tickets/cache_stats/').status_code, 403)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(
+            set(self.client.get('/api/tickets/cache_stats/').json()),
+            {'hits', 'misses', 'sets', 'evictions'}
+        )
+
+
+class LocMemLRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LocMemLRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_bounded_by_size(self):
+        cache = LocMemLRUCache(max_bytes=200)
+        cache.set('a', 'x' * 120)
+        cache.set('b', 'y' * 120)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'y' * 120)
+
+    def test_cached_values_are_copies(self):
+        cache = LocMemLRUCache()
+        value = {'results': [1]}
+        cache.set('k', value)
+        cache.get('k')['results'].append(2)
+        self.assertEqual(cache.get('k'), {'results': [1]})
+
+
+class TicketETagTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.make_ticket()
+        self.client.force_authenticate(self.admin)
+
+    def test_unchanged_resources_return_304(self):
+        for url in ['/api/tickets/', f'/api/tickets/{self.ticket.pk}/',
+                    '/api/tickets/stats/', '/api/tickets/admin_stats/']:
+            with self.subTest(url=url):
+                get_ticket_cache().clear()
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertFalse(response.content)
+
+    def test_writes_change_the_etag(self):
+        url = '/api/tickets/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tickets/{self.ticket.pk}/', {'status': 'in_progress'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/tickets/{self.ticket.pk}/')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_query_params_change_the_etag(self):
+        self.assertNotEqual(
+            self.client.get('/api/tickets/')['ETag'],
+            self.client.get('/api/tickets/?page_size=1')['ETag']
+        )
+
+    def test_missing_ticket_is_not_tagged(self):
+        response = self.client.get('/api/tickets/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class TicketBulkTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def test_bulk_create_reports_per_item_results(self):
+        response = self.client.post('/api/tickets/bulk_create/', [
+            {'title': 'One', 'description': 'a', 'assigned_to': self.user.pk},
+            {'title': '', 'description': 'b'},
+            {'title': 'Three', 'description': 'c', 'priority': 'high'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'created'])
+        self.assertIn('title', results[1]['errors'])
+        self.assertEqual(Ticket.objects.get(pk=results[0]['id']).assigned_to, self.user)
+        self.assertEqual(counter_drift(), set())
+
+    def test_bulk_create_query_count_is_constant(self):
+        items = [{'title': f'T{i}', 'description': 'x', 'assigned_to': self.user.pk} for i in range(50)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/tickets/bulk_create/', items, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Including the single INSERT of all 50 "created" events and the two
+        # statements that update the daily rollup.
+        self.assertLess(len(ctx), 13)
+
+    def test_bulk_update_keeps_resolved_tickets_immutable(self):
+        open_ticket = self.make_ticket()
+        resolved = self.make_ticket(status='resolved')
+        rebuild_counters()
+        response = self.client.patch('/api/tickets/bulk_update/', [
+            {'id': open_ticket.pk, 'priority': 'high', 'assigned_to': self.admin.pk},
+            {'id': resolved.pk, 'priority': 'high'},
+            {'id': 999999, 'priority': 'high'},
+            {'id': open_ticket.pk, 'priority': 'low'},
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [r['status'] for r in response.json()['results']],
+            ['updated', 'error', 'error', 'error']
+        )
+        open_ticket.refresh_from_db()
+        resolved.refresh_from_db()
+        self.assertEqual((open_ticket.priority, open_ticket.assigned_to), ('high', self.admin))
+        self.assertEqual(resolved.priority, 'low')
+        self.assertEqual(counter_drift(), set())
+
+    def test_bulk_transition_single_update(self):
+        tickets = [self.make_ticket() for _ in range(20)]
+        resolved = self.make_ticket(status='resolved')
+        ids = [t.pk for t in tickets] + [resolved.pk]
+        rebuild_counters()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                '/api/tickets/bulk_transition/', {'ids': ids, 'status': 'in_progress'}, format='json'
+            )
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['updated'] * 20 + ['error'])
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "tickets_ticket"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Ticket.objects.filter(status='in_progress').count(), 20)
+        self.assertEqual(counter_drift(), set())
+
+    def test_bulk_transition_is_scoped_to_visible_tickets(self):
+        other = self.make_ticket(created_by=self.admin)
+        mine = self.make_ticket()
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            '/api/tickets/bulk_transition/', {'ids': [mine.pk, other.pk], 'status': 'resolved'}, format='json'
+        )
+        self.assertEqual([r['status'] for r in response.json()['results']], ['updated', 'error'])
+        other.refresh_from_db()
+        self.assertEqual(other.status, 'open')
+
+    @mock.patch('tickets.views.TicketViewSet.bulk_max_items', 2)
+    def test_bulk_transition_honours_the_item_limit(self):
+        ids = [self.make_ticket().pk for _ in range(3)]
+        response = self.client.post(
+            '/api/tickets/bulk_transition/', {'ids': ids, 'status': 'resolved'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.filter(status='resolved').exists())
+
+    def test_bulk_rejects_non_list_payload(self):
+        response = self.client.post('/api/tickets/bulk_create/', {'title': 'x'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_bulk_tickets', count=5, stdout=out)
+        self.assertIn('bulk_transition', out.getvalue())
+        self.assertFalse(Ticket.objects.filter(title__startswith='Benchmark').exists())
+
+
+class TicketEventTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def test_writes_record_events_with_diffs(self):
+        self.client.force_authenticate(self.user)
+        ticket_id = self.client.post('/api/tickets/', {
+            'title': 'VPN down', 'description': 'Cannot connect', 'priority': 'high',
+        }).json()['id']
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/tickets/{ticket_id}/', {'title': 'VPN still down'})
+        self.client.patch(f'/api/tickets/{ticket_id}/', {'status': 'in_progress', 'assigned_to': self.admin.pk})
+
+        events = list(TicketEvent.objects.filter(ticket_id=ticket_id))
+        # Title edits are not tracked, so they leave no event.
+        self.assertEqual([e.kind for e in events], ['created', 'updated'])
+        self.assertEqual(events[0].actor, self.user)
+        self.assertEqual(events[0].changes, {'status': [None, 'open'], 'priority': [None, 'high']})
+        self.assertEqual(events[1].changes, {
+            'status': ['open', 'in_progress'], 'assigned_to': [None, self.admin.pk],
+        })
+        self.assertEqual(events[1].status, 'in_progress')
+
+        self.client.delete(f'/api/tickets/{ticket_id}/')
+        self.assertEqual(TicketEvent.objects.filter(ticket_id=ticket_id).last().kind, 'deleted')
+
+    def test_bulk_writes_record_one_insert_of_events(self):
+        tickets = [self.make_ticket() for _ in range(10)]
+        rebuild_counters()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post('/api/tickets/bulk_transition/', {
+                'ids': [t.pk for t in tickets], 'status': 'resolved',
+            }, format='json')
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "tickets_ticketevent"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(TicketEvent.objects.filter(status='resolved', actor=self.admin).count(), 10)
+
+        ticket = self.make_ticket()
+        self.client.patch('/api/tickets/bulk_update/', [
+            {'id': ticket.pk, 'priority': 'high'},
+        ], format='json')
+        self.assertEqual(TicketEvent.objects.get(ticket=ticket).changes, {'priority': ['low', 'high']})
+
+    def test_history_is_paginated_oldest_first(self):
+        ticket = self.make_ticket()
+        for priority in ['high', 'medium', 'low']:
+            self.client.patch(f'/api/tickets/{ticket.pk}/', {'priority': priority})
+        data = self.client.get(f'/api/tickets/{ticket.pk}/history/?page_size=2').json()
+        self.assertEqual([e['changes']['priority'][1] for e in data['results']], ['high', 'medium'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([e['changes']['priority'][1] for e in data['results']], ['low'])
+        self.assertIsNone(data['next'])
+
+    def test_history_is_scoped_to_visible_tickets(self):
+        other = self.make_ticket(created_by=self.admin)
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f'/api/tickets/{other.pk}/history/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TicketArchiveTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        old = timezone.now() - timedelta(days=100)
+        self.archivable = []
+        for i in range(3):
+            ticket = self.make_ticket(title=f'Old printer {i}', status='resolved', assigned_to=self.admin)
+            Ticket.objects.filter(pk=ticket.pk).update(updated_at=old + timedelta(minutes=i))
+            self.archivable.append(ticket.pk)
+        self.open = self.make_ticket(title='Old open')
+        Ticket.objects.filter(pk=self.open.pk).update(updated_at=old)
+        self.recent = self.make_ticket(title='Recently resolved', status='resolved')
+        rebuild_counters()
+        self.client.force_authenticate(self.user)
+
+    def archive(self, **options):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_tickets', stdout=out, **options)
+        return out.getvalue()
+
+    def ids(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(ticket['id'] for ticket in data['results'])
+            url = data['next']
+        return ids
+
+    def test_archives_old_resolved_tickets_in_batches(self):
+        stats = self.client.get('/api/tickets/stats/').json()
+        self.assertIn('3 tickets would be archived', self.archive(dry_run=True))
+        self.assertIn('Archived 3 tickets in 3 batches', self.archive(batch_size=1))
+        self.assertEqual(sorted(ArchivedTicket.objects.values_list('id', flat=True)), self.archivable)
+        self.assertFalse(Ticket.objects.filter(pk__in=self.archivable).exists())
+        archived = ArchivedTicket.objects.get(pk=self.archivable[0])
+        self.assertEqual((archived.title, archived.assigned_to), ('Old printer 0', self.admin))
+        # Counters still count archived tickets.
+        self.assertEqual(counter_drift(), set())
+        self.assertEqual(self.client.get('/api/tickets/stats/').json(), stats)
+        self.assertIn('Archived 0 tickets', self.archive())
+
+    def test_rejects_archiving_inside_the_stats_window(self):
+        with self.assertRaises(CommandError):
+            self.archive(after_days=7)
+
+    def test_list_includes_archived_only_on_request(self):
+        before = self.ids('/api/tickets/')
+        self.archive()
+        self.assertEqual(self.ids('/api/tickets/'), [self.recent.pk, self.open.pk])
+        # Pages interleave both tables in the usual order.
+        self.assertEqual(self.ids('/api/tickets/?include_archived=1&page_size=2'), before)
+        self.assertEqual(self.ids('/api/tickets/?include_archived=1&status=resolved&search=printer'),
+                         self.archivable[::-1])
+        response = self.client.get('/api/tickets/?include_archived=1&pagination=offset')
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_etag_changes_when_tickets_are_archived(self):
+        etag = self.client.get('/api/tickets/?include_archived=1')['ETag']
+        self.archive()
+        response = self.client.get('/api/tickets/?include_archived=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_retrieve_and_history_fall_back_to_archive(self):
+        pk = self.archivable[0]
+        expected = self.client.get(f'/api/tickets/{pk}/').json()
+        self.archive()
+        response = self.client.get(f'/api/tickets/{pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(self.client.get(f'/api/tickets/{pk}/history/').status_code, 200)
+        # Archived tickets stay read-only.
+        self.assertEqual(self.client.patch(f'/api/tickets/{pk}/', {'title': 'x'}).status_code, 404)
+
+        ArchivedTicket.objects.filter(pk=pk).update(created_by=self.admin)
+        bump_versions(self.user.pk)
+        self.assertEqual(self.client.get(f'/api/tickets/{pk}/').status_code, 404)
+
+    def test_async_reads_include_archive(self):
+        self.archive()
+        factory = AsyncRequestFactory()
+        for view, path, kwargs in [
+            (async_views.ticket_list, '/api/tickets/?include_archived=1', {}),
+            (async_views.ticket_detail, f'/api/tickets/{self.archivable[0]}/', {'pk': self.archivable[0]}),
+        ]:
+            expected = self.client.get(path).json()
+            get_ticket_cache().clear()
+            request = factory.get(path)
+            force_authenticate(request, self.user)
+            response = async_to_sync(view)(request, **kwargs)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)), expected)
+
+
+class TicketPartitionTests(TestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(partitions.month_start(date(2026, 11, 18), 2), date(2027, 1, 1))
+        self.assertEqual(partitions.month_start(date(2026, 1, 31), -1), date(2025, 12, 1))
+        self.assertEqual(partitions.partition_name(date(2027, 1, 1)), 'tickets_ticket_p202701')
+
+    @skipIf(connection.vendor == 'postgresql', 'Checks the fallback on other databases.')
+    def test_other_databases_keep_the_plain_table(self):
+        self.assertFalse(partitions.is_partitioned(connection))
+        with self.assertRaises(CommandError):
+            call_command('partition_tickets', stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning is PostgreSQL-only.')
+class TicketPartitionPostgresTests(TicketTestMixin, TestCase):
+    # DDL is transactional on PostgreSQL, so each test's conversion is
+    # rolled back with the rest of the test.
+    def setUp(self):
+        super().setUp()
+        self.old = self.make_ticket(title='Old')
+        Ticket.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=200))
+        self.today = timezone.now().date()
+        partitions.convert(connection, months_ahead=3, today=self.today, concurrently=False)
+
+    def partition_of(self, ticket):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM tickets_ticket WHERE id = %s', [ticket.pk])
+            return cursor.fetchone()[0]
+
+    def test_converted_table_keeps_working(self):
+        self.assertTrue(partitions.is_partitioned(connection))
+        self.assertEqual(self.partition_of(self.old), partitions.LEGACY)
+        ticket = self.make_ticket(title='New')
+        self.assertGreater(ticket.pk, self.old.pk)
+        future = partitions.month_start(self.today, 3)
+        Ticket.objects.filter(pk=ticket.pk).update(created_at=partitions.month_bound(future))
+        self.assertEqual(self.partition_of(ticket), partitions.partition_name(future))
+        self.client.force_authenticate(self.admin)
+        ids = [t['id'] for t in self.client.get('/api/tickets/').json()['results']]
+        self.assertEqual(ids, [ticket.pk, self.old.pk])
+
+    def test_cursor_pages_prune_newer_partitions(self):
+        paginator = TicketCursorPagination()
+        paginator.base_url = '/api/tickets/'
+        # Just before the first monthly partition.
+        boundary = partitions.month_bound(partitions.month_start(self.today, 2)) - timedelta(days=1)
+        url = paginator.encode_cursor(Cursor(value=boundary.isoformat(), pk=1, reverse=False))
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        page_sql = [q['sql'] for q in ctx.captured_queries if 'LIMIT' in q['sql']][-1]
+        planned, _ = partitions.explain_partitions(connection, page_sql)
+        self.assertEqual(planned, {partitions.LEGACY})
+
+    def test_rows_caught_by_default_partition_move_out(self):
+        month = partitions.month_start(self.today, 5)
+        ticket = self.make_ticket()
+        Ticket.objects.filter(pk=ticket.pk).update(created_at=partitions.month_bound(month))
+        self.assertEqual(self.partition_of(ticket), partitions.DEFAULT)
+        created = partitions.create_partitions(connection, 0, today=month)
+        self.assertEqual(created, [partitions.partition_name(month)])
+        self.assertEqual(self.partition_of(ticket), partitions.partition_name(month))
+
+
+class TicketTimeseriesTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.client.force_authenticate(self.admin)
+
+    def make_ticket_on(self, days_ago, resolved_days_ago=None, **kwargs):
+        ticket = self.make_ticket(**kwargs)
+        created = timezone.now() - timedelta(days=days_ago)
+        update = {'created_at': created, 'updated_at': created}
+        if resolved_days_ago is not None:
+            update.update(status='resolved', updated_at=timezone.now() - timedelta(days=resolved_days_ago))
+        Ticket.objects.filter(pk=ticket.pk).update(**update)
+        return ticket
+
+    def series(self, **params):
+        response = self.client.get('/api/tickets/timeseries/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_rollup_follows_ticket_writes(self):
+        self.client.force_authenticate(self.user)
+        created = self.client.post('/api/tickets/', {'title': 'A', 'description': 'x', 'priority': 'high'})
+        other = self.client.post('/api/tickets/', {'title': 'B', 'description': 'x'}).json()['id']
+        third = self.client.post('/api/tickets/', {'title': 'C', 'description': 'x'}).json()['id']
+        self.client.patch(f'/api/tickets/{created.json()["id"]}/', {'priority': 'low'})
+        self.client.patch(f'/api/tickets/{created.json()["id"]}/', {'status': 'resolved'})
+        self.client.force_authenticate(self.admin)
+        self.client.post('/api/tickets/bulk_transition/', {'ids': [other], 'status': 'resolved'}, format='json')
+        self.client.delete(f'/api/tickets/{other}/')
+        self.client.delete(f'/api/tickets/{third}/')
+
+        self.assertEqual(stored_rollups(), expected_rollups())
+        self.assertEqual(stored_rollups(), {(self.user.pk, 'low', self.today): (1, 1)})
+        self.assertEqual(rebuild_rollups(), set())
+
+    def test_zero_filled_days_with_running_backlog(self):
+        self.make_ticket_on(40)
+        self.make_ticket_on(10, resolved_days_ago=5, priority='high')
+        self.make_ticket_on(3)
+        rebuild_rollups()
+        start = self.today - timedelta(days=10)
+        points = self.series(**{'from': start.isoformat(), 'to': self.today.isoformat()})
+
+        self.assertEqual([p['date'] for p in points], [(start + timedelta(days=i)).isoformat() for i in range(11)])
+        self.assertEqual([p['created'] for p in points], [1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0])
+        self.assertEqual([p['resolved'] for p in points], [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0])
+        self.assertEqual([p['backlog'] for p in points], [2, 2, 2, 2, 2, 1, 1, 2, 2, 2, 2])
+        self.assertEqual(points[0]['priorities']['high'], {'created': 1, 'resolved': 0, 'backlog': 1})
+        self.assertEqual(points[-1]['priorities']['high']['backlog'], 0)
+        self.assertEqual(points[-1]['priorities']['low']['backlog'], 2)
+
+    def test_weekly_and_monthly_buckets(self):
+        self.make_ticket_on(0)
+        self.make_ticket_on(400, resolved_days_ago=390)
+        rebuild_rollups()
+        start = self.today - timedelta(days=3 * 365)
+        months = self.series(**{'from': start.isoformat(), 'bucket': 'month'})
+        self.assertEqual(months[0]['date'], start.replace(day=1).isoformat())
+        self.assertEqual(months[-1]['date'], self.today.replace(day=1).isoformat())
+        self.assertEqual(sum(p['created'] for p in months), 2)
+        self.assertEqual(sum(p['resolved'] for p in months), 1)
+        self.assertEqual(months[-1]['backlog'], 1)
+
+        weeks = self.series(bucket='week')
+        monday = self.today - timedelta(days=self.today.weekday())
+        self.assertEqual(weeks[-1]['date'], monday.isoformat())
+        self.assertEqual(date.fromisoformat(weeks[0]['date']).weekday(), 0)
+        self.assertEqual(weeks[-1]['created'], 1)
+
+    def test_query_count_does_not_grow_with_window(self):
+        for days_ago in range(0, 700, 7):
+            self.make_ticket_on(days_ago)
+        rebuild_rollups()
+        start = (self.today - timedelta(days=5 * 365)).isoformat()
+        for params in ({}, {'from': start}, {'from': start, 'bucket': 'month'}):
+            with CaptureQueriesContext(connection) as ctx:
+                points = self.series(**params)
+            rollup_queries = [q for q in ctx.captured_queries if 'tickets_ticketdailyrollup' in q['sql']]
+            self.assertEqual(len(rollup_queries), 2)
+            self.assertEqual(points[-1]['backlog'], 100)
+
+    def test_visible_rollup_is_scoped_to_the_owner(self):
+        self.make_ticket_on(1)
+        self.make_ticket_on(1, created_by=self.admin)
+        rebuild_rollups()
+        self.assertEqual(self.series()[-1]['backlog'], 2)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.series()[-1]['backlog'], 1)
+
+    def test_invalid_windows_are_rejected(self):
+        url = '/api/tickets/timeseries/'
+        for params, field in [
+            ({'bucket': 'year'}, 'bucket'),
+            ({'from': 'yesterday'}, 'from'),
+            ({'to': '2026-02-30'}, 'to'),
+            ({'from': '2026-02-02', 'to': '2026-02-01'}, 'from'),
+            ({'from': '1990-01-01', 'to': '2026-01-01'}, 'non_field_errors'),
+        ]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(field, response.json())
+
+    def test_compaction_corrects_drift_and_drops_empty_rows(self):
+        self.make_ticket_on(2)
+        rebuild_rollups()
+        TicketDailyRollup.objects.update(created=5)
+        TicketDailyRollup.objects.create(owner=self.user, priority='low', day=self.today)
+        out = StringIO()
+        call_command('compact_ticket_rollups', '--days', '7', stdout=out)
+        self.assertIn('1 row(s) corrected', out.getvalue())
+        self.assertEqual(
+            list(TicketDailyRollup.objects.values_list('priority', 'created', 'resolved')),
+            [('low', 1, 0)]
+        )
+
+    def test_admin_stats_trends_are_zero_filled(self):
+        self.make_ticket_on(3)
+        rebuild_counters()
+        data = self.client.get('/api/tickets/admin_stats/').json()
+        self.assertEqual(len(data['daily_tickets']), 31)
+        self.assertEqual(data['daily_tickets'][-1], {'date': self.today.isoformat(), 'count': 0})
+        self.assertEqual(sum(day['count'] for day in data['daily_tickets']), 1)
+        self.assertEqual(len(data['daily_resolved']), 31)
+
+
+class TicketSlaTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def make_ticket_at(self, hours_ago, **kwargs):
+        ticket = self.make_ticket(**kwargs)
+        ticket.created_at = timezone.now() - timedelta(hours=hours_ago)
+        ticket.save()
+        return ticket
+
+    def sla_ids(self, **params):
+        response = self.client.get('/api/tickets/sla/', params)
+        self.assertEqual(response.status_code, 200)
+        return [ticket['id'] for ticket in response.json()['results']]
+
+    def test_due_at_follows_status_and_priority(self):
+        self.client.force_authenticate(self.user)
+        data = self.client.post('/api/tickets/', {'title': 'A', 'description': 'x', 'priority': 'high'}).json()
+        ticket = Ticket.objects.get(pk=data['id'])
+        self.assertEqual(ticket.due_at, ticket.created_at + timedelta(hours=1))
+        self.assertIsNotNone(data['due_at'])
+        self.assertIsNone(data['sla_breached_at'])
+
+        Ticket.objects.filter(pk=ticket.pk).update(sla_breached_at=timezone.now())
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/tickets/{ticket.pk}/', {'status': 'in_progress'})
+        ticket.refresh_from_db()
+        # The resolution deadline replaces the missed response deadline.
+        self.assertEqual(ticket.due_at, ticket.created_at + timedelta(days=1))
+        self.assertIsNone(ticket.sla_breached_at)
+
+        self.client.patch(f'/api/tickets/{ticket.pk}/', {'status': 'resolved'})
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.due_at)
+
+    def test_bulk_writes_set_due_at(self):
+        created = self.client.post('/api/tickets/bulk_create/', [
+            {'title': 'A', 'description': 'x', 'priority': 'medium'},
+        ], format='json').json()['results']
+        ticket = Ticket.objects.get(pk=created[0]['id'])
+        self.assertEqual(ticket.due_at, ticket.created_at + timedelta(hours=8))
+
+        self.client.patch('/api/tickets/bulk_update/', [{'id': ticket.pk, 'priority': 'high'}], format='json')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.due_at, ticket.created_at + timedelta(hours=1))
+
+        other = self.make_ticket(priority='low')
+        Ticket.objects.filter(pk=ticket.pk).update(sla_breached_at=timezone.now())
+        self.client.post('/api/tickets/bulk_transition/', {
+            'ids': [ticket.pk, other.pk], 'status': 'in_progress',
+        }, format='json')
+        ticket.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(ticket.due_at, ticket.created_at + timedelta(days=1))
+        self.assertIsNone(ticket.sla_breached_at)
+        self.assertEqual(other.due_at, other.created_at + timedelta(days=7))
+
+        self.client.post('/api/tickets/bulk_transition/', {'ids': [ticket.pk], 'status': 'resolved'}, format='json')
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.due_at)
+
+    def test_sweep_flags_each_breach_once(self):
+        late = [self.make_ticket_at(2, priority='high') for _ in range(3)]
+        self.make_ticket_at(2, priority='low')
+        self.make_ticket_at(30, priority='low', status='resolved')
+
+        out = StringIO()
+        call_command('sweep_sla_breaches', batch_size=2, stdout=out)
+        self.assertIn('flagged 3 breached tickets', out.getvalue())
+        self.assertEqual(
+            set(Ticket.objects.filter(sla_breached_at__isnull=False).values_list('pk', flat=True)),
+            {ticket.pk for ticket in late},
+        )
+        events = TicketEvent.objects.filter(kind='breached')
+        self.assertEqual(events.count(), 3)
+        self.assertEqual(events.first().changes, {'breached': [None, 'response']})
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('sweep_sla_breaches', stdout=out)
+        self.assertIn('flagged 0 breached tickets', out.getvalue())
+        # Nothing left to flag: one SELECT, and no writes.
+        self.assertEqual([q['sql'].split()[0] for q in ctx.captured_queries if 'tickets_' in q['sql']], ['SELECT'])
+        self.assertEqual(TicketEvent.objects.filter(kind='breached').count(), 3)
+
+    def test_sweep_reads_the_pending_index(self):
+        out = StringIO()
+        call_command('sweep_sla_breaches', explain=True, stdout=out)
+        self.assertIn('ticket_sla_pending_idx', out.getvalue())
+
+    def test_breached_and_at_risk_endpoint(self):
+        breached = self.make_ticket_at(2, priority='high')
+        older = self.make_ticket_at(3, priority='high', created_by=self.admin)
+        at_risk = self.make_ticket_at(0.5, priority='high')
+        self.make_ticket_at(0, priority='low')
+        self.make_ticket_at(5, priority='high', status='resolved')
+
+        self.assertEqual(self.sla_ids(), [older.pk, breached.pk])
+        self.assertEqual(self.sla_ids(state='at_risk'), [at_risk.pk])
+        self.assertEqual(self.sla_ids(created_by=self.user.pk), [breached.pk])
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.sla_ids(), [breached.pk])
+        response = self.client.get('/api/tickets/sla/', {'state': 'late'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('state', response.json())
+
+
+class TicketReplicaTests(TicketTestMixin, TestCase):
+    """A second SQLite database stands in for a replica that lags behind."""
+    # The replica alias only exists once setUpClass has added it.
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = dict(
+            connections.settings['default'], NAME=os.path.join(cls.replica_dir.name, 'replica.sqlite3')
+        )
+        call_command('migrate', database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        super().setUp()
+        caches['shared'].clear()
+        # A fresh router, with every replica healthy, for each test.
+        self.enterContext(override_settings(
+            DATABASE_ROUTERS=['ticket_system.replicas.ReplicaRouter'],
+            DATABASE_REPLICAS={'ALIASES': [REPLICA], 'STICKY_SECONDS': 60, 'RETRY_SECONDS': 60},
+        ))
+        self.replicas = router.routers[0].replicas
+        self.replicated = self.make_ticket(title='Replicated')
+        self.replicate()
+        self.recent = self.make_ticket(title='Not replicated yet')
+        rebuild_counters()
+
+    def replicate(self):
+        rebuild_counters()
+        for model in (User, Ticket, TicketCounter):
+            model.objects.using(REPLICA).all().delete()
+            model.objects.using(REPLICA).bulk_create(model.objects.using('default').order_by('pk'))
+
+    def list_titles(self, url='/api/tickets/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [t['title'] for t in response.json()['results']]
+
+    def test_safe_reads_go_to_the_replica(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.list_titles(), ['Replicated'])
+        self.assertEqual(self.client.get(f'/api/tickets/{self.recent.pk}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/tickets/stats/').json()['total_tickets'], 1)
+        self.assertEqual(self.replicas.stats()['replica_reads'], 3)
+
+    def test_other_actions_read_the_primary(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f'/api/tickets/{self.recent.pk}/history/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.replicas.stats()['replica_reads'], 0)
+
+    def test_writer_reads_own_writes_until_the_pin_expires(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.list_titles(), ['Replicated'])
+        response = self.client.post('/api/tickets/', {'title': 'Mine', 'description': 'x'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(replicas.is_pinned(self.user.pk))
+        # The primary's response is not mixed up with the replica's cached one.
+        self.assertEqual(self.list_titles(), ['Mine', 'Not replicated yet', 'Replicated'])
+
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.list_titles(), ['Replicated'])
+
+        caches['shared'].delete(replicas.PIN_KEY.format(self.user.pk))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.list_titles(), ['Replicated'])
+
+    def test_unreachable_replica_fails_over_to_the_primary(self):
+        self.client.force_authenticate(self.user)
+        with mock.patch.multiple(
+            connections[REPLICA], is_usable=mock.Mock(return_value=False), close=mock.Mock(),
+            ensure_connection=mock.Mock(side_effect=OperationalError('unreachable')),
+        ):
+            self.assertEqual(self.list_titles(), ['Not replicated yet', 'Replicated'])
+        stats = self.replicas.stats()
+        self.assertEqual(stats['down'], [REPLICA])
+        self.assertEqual(stats['primary_fallbacks'], 1)
+        # Skipped without another attempt until RETRY_SECONDS pass.
+        self.assertEqual(self.list_titles(), ['Not replicated yet', 'Replicated'])
+        self.assertEqual(self.replicas.stats()['failovers'], 1)
+
+    def test_pins_on_a_process_local_cache_are_refused(self):
+        config = {'ALIASES': [REPLICA], 'CACHE_ALIAS': 'default'}
+        with override_settings(DATABASE_REPLICAS=config):
+            with self.assertRaises(ImproperlyConfigured):
+                replicas.ReplicaRouter()
+        with override_settings(DATABASE_REPLICAS=dict(config, ALIASES=[])):
+            replicas.ReplicaRouter()
+
+    def test_user_directory_reads_the_replica(self):
+        User.objects.create_user(email='new@example.com', password='Passw0rd!')
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/auth/users/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([u['email'] for u in response.json()['results']], ['admin@example.com', 'user@example.com'])
+
+
+class TicketExportTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_ticket(title='Mine, "quoted"', assigned_to=self.admin)
+        self.make_ticket(title='Staff only', created_by=self.admin, status='resolved')
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_is_scoped(self):
+        self.client.force_authenticate(self.user)
+        rows = list(csv.DictReader(StringIO(self.export('/api/tickets/export/'))))
+        self.assertEqual([row['title'] for row in rows], ['Mine, "quoted"'])
+        self.assertEqual(rows[0]['created_by'], 'user@example.com')
+        self.assertEqual(rows[0]['assigned_to'], 'admin@example.com')
+
+    def test_ndjson_export_honours_filters(self):
+        self.client.force_authenticate(self.admin)
+        lines = self.export('/api/tickets/export/?output=ndjson&status=resolved').splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Staff only'])
+
+    def test_unknown_output_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/tickets/export/?output=xml').status_code, 400)
+
+    def asgi_export(self):
+        """Body lines of an NDJSON export served by the ASGI handler, as under uvicorn."""
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/api/tickets/export/', 'query_string': b'output=ndjson',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', f'Bearer {AccessToken.for_user(self.admin)}'.encode()),
+            ],
+        }
+        messages = iter([{'type': 'http.request', 'body': b''}])
+        lines = []
+
+        async def receive():
+            # The handler listens for a disconnect until the response is sent.
+            return next(messages, None) or await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                self.assertEqual(message['status'], 200)
+            elif message['type'] == 'http.response.body':
+                lines.append(message.get('body', b'').count(b'\n'))
+
+        # As the test client does, keep the test transaction's connection open.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            async_to_sync(ASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+        return sum(lines)
+
+    def peak_export_memory(self, rows, asgi=False):
+        Ticket.objects.all().delete()
+        Ticket.objects.bulk_create(
+            Ticket(title=f'Ticket {i}', description='x' * 200, created_by=self.user)
+            for i in range(rows)
+        )
+        tracemalloc.start()
+        try:
+            if asgi:
+                lines = self.asgi_export()
+            else:
+                response = self.client.get('/api/tickets/export/?output=ndjson')
+                lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(lines, rows)
+        return peak
+
+    @mock.patch('tickets.views.TicketViewSet.export_chunk_size', 100)
+    def test_peak_memory_is_flat_in_row_count(self):
+        self.client.force_authenticate(self.admin)
+        for asgi in (False, True):
+            with self.subTest(asgi=asgi):
+                small = self.peak_export_memory(500, asgi)
+                large = self.peak_export_memory(5000, asgi)
+                # Ten times the rows must not mean anywhere near ten times the memory.
+                self.assertLess(large, small * 2)
+
+
+class TicketFeedTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(email='other@example.com', password='Passw0rd!')
+        self.broker = InProcessBroker()
+        patcher = mock.patch('tickets.feed._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def subscribe(self, user):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return self.broker.subscribe(user)
+
+        subscription = loop.run_until_complete(subscribe())
+        self.addCleanup(self.broker.unsubscribe, subscription)
+        return subscription
+
+    def received(self, subscription):
+        # Run the callbacks the broker scheduled on the subscriber's loop.
+        subscription.loop.run_until_complete(asyncio.sleep(0))
+        payloads = []
+        while not subscription.queue.empty():
+            payloads.append(subscription.queue.get_nowait())
+        return payloads
+
+    def test_writes_publish_scoped_deltas(self):
+        mine, staff, others = (self.subscribe(u) for u in (self.user, self.admin, self.other))
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = self.client.post('/api/tickets/', {'title': 'New', 'description': 'x'}).json()['id']
+        created = {
+            'total_tickets': 1, 'open_tickets': 1, 'low_priority': 1, 'unassigned_tickets': 1,
+        }
+        for subscription in (mine, staff):
+            [payload] = self.received(subscription)
+            self.assertEqual(payload['type'], 'created')
+            self.assertEqual(payload['tickets'][0]['id'], pk)
+            self.assertEqual(payload['stats'], created)
+        self.assertEqual(self.received(others), [])
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tickets/{pk}/', {'status': 'in_progress', 'assigned_to': self.admin.pk})
+        [payload] = self.received(mine)
+        self.assertEqual(payload['type'], 'updated')
+        self.assertEqual(payload['tickets'][0]['assigned_to'], self.admin.pk)
+        self.assertEqual(payload['stats'], {
+            'open_tickets': -1, 'in_progress_tickets': 1, 'unassigned_tickets': -1,
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/tickets/{pk}/')
+        [payload] = self.received(staff)[-1:]
+        self.assertEqual(payload['type'], 'deleted')
+        self.assertEqual(payload['stats'], {
+            'total_tickets': -1, 'in_progress_tickets': -1, 'low_priority': -1,
+        })
+        self.assertEqual(self.broker.stats()['published'], 3)
+
+    def test_bulk_transition_publishes_one_event(self):
+        tickets = [self.make_ticket(title=f'T{i}') for i in range(5)]
+        self.make_ticket(created_by=self.other)
+        rebuild_counters()
+        mine = self.subscribe(self.user)
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/tickets/bulk_transition/', {
+                'ids': [ticket.pk for ticket in tickets], 'status': 'resolved'
+            }, format='json')
+        [payload] = self.received(mine)
+        self.assertEqual(len(payload['tickets']), 5)
+        self.assertEqual(payload['stats'], {'open_tickets': -5, 'resolved_tickets': 5})
+
+    def test_slow_subscriber_is_told_to_resync(self):
+        self.broker.max_pending = 2
+        subscription = self.subscribe(self.admin)
+        ticket = self.make_ticket()
+        for _ in range(3):
+            self.broker.publish({'type': 'updated', 'changes': [change(ticket, None, None)]})
+        self.assertEqual(self.received(subscription), [RESYNC])
+        self.assertEqual(self.broker.stats()['overflows'], 1)
+
+    def test_feed_requires_asgi(self):
+        token = AccessToken.for_user(self.user)
+        response = Client().get(f'/api/tickets/events/?token={token}')
+        self.assertEqual(response.status_code, 501)
+
+    async def test_rejects_missing_and_invalid_tokens(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get('/api/tickets/events/')).status_code, 401)
+        self.assertEqual((await client.get('/api/tickets/events/?token=nope')).status_code, 401)
+
+    @mock.patch('tickets.views.FEED_HEARTBEAT_SECONDS', 0.01)
+    async def test_streams_events_over_asgi(self):
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get(
+            '/api/tickets/events/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+        self.assertEqual(await anext(stream), b': keep-alive\n\n')
+        self.assertEqual(self.broker.stats()['subscribers'], 1)
+
+        ticket = await sync_to_async(self.make_ticket)()
+        self.broker.publish({'type': 'created', 'changes': [change(ticket, None, bucket(ticket))]})
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith(b'data: '))
+        payload = json.loads(chunk[len(b'data: '):])
+        self.assertEqual(payload['tickets'][0]['id'], ticket.pk)
+        self.assertEqual(payload['stats']['total_tickets'], 1)
+
+        # An ASGI server cancels the response task when the client disconnects.
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(self.broker.stats()['subscribers'], 0)
+
+
+    @mock.patch('tickets.views.FEED_HEARTBEAT_SECONDS', 0.01)
+    async def test_blocking_ends_the_stream(self):
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get(f'/api/tickets/events/?token={token}')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        def block():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.is_blocked = True
+                self.user.save()
+        await sync_to_async(block)()
+
+        async def rest():
+            return [chunk async for chunk in stream]
+        chunks = await asyncio.wait_for(rest(), 1)
+        self.assertTrue(all(chunk == b': keep-alive\n\n' for chunk in chunks))
+        self.assertEqual(self.broker.stats()['subscribers'], 0)
+
+class TicketAsyncReadTests(TicketTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tickets = [self.make_ticket(title=f'Ticket {i}') for i in range(3)]
+        self.staff_ticket = self.make_ticket(created_by=self.admin, status='resolved')
+        rebuild_counters()
+        self.factory = AsyncRequestFactory()
+
+    async def call(self, view, user, path, headers=None, method='get', **kwargs):
+        request = getattr(self.factory, method)(path, headers=headers)
+        if user is not None:
+            force_authenticate(request, user)
+        return await view(request, **kwargs)
+
+    async def sync_data(self, user, path):
+        self.client.force_authenticate(user)
+        response = await sync_to_async(self.client.get)(path)
+        # Make the async view do its own work rather than hit the cache.
+        get_ticket_cache().clear()
+        return response.data
+
+    async def test_list_matches_sync_view(self):
+        for user, path in [
+            (self.admin, '/api/tickets/?page_size=2'),
+            (self.user, '/api/tickets/?status=open'),
+            (self.admin, '/api/tickets/?search=ticket&pagination=offset&limit=2'),
+        ]:
+            expected = await self.sync_data(user, path)
+            response = await self.call(async_views.ticket_list, user, path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, expected)
+
+    async def test_retrieve_is_scoped(self):
+        path = f'/api/tickets/{self.tickets[0].pk}/'
+        expected = await self.sync_data(self.user, path)
+        response = await self.call(async_views.ticket_detail, self.user, path, pk=self.tickets[0].pk)
+        self.assertEqual(response.data, expected)
+
+        pk = self.staff_ticket.pk
+        response = await self.call(async_views.ticket_detail, self.user, f'/api/tickets/{pk}/', pk=pk)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stats_match_sync_view(self):
+        for view, user, path in [
+            (async_views.ticket_stats, self.user, '/api/tickets/stats/'),
+            (async_views.ticket_admin_stats, self.admin, '/api/tickets/admin_stats/'),
+        ]:
+            expected = await self.sync_data(user, path)
+            response = await self.call(view, user, path)
+            self.assertEqual(response.data, expected)
+
+    def test_admin_stats_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = async_to_sync(self.call)(
+                async_views.ticket_admin_stats, self.admin, '/api/tickets/admin_stats/'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx), 4)
+
+    async def test_permissions_and_conditional_requests(self):
+        response = await self.call(async_views.ticket_list, None, '/api/tickets/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.call(async_views.ticket_admin_stats, self.user, '/api/tickets/admin_stats/')
+        self.assertEqual(response.status_code, 403)
+        response = await self.call(async_views.ticket_stats, self.user, '/api/tickets/stats/', method='post')
+        self.assertEqual(response.status_code, 405)
+
+        etag = (await self.call(async_views.ticket_stats, self.user, '/api/tickets/stats/'))['ETag']
+        response = await self.call(
+            async_views.ticket_stats, self.user, '/api/tickets/stats/', headers={'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_writes_fall_through_to_viewset(self):
+        view = async_views.reads_or(async_views.ticket_list, {'get': 'list', 'post': 'create'})
+        request = self.factory.post(
+            '/api/tickets/', {'title': 'Async', 'description': 'x'}, content_type='application/json'
+        )
+        force_authenticate(request, self.user)
+        response = await view(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Ticket.objects.filter(title='Async').aexists())
+
+    def test_benchmark_needs_a_shared_database(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_async_reads', stdout=StringIO())
@@ -1,60 +1,270 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Ticket
-from .serializers import TicketSerializer
+from .models import ArchivedTicket, Ticket, TicketEvent
+from .serializers import TicketSerializer, TicketEventSerializer, BulkTransitionSerializer
+from . import bulk
+from .export import CONTENT_TYPES, export_response
+from .search import TicketSearchFilter
+from .pagination import TicketCursorPagination, TicketDuePagination, TicketEventPagination, TicketOffsetPagination
+from .stats import (
+    TIMESERIES_BUCKETS, admin_ticket_stats, bucket_starts, counters_for, events_for, rollups_for,
+    ticket_stats, ticket_timeseries,
+)
+from . import counters, events, feed, sla
+from .cache import cached_response, get_ticket_cache, invalidate_on_commit
+from .etags import conditional_response, queryset_etag, queryset_state, state_etag
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.db import transaction
 # from .permissions import IsOwnerOrStaffOrReadOnly
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count
-from django.db.models.functions import TruncDate
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
-from django.utils import timezone
-from datetime import timedelta
-from rest_framework.exceptions import PermissionDenied
-class TicketViewSet(viewsets.ModelViewSet):
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied, ValidationError
+from accounts.authentication import CachedJWTAuthentication
+from rest_framework import status
+from ticket_system.replicas import ReplicaReadMixin
+class TicketViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'created_by', 'assigned_to']
+    filter_backends = [DjangoFilterBackend, TicketSearchFilter, filters.OrderingFilter]
+    filterset_fields = {
+        'status': ['exact'],
+        'priority': ['exact'],
+        'created_by': ['exact'],
+        'assigned_to': ['exact', 'isnull'],
+    }
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'updated_at', 'priority']
+    pagination_class = TicketCursorPagination
+    # Safe reads that may be served from a database replica.
+    replica_actions = ('list', 'retrieve', 'stats', 'admin_stats', 'timeseries', 'sla')
+
+    @property
+    def paginator(self):
+        # Keyset cursors are the default; offset paging is an explicit opt-in.
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'offset':
+                self._paginator = TicketOffsetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Ticket.objects.select_related(
+            'created_by', 'assigned_to'
+        ).defer('search_vector')
         if user.is_staff:
-            return Ticket.objects.all()
-        return Ticket.objects.filter(created_by=user)
+            return queryset
+        return queryset.filter(created_by=user)
+
+    # Old resolved tickets live in ArchivedTicket (tickets.archive). Reads
+    # only look there on ?include_archived=1, or when a retrieve misses.
+    archive_fallback_actions = ('retrieve', 'history')
+
+    def get_archive_queryset(self):
+        user = self.request.user
+        queryset = ArchivedTicket.objects.select_related(
+            'created_by', 'assigned_to'
+        ).defer('search_vector')
+        if user.is_staff:
+            return queryset
+        return queryset.filter(created_by=user)
+
+    @property
+    def include_archived(self):
+        return self.request.query_params.get('include_archived') in ('1', 'true')
 
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action not in self.archive_fallback_actions:
+                raise
+        ticket = get_object_or_404(
+            self.filter_queryset(self.get_archive_queryset()), pk=self.kwargs[self.lookup_field]
+        )
+        self.check_object_permissions(self.request, ticket)
+        return ticket
+
+    def paginate_queryset(self, queryset):
+        if not self.include_archived:
+            return super().paginate_queryset(queryset)
+        archived = self.filter_queryset(self.get_archive_queryset())
+        return self.paginator.paginate_querysets([queryset, archived], self.request, view=self)
+
+    # Ticket writes keep the stats counters in step inside the same transaction.
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        with transaction.atomic():
+            ticket = serializer.save(created_by=self.request.user)
+            counters.record_created(ticket)
+            events.record(events.created([ticket], self.request.user))
+            invalidate_on_commit(ticket.created_by_id)
+            feed.publish_on_commit('created', [feed.change(ticket, None, counters.bucket(ticket))])
 
     def perform_update(self, serializer):
         # Check if ticket is resolved
         if serializer.instance.status == 'resolved':
             raise PermissionDenied("This ticket is already resolved and cannot be edited.")
-        serializer.save()
+        with transaction.atomic():
+            before = counters.bucket(serializer.instance)
+            previous = events.snapshot(serializer.instance)
+            ticket = serializer.save()
+            counters.record_changed(before, ticket)
+            events.record(events.updated([ticket], [previous], self.request.user))
+            invalidate_on_commit(ticket.created_by_id)
+            feed.publish_on_commit('updated', [feed.change(ticket, before, counters.bucket(ticket))])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            counters.record_deleted(instance)
+            events.record(events.deleted([instance], self.request.user))
+            invalidate_on_commit(instance.created_by_id)
+            feed.publish_on_commit('deleted', [feed.change(instance, counters.bucket(instance), None)])
+            instance.delete()
 
     def destroy(self, request, *args, **kwargs):
         if not request.user.is_staff:
             raise PermissionDenied("You do not have permission to delete this ticket.")
         return super().destroy(request, *args, **kwargs)
+
+    # Reads answer If-None-Match from a single aggregate query, and are
+    # otherwise served from the versioned response cache (tickets.cache).
+    def list(self, request, *args, **kwargs):
+        extra = ()
+        if self.include_archived:
+            if not isinstance(self.paginator, TicketCursorPagination):
+                raise ValidationError({'include_archived': ['Requires cursor pagination.']})
+            archived = queryset_state(self.filter_queryset(self.get_archive_queryset()))
+            extra = (archived['last_update'], archived['count'])
+        etag = queryset_etag(request, self.filter_queryset(self.get_queryset()), *extra)
+        return conditional_response(request, etag, lambda: cached_response(
+            request, 'list', lambda: super(TicketViewSet, self).list(request, *args, **kwargs), etag=etag
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_field)
+        state = queryset_state(self.get_queryset().filter(pk=pk))
+        if not state['count']:
+            state = queryset_state(self.get_archive_queryset().filter(pk=pk))
+        etag = state_etag(request, state)
+        return conditional_response(request, etag, lambda: cached_response(
+            request, 'retrieve', lambda: super(TicketViewSet, self).retrieve(request, *args, **kwargs),
+            pk=pk, etag=etag
+        ))
+
+    # Bulk writes return one result per item; 207 when some items failed.
+    bulk_max_items = 1000
+
+    def _bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of tickets.']})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({'non_field_errors': [f'At most {self.bulk_max_items} tickets per request.']})
+        return items
+
+    def _bulk_response(self, results, success_status=status.HTTP_200_OK):
+        failed = any(result['status'] == 'error' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_207_MULTI_STATUS if failed else success_status
+        )
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create many tickets with a single INSERT."""
+        serializer = self.get_serializer(data=self._bulk_items(request), many=True)
+        results = bulk.bulk_create(serializer, request.user)
+        return self._bulk_response(results, status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """Partially update many tickets, each item carrying its ``id``."""
+        results = bulk.bulk_update(
+            self.get_queryset(), self._bulk_items(request), self.get_serializer_context()
+        )
+        return self._bulk_response(results)
+
+    @action(detail=False, methods=['post'])
+    def bulk_transition(self, request):
+        """Move many tickets to one status with a single UPDATE."""
+        serializer = BulkTransitionSerializer(data=request.data, context={'max_items': self.bulk_max_items})
+        serializer.is_valid(raise_exception=True)
+        results = bulk.bulk_transition(
+            self.get_queryset(), serializer.validated_data['ids'], serializer.validated_data['status'],
+            actor=request.user
+        )
+        return self._bulk_response(results)
+
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every visible ticket as CSV (default) or NDJSON (?output=ndjson),
+        honouring the same filters, search and ordering as the list.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in CONTENT_TYPES:
+            raise ValidationError({'output': [f'Must be one of: {", ".join(CONTENT_TYPES)}']})
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            queryset, output, self.export_chunk_size, asynchronous=isinstance(request._request, ASGIRequest)
+        )
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """The ticket's event log (status, priority and assignee changes), oldest first."""
+        ticket = self.get_object()
+        paginator = TicketEventPagination()
+        # ticket.events is not available on archived tickets.
+        page = paginator.paginate_queryset(TicketEvent.objects.filter(ticket_id=ticket.pk), request)
+        return paginator.get_paginated_response(TicketEventSerializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def sla(self, request):
+        """
+        Unresolved tickets past their SLA deadline (``?state=breached``, the
+        default) or due within the at-risk window (``?state=at_risk``),
+        earliest deadline first, with the list's filters.
+        """
+        state = request.query_params.get('state', 'breached')
+        if state not in sla.STATES:
+            raise ValidationError({'state': [f'Must be one of: {", ".join(sla.STATES)}']})
+        queryset = sla.in_state(self.filter_queryset(self.get_queryset()), state)
+        paginator = TicketDuePagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Hit/miss/eviction counters of the ticket response cache, for monitoring."""
+        return Response(get_ticket_cache().stats())
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def feed_stats(self, request):
+        """Subscriber and delivery counters of the change feed, for monitoring."""
+        return Response(feed.get_event_broker().stats())
         
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get ticket statistics for the dashboard."""
-        user = request.user
-        queryset = self.get_queryset()
-
-        # Get counts for different statuses
-        stats = {
-            'total_tickets': queryset.count(),
-            'open_tickets': queryset.filter(status='open').count(),
-            'in_progress_tickets': queryset.filter(status='in_progress').count(),
-            'resolved_tickets': queryset.filter(status='resolved').count(),
-        }
-
-        return Response(stats)
+        etag = queryset_etag(request, self.get_queryset())
+        return conditional_response(
+            request, etag, lambda: Response(ticket_stats(counters_for(request.user)))
+        )
     
 
     @action(detail=False, methods=['get'])
@@ -64,45 +274,106 @@ class TicketViewSet(viewsets.ModelViewSet):
         if not user.is_staff:
             return Response({"error": "Not authorized"}, status=403)
 
-        queryset = self.get_queryset()
-        now = timezone.now()
-        last_month = now - timedelta(days=30)
-
-        # Current stats
-        current_stats = {
-            'total_tickets': queryset.count(),
-            'open_tickets': queryset.filter(status='open').count(),
-            'in_progress_tickets': queryset.filter(status='in_progress').count(),
-            'resolved_tickets': queryset.filter(status='resolved').count(),
-            
-            # Priority breakdown
-            'high_priority': queryset.filter(priority='high').count(),
-            'medium_priority': queryset.filter(priority='medium').count(),
-            'low_priority': queryset.filter(priority='low').count(),
-            
-            # Time-based metrics
-            'created_last_30_days': queryset.filter(created_at__gte=last_month).count(),
-            'resolved_last_30_days': queryset.filter(
-                status='resolved',
-                updated_at__gte=last_month
-            ).count(),
-            
-            # Daily tickets trend
-            'daily_tickets': queryset.filter(
-                created_at__gte=last_month
-            ).annotate(
-                date=TruncDate('created_at')
-            ).values('date').annotate(
-                count=Count('id')
-            ).order_by('date'),
-            
-            # Response metrics
-            'unassigned_tickets': queryset.filter(assigned_to=None).count(),
-            'aging_tickets': queryset.filter(
-                status='open',
-                created_at__lt=last_month
-            ).count(),
-        }
-
-        return Response(current_stats)
+        # The 30 day windows move daily, so today's date is part of the tag.
+        etag = queryset_etag(request, self.get_queryset(), timezone.localdate())
+        return conditional_response(request, etag, lambda: Response(
+            admin_ticket_stats(counters_for(user), events_for(user))
+        ))
+
+    timeseries_max_points = 3660
+    timeseries_default_days = 30
+
+    def _timeseries_window(self, params):
+        bucket = params.get('bucket', 'day')
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValidationError({'bucket': [f'Must be one of: {", ".join(TIMESERIES_BUCKETS)}']})
+        dates = {}
+        for name in ('from', 'to'):
+            value = params.get(name)
+            try:
+                dates[name] = parse_date(value) if value else None
+            except ValueError:  # Well formed but not a day, e.g. 2026-02-30.
+                dates[name] = None
+            if value and dates[name] is None:
+                raise ValidationError({name: ['Must be a date (YYYY-MM-DD).']})
+        end = dates['to'] or timezone.localdate()
+        start = dates['from'] or end - timedelta(days=self.timeseries_default_days - 1)
+        if start > end:
+            raise ValidationError({'from': ['Must not be after "to".']})
+        if len(bucket_starts(start, end, bucket)) > self.timeseries_max_points:
+            raise ValidationError({'non_field_errors': [
+                f'At most {self.timeseries_max_points} points; use a wider bucket or a shorter window.'
+            ]})
+        return start, end, bucket
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """
+        Tickets created and resolved, and the open backlog, per day, week or
+        month (``?from=&to=&bucket=``; the last 30 days by default), zero
+        filled, from the daily rollup.
+        """
+        start, end, bucket = self._timeseries_window(request.query_params)
+        # Windows ending today move daily, so today's date is part of the tag.
+        etag = queryset_etag(request, self.get_queryset(), timezone.localdate())
+        return conditional_response(request, etag, lambda: Response({
+            'from': start,
+            'to': end,
+            'bucket': bucket,
+            'results': ticket_timeseries(rollups_for(request.user), start, end, bucket),
+        }))
+
+
+FEED_HEARTBEAT_SECONDS = 15
+
+
+def _feed_user(request):
+    """
+    Authenticate a feed request. EventSource cannot send headers, so the
+    access token may also be passed as ``?token=``.
+    """
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    token = auth.get_validated_token(raw_token)
+    return auth.get_user(token), token
+
+
+@require_GET
+async def ticket_events(request):
+    """
+    Server-Sent Events feed of ticket create/update/delete deltas and the
+    matching stats counter changes, scoped like TicketViewSet.get_queryset.
+    An idle connection costs one heartbeat every FEED_HEARTBEAT_SECONDS,
+    and the user is re-authenticated as often.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be held for the lifetime of the stream.
+        return JsonResponse({'detail': 'The ticket feed requires an ASGI server.'}, status=501)
+    try:
+        user, token = await sync_to_async(_feed_user)(request)
+    except AuthenticationFailed as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return JsonResponse(detail, status=401)
+
+    async def reauthorize():
+        # Blocking or a role change restamps the user, so this is a cache hit
+        # until one of them happens.
+        try:
+            current = await sync_to_async(CachedJWTAuthentication().get_user)(token)
+        except AuthenticationFailed:
+            return False
+        return current.is_staff == user.is_staff
 
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + token['exp'] - time.time()
+    subscription = feed.get_event_broker().subscribe(user)
+    response = StreamingHttpResponse(
+        feed.event_stream(subscription, FEED_HEARTBEAT_SECONDS, expires_at, reauthorize),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response